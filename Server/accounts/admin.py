@@ -15,19 +15,28 @@ from django.contrib.auth.admin import UserAdmin
 from django.forms import TextInput, Textarea, CharField
 from django import forms
 from django.db import models
+from accounts.revocation import revoke_user_tokens
+from accounts.search import prefix_search
 
 
 class UserAdminConfig(UserAdmin):
     model = User
-    search_fields = ('email', 'username', 'first_name', 'last_name',)
-    list_filter = ('email', 'username', 'first_name', 'last_name', 'is_active', 'is_staff',)
+    # Searched by prefix through `get_search_results`, which the indexes support
+    search_fields = ('email', 'display_name', 'first_name', 'last_name',)
+    # Filters on unique or free-text columns would run a DISTINCT over the
+    # whole table on every page load, so only the flags are offered
+    list_filter = ('is_active', 'is_staff',)
     ordering = ('-start_date',)
-    list_display = ('email', 'username', 'first_name', 'last_name', 'is_active', 'is_staff',)
+    readonly_fields = ('display_name',)
+    list_display = ('email', 'display_name', 'is_active', 'is_staff',)
     fieldsets = (
-        (None, {'fields': ('email', 'username', 'first_name', 'last_name',)}),
+        (None, {'fields': ('email', 'username', 'first_name', 'last_name', 'display_name',)}),
         ('Permissions', {'fields': ('is_staff', 'is_active',)}),
         # ('Personal', {'fields': ('about',)}),
     )
+
+    actions = ('revoke_tokens',)
+
     formfield_overrides = {
         models.TextField: {'widget': Textarea(attrs={'rows': 20, 'cols': 60,})},
     }
@@ -38,5 +47,20 @@ class UserAdminConfig(UserAdmin):
          ),
     )
 
+    @admin.action(description="Revoke all tokens of the selected users")
+    def revoke_tokens(self, request, queryset):
+        """
+        Revokes every access and refresh token of the selected users.
+        """
+        result = revoke_user_tokens(queryset.values_list('pk', flat=True))
+        self.message_user(request, f"Revoked the tokens of {result.users} users in {result.seconds:.2f}s.")
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Prefix search over `search_fields`. A "contains" search can't use
+        an index, so it scans the whole table on every search.
+        """
+        return prefix_search(queryset, search_term, self.search_fields), False
+
 
 admin.site.register(User, UserAdminConfig)
\ No newline at end of file
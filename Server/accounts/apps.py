@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'accounts'
\ No newline at end of file
+    name = 'accounts'
+
+    def ready(self):
+        # Connect the permission cache invalidation signals
+        import accounts.permissions  # noqa: F401
+
+        # Prune expired token rows in the background once serving requests
+        from accounts.pruning import start_scheduler
+        request_started.connect(start_scheduler, dispatch_uid="accounts.pruning.start_scheduler")
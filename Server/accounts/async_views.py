@@ -0,0 +1,236 @@
+# Import the core libraries and functions
+import io
+import math
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, ParseError, ValidationError
+from rest_framework_simplejwt.authentication import AUTH_HEADER_TYPES
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+# Import the used database tables
+from accounts.models import User
+
+# Import the used serializers
+from accounts.serializers import (
+    LoginSerializer, RegistrationSerializer, TokenRefreshSerializer, UserSerializer, insert_user,
+)
+
+# Import the token classes
+from accounts.tokens import RefreshToken, USER_CLAIMS
+
+from accounts.authentication import ClaimsJWTAuthentication, get_verified_token_cache
+from accounts.hashing import acheck_password, amake_password
+from accounts.parsers import FastJSONParser
+from accounts.renderers import FastJSONRenderer
+from accounts.throttling import acheck_throttles, client_ip
+from accounts.token_versions import is_current
+
+
+# ----------------------------------------------------------------
+# Async versions of the `accounts` endpoints. They run on the event
+# loop under `core/asgi.py` and hash passwords on the executor from
+# `accounts.hashing`, so a login never blocks other requests. Pick
+# the endpoints served by these views with `ACCOUNTS['ASYNC_VIEWS']`.
+# Responses match the DRF views in `accounts/views.py`.
+# ----------------------------------------------------------------
+
+def json_response(data, status=200):
+    """
+    Like `JsonResponse`, but encoded the same way as the DRF views.
+    """
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type="application/json")
+
+
+class AsyncAPIView(View):
+    """
+    Base class for the async views. Like DRF's `APIView`, it is exempt
+    from CSRF checks and reads JSON or form bodies.
+    """
+    http_method_names = ["post", "options"]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Tokens, not cookies, authenticate these endpoints
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            return self.handle_exception(exc)
+
+    def handle_exception(self, exc):
+        """
+        Renders DRF exceptions the same way DRF's exception handler does.
+        """
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {"detail": exc.detail}
+        response = json_response(data, status=exc.status_code)
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            response["WWW-Authenticate"] = f'{AUTH_HEADER_TYPES[0]} realm="api"'
+        if getattr(exc, "wait", None) is not None:
+            response["Retry-After"] = str(math.ceil(exc.wait))
+        return response
+
+    def get_data(self, request):
+        """
+        Returns the request body as a dictionary, or None if it can't be read.
+        """
+        if request.content_type == "application/json":
+            try:
+                return FastJSONParser().parse(io.BytesIO(request.body or b"{}"))
+            except ParseError:
+                return None
+        return request.POST
+
+
+class AsyncCurrentUser(AsyncAPIView):
+    """
+    Returns the current user based on their token authentication information.
+    Answered from the token claims, so no database query is needed.
+    """
+    http_method_names = ["get", "options"]
+
+    async def get(self, request):
+        auth = await ClaimsJWTAuthentication().aauthenticate(request)
+        if auth is None:
+            raise NotAuthenticated()
+        user, token = auth
+        return json_response(UserSerializer(user).data)
+
+
+class AsyncTokenObtainPairView(AsyncAPIView):
+    """
+    Takes a set of user credentials and returns an access and refresh JSON web
+    token pair to prove the authentication of those credentials.
+    """
+
+    async def post(self, request):
+        serializer = LoginSerializer(data=self.get_data(request))
+        serializer.is_valid(raise_exception=True)
+        email = serializer.validated_data["email"]
+        password = serializer.validated_data["password"]
+
+        await acheck_throttles(request, (("login_ip", client_ip(request)), ("login_email", email.strip().lower())))
+
+        user = await User.objects.filter(email=email).afirst()
+        if user is None:
+            # Run the hasher once to reduce the timing difference between
+            # an existing and a nonexistent user (same as `ModelBackend`)
+            await amake_password(password)
+            raise self.no_active_account()
+
+        valid, must_update = await acheck_password(password, user.password)
+        if not (valid and user.is_active):
+            raise self.no_active_account()
+
+        if must_update:
+            user.password = await amake_password(password)
+            await sync_to_async(user.save)(update_fields=["password"])
+
+        refresh = await sync_to_async(RefreshToken.for_user)(user)
+        return json_response({"refresh": str(refresh), "access": str(refresh.access_token)})
+
+    def no_active_account(self):
+        return AuthenticationFailed(_("No active account found with the given credentials"), "no_active_account")
+
+
+class AsyncTokenRefreshView(AsyncAPIView):
+    """
+    Takes a refresh type JSON web token and returns an access type JSON web
+    token if the refresh token is valid. Rotates the refresh token the same
+    way as `accounts.serializers.TokenRefreshSerializer`.
+    """
+
+    async def post(self, request):
+        try:
+            if jwt_settings.ROTATE_REFRESH_TOKENS and jwt_settings.BLACKLIST_AFTER_ROTATION:
+                data = await self.rotate(self.get_data(request) or {})
+            else:
+                serializer = TokenRefreshSerializer(data=self.get_data(request))
+                await sync_to_async(serializer.is_valid)(raise_exception=True)
+                data = serializer.validated_data
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        return json_response(data)
+
+    async def rotate(self, data):
+        if not data.get("refresh"):
+            raise ValidationError({"refresh": [_("This field is required.")]})
+
+        refresh = RefreshToken(data["refresh"], lookup_blacklist=False)
+
+        claims = await (
+            User.objects
+            .filter(**{jwt_settings.USER_ID_FIELD: refresh[jwt_settings.USER_ID_CLAIM]})
+            .values(*USER_CLAIMS)
+            .afirst()
+        )
+        if claims is None or not claims["is_active"]:
+            raise TokenError(_("User is inactive"))
+        if not is_current(refresh.payload, claims["token_version"]):
+            raise TokenError(_("Token has been revoked"))
+        refresh.set_user_claims(claims)
+
+        data = {"access": str(refresh.access_token)}
+
+        blacklisted_token, created = await refresh.ablacklist()
+        if not created:
+            raise TokenError(_("Token is blacklisted"))
+
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+
+        data["refresh"] = str(refresh)
+
+        return data
+
+
+class AsyncRegisterUser(AsyncAPIView):
+    """
+    Takes in the new user information and adds a unique user to the
+    database. Returns the registration data with the password removed.
+    """
+
+    async def post(self, request):
+        await acheck_throttles(request, (("register_ip", client_ip(request)),))
+
+        serializer = RegistrationSerializer(data=self.get_data(request))
+        if not await sync_to_async(serializer.is_valid)():
+            raise ValidationError(serializer.errors)
+
+        data = dict(serializer.validated_data)
+        data["password"] = await amake_password(data["password"])
+        user = await sync_to_async(insert_user)(User(**data))
+
+        return json_response(RegistrationSerializer(user).data, status=status.HTTP_201_CREATED)
+
+
+class AsyncBlacklistTokenView(AsyncAPIView):
+    """
+    Upon logout, take the "refresh_token" from the request and add it to
+    the blacklist model and cache, and drop the user's cached access tokens.
+    """
+
+    async def post(self, request):
+        try:
+            refresh = RefreshToken((self.get_data(request) or {})["refresh_token"], lookup_blacklist=False)
+            blacklisted_token, created = await refresh.ablacklist()
+        except Exception:
+            return HttpResponse(status=status.HTTP_400_BAD_REQUEST)
+        # Logging out twice with the same token is refused, like the DRF view
+        if not created:
+            return HttpResponse(status=status.HTTP_400_BAD_REQUEST)
+        get_verified_token_cache().evict_user(refresh.get(jwt_settings.USER_ID_CLAIM))
+        return HttpResponse(status=status.HTTP_205_RESET_CONTENT)
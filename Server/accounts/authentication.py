@@ -0,0 +1,404 @@
+# Import the core libraries and functions
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+# Import the used database tables
+from accounts.models import User, format_full_name
+
+from accounts.cache import LRUCache, MISSING
+from accounts.conf import accounts_settings
+from accounts.instrumentation import span
+from accounts.metrics import registry
+from accounts.permissions import get_permission_cache
+from accounts.token_versions import ais_token_current, is_current, is_token_current
+
+
+# ----------------------------------------------------------------
+# Short-lived cache of full `User` rows, for the endpoints that need
+# the model rather than the claims in the token.
+# ----------------------------------------------------------------
+
+_user_cache = LRUCache(
+    max_entries=accounts_settings.USER_CACHE_MAX_ENTRIES,
+    timeout=accounts_settings.USER_CACHE_TIMEOUT,
+)
+
+
+def get_cached_user(user_id):
+    """
+    Returns the `User` with the given id, loading it at most once every
+    `USER_CACHE_TIMEOUT` seconds. Returns None if there is no such user.
+    """
+    user = _user_cache.get(user_id)
+    if user is MISSING:
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        _user_cache.set(user_id, user, accounts_settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_cached_user(sender, instance, **kwargs):
+    """
+    Drops a user from the cache whenever it is saved or deleted.
+    """
+    _user_cache.delete(getattr(instance, api_settings.USER_ID_FIELD))
+
+
+def token_revoked():
+    return InvalidToken(_("Token has been revoked"))
+
+
+def check_token_version(validated_token, version):
+    """
+    Refuses a token that is behind `version`, the user's current
+    `token_version`, or from an earlier epoch.
+    """
+    if not is_current(validated_token.payload, version):
+        raise token_revoked()
+
+
+class ClaimsUser(TokenUser):
+    """
+    Stateless user built from the claims embedded in the token at issue
+    time (see `accounts.tokens.USER_CLAIMS`). Looks enough like `User` to
+    be rendered by `UserSerializer`, without a database query.
+    """
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def first_name(self):
+        return self.token.get("first_name", "")
+
+    @cached_property
+    def last_name(self):
+        return self.token.get("last_name", "")
+
+    @cached_property
+    def is_active(self):
+        return self.token.get("is_active", True)
+
+    @cached_property
+    def display_name(self):
+        return format_full_name(self.username, self.first_name, self.last_name)
+
+    def __str__(self):
+        return self.display_name
+
+    def full_name(self):
+        """
+        Returns a name string for easy display.
+        """
+        return self.__str__()
+
+    @cached_property
+    def instance(self):
+        """
+        The full `User` row, served from the short-lived user cache.
+        """
+        return get_cached_user(self.id)
+
+    @cached_property
+    def permission_set(self):
+        """
+        The user's permissions, from the permission cache.
+        """
+        return get_permission_cache().get(self.id)
+
+    @cached_property
+    def is_superuser(self):
+        # Not one of the token claims
+        return self.permission_set.is_superuser
+
+    def get_user_permissions(self, obj=None):
+        if not self.is_active or obj is not None:
+            return set()
+        return self.permission_set.user
+
+    def get_group_permissions(self, obj=None):
+        if not self.is_active or obj is not None:
+            return set()
+        return self.permission_set.group
+
+    def get_all_permissions(self, obj=None):
+        if not self.is_active or obj is not None:
+            return set()
+        return self.permission_set.all
+
+    def has_perm(self, perm, obj=None):
+        """
+        Same answers as `PermissionsMixin.has_perm` with the default
+        backend, without a query once the permission cache is warm.
+        """
+        if self.is_active and self.is_superuser:
+            return True
+        return perm in self.get_all_permissions(obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return all(self.has_perm(perm, obj) for perm in perm_list)
+
+    def has_module_perms(self, app_label):
+        if self.is_active and self.is_superuser:
+            return True
+        return any(perm.partition(".")[0] == app_label for perm in self.get_all_permissions())
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Authenticates with the access token alone. `request.user` is a
+    `ClaimsUser`, so no `User` query is made. Tokens issued before the
+    claims were embedded fall back to the database lookup.
+    """
+
+    def authenticate(self, request):
+        with span("jwt"):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        # Older tokens carry only the user id
+        if "username" not in validated_token:
+            user = super().get_user(validated_token)
+            check_token_version(validated_token, user.token_version)
+            return user
+
+        if not is_token_current(validated_token.payload):
+            raise token_revoked()
+        return self.claims_user(validated_token)
+
+    def claims_user(self, validated_token):
+        user = api_settings.TOKEN_USER_CLASS(validated_token)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Async version of `authenticate()` for the views in
+        `accounts/async_views.py`. Only tokens without claims need the
+        database, through the async ORM.
+        """
+        with span("jwt"):
+            return await self._aauthenticate(request)
+
+    async def _aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            return self.get_user(validated_token), validated_token
+
+        # Claim-backed users need no query once their token version is cached
+        if "username" in validated_token:
+            if not await ais_token_current(validated_token.payload):
+                raise token_revoked()
+            return self.claims_user(validated_token), validated_token
+
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        user = await self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        check_token_version(validated_token, user.token_version)
+        return user, validated_token
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """
+    For endpoints that need the full `User` model. Same as simplejwt's
+    `JWTAuthentication`, but the row comes from the short-lived user cache.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        # The cached row may be older than the token version cache
+        if not is_token_current(validated_token.payload):
+            raise token_revoked()
+
+        return user
+
+
+# ----------------------------------------------------------------
+# Cache of access tokens that already passed verification, keyed by
+# a digest of the raw token. A client sends the same access token for
+# its whole lifetime, so most requests skip the base64 decoding, JSON
+# parsing and signature check. Entries expire with the token, and a
+# logout drops every cached token of that user.
+# ----------------------------------------------------------------
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified tokens, with hit/miss counters.
+    """
+
+    def __init__(self, max_entries):
+        self._tokens = LRUCache(max_entries=max_entries, timeout=0)
+        # Bumped on logout. Entries stored under an older generation are
+        # treated as misses. Only users that logged out recently are kept.
+        self._generations = LRUCache(
+            max_entries=max_entries,
+            timeout=api_settings.ACCESS_TOKEN_LIFETIME.total_seconds(),
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def digest(self, raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).digest()
+
+    def generation(self, user_id):
+        return self._generations.get(user_id, 0)
+
+    def get(self, raw_token):
+        """
+        Returns the cached validated token for `raw_token`, or None.
+        """
+        key = self.digest(raw_token)
+        entry = self._tokens.get(key)
+        if entry is not MISSING:
+            token, user_id, generation = entry
+            if generation == self.generation(user_id):
+                with self._lock:
+                    self.hits += 1
+                return token
+            self._tokens.delete(key)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, raw_token, token):
+        """
+        Stores a validated token until it expires.
+        """
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        timeout = token.get("exp", 0) - time.time()
+        self._tokens.set(self.digest(raw_token), (token, user_id, self.generation(user_id)), timeout)
+
+    def evict_user(self, user_id):
+        """
+        Drops every cached token of `user_id`, e.g. on logout.
+        """
+        with self._lock:
+            self._generations.set(user_id, self.generation(user_id) + 1)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Counters for monitoring.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._tokens),
+            }
+
+    def clear(self):
+        self._tokens.clear()
+        self._generations.clear()
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+
+_verified_token_cache = None
+
+
+def get_verified_token_cache():
+    """
+    Returns the verified token cache, building it on first use.
+    """
+    global _verified_token_cache
+
+    if _verified_token_cache is None:
+        _verified_token_cache = VerifiedTokenCache(accounts_settings.VERIFIED_TOKEN_CACHE_MAX_ENTRIES)
+    return _verified_token_cache
+
+
+def reset_verified_token_cache(*args, **kwargs):
+    """
+    Throws away the cache when the settings it reads change.
+    """
+    global _verified_token_cache
+
+    if kwargs.get("setting") in (None, "ACCOUNTS", "SIMPLE_JWT"):
+        _verified_token_cache = None
+
+
+setting_changed.connect(reset_verified_token_cache)
+
+
+def verified_token_cache_metrics():
+    """
+    Metrics registry collector for the verified token cache.
+    """
+    stats = get_verified_token_cache().stats()
+    return [
+        ("accounts_verified_token_cache_hits_total", "counter", "Verified token cache hits.", (), stats["hits"]),
+        ("accounts_verified_token_cache_misses_total", "counter", "Verified token cache misses.", (), stats["misses"]),
+        ("accounts_verified_token_cache_evictions_total", "counter", "Users evicted on logout.", (), stats["evictions"]),
+        ("accounts_verified_token_cache_entries", "gauge", "Tokens in the cache.", (), stats["entries"]),
+    ]
+
+
+registry.register_collector(verified_token_cache_metrics)
+
+
+class VerifiedTokenJWTAuthentication(ClaimsJWTAuthentication):
+    """
+    `ClaimsJWTAuthentication` that remembers verified access tokens in
+    the verified token cache, so a repeated token is not decoded again.
+    """
+
+    def get_validated_token(self, raw_token):
+        cache = get_verified_token_cache()
+        token = cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            cache.set(raw_token, token)
+        return token
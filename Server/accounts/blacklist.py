@@ -0,0 +1,239 @@
+# Import the core libraries and functions
+import time
+
+from django.core.cache import caches
+from django.test.signals import setting_changed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+# Import the used database tables
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from accounts.models import RevokedToken
+
+from accounts.conf import accounts_settings
+from accounts.cache import LRUCache, MISSING
+
+
+# ----------------------------------------------------------------
+# Cache layer that answers "is this jti blacklisted" in front of the
+# `token_blacklist` tables. Blacklisting is permanent, so a positive
+# answer is kept for the rest of the token's life. A negative answer
+# is only kept for `BLACKLIST_CACHE_NEGATIVE_TIMEOUT` seconds, unless
+# the cache is marked as authoritative.
+# ----------------------------------------------------------------
+
+class BaseBlacklistCache:
+    """
+    Interface shared by the blacklist cache backends.
+    """
+
+    def __init__(self):
+        timeout = accounts_settings.BLACKLIST_CACHE_TIMEOUT
+        if timeout is None:
+            timeout = jwt_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+        self.timeout = timeout
+        self.negative_timeout = accounts_settings.BLACKLIST_CACHE_NEGATIVE_TIMEOUT
+
+    def get(self, jti):
+        """
+        Returns True / False when the answer for `jti` is cached, else None.
+        """
+        raise NotImplementedError
+
+    def set(self, jti, blacklisted, timeout):
+        raise NotImplementedError
+
+    def get_many(self, jtis):
+        """
+        Returns the cached answers of `jtis` as a dictionary, leaving out misses.
+        """
+        answers = {}
+        for jti in jtis:
+            blacklisted = self.get(jti)
+            if blacklisted is not None:
+                answers[jti] = blacklisted
+        return answers
+
+    def set_many(self, jtis, blacklisted, timeout):
+        for jti in jtis:
+            self.set(jti, blacklisted, timeout)
+
+    def clear(self):
+        raise NotImplementedError
+
+    def timeout_for(self, blacklisted, exp=None):
+        """
+        How long to remember an answer. Never longer than the token lives.
+        """
+        timeout = self.timeout if blacklisted else self.negative_timeout
+        if exp is not None:
+            timeout = min(timeout, exp - time.time())
+        return timeout
+
+
+class LocMemBlacklistCache(BaseBlacklistCache):
+    """
+    Per-process LRU cache. Fastest option, but each server process only
+    sees the tokens that it blacklisted itself.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._cache = LRUCache(
+            max_entries=accounts_settings.BLACKLIST_CACHE_MAX_ENTRIES,
+            timeout=self.timeout,
+        )
+
+    def get(self, jti):
+        value = self._cache.get(jti)
+        return None if value is MISSING else value
+
+    def set(self, jti, blacklisted, timeout):
+        self._cache.set(jti, blacklisted, timeout)
+
+    def clear(self):
+        self._cache.clear()
+
+
+class DjangoBlacklistCache(BaseBlacklistCache):
+    """
+    Stores answers in a Django cache (see `CACHES`), so every server
+    process sharing that cache sees the same blacklist.
+    """
+
+    key_prefix = "accounts:blacklist:"
+
+    def __init__(self):
+        super().__init__()
+        self._cache = caches[accounts_settings.BLACKLIST_CACHE_ALIAS]
+
+    def get(self, jti):
+        return self._cache.get(self.key_prefix + jti)
+
+    def get_many(self, jtis):
+        # One cache round trip for the whole batch
+        answers = self._cache.get_many([self.key_prefix + jti for jti in jtis])
+        return {key[len(self.key_prefix):]: value for key, value in answers.items()}
+
+    def set(self, jti, blacklisted, timeout):
+        if timeout <= 0:
+            self._cache.delete(self.key_prefix + jti)
+        else:
+            self._cache.set(self.key_prefix + jti, blacklisted, timeout)
+
+    def set_many(self, jtis, blacklisted, timeout):
+        # One cache round trip for the whole batch
+        if timeout > 0:
+            self._cache.set_many({self.key_prefix + jti: blacklisted for jti in jtis}, timeout)
+
+    def clear(self):
+        self._cache.clear()
+
+
+_blacklist_cache = None
+
+
+def get_blacklist_cache():
+    """
+    Returns the configured blacklist cache, building it on first use.
+    """
+    global _blacklist_cache
+
+    if _blacklist_cache is None:
+        _blacklist_cache = accounts_settings.BLACKLIST_CACHE_BACKEND()
+    return _blacklist_cache
+
+
+def reset_blacklist_cache(*args, **kwargs):
+    """
+    Throws away the current cache so the next lookup rebuilds it from settings.
+    """
+    global _blacklist_cache
+
+    if kwargs.get("setting") in (None, "ACCOUNTS", "CACHES", "SIMPLE_JWT"):
+        _blacklist_cache = None
+
+
+setting_changed.connect(reset_blacklist_cache)
+
+
+def blacklisted_queryset(jti):
+    """
+    Returns the queryset holding the blacklist entry for `jti` in the
+    configured `BLACKLIST_STORAGE`.
+    """
+    if accounts_settings.BLACKLIST_STORAGE == "compact":
+        return RevokedToken.objects.filter(jti=jti)
+    return BlacklistedToken.objects.filter(token__jti=jti)
+
+
+def blacklisted_jtis(jtis):
+    """
+    Returns the set of `jtis` that are blacklisted, in one query.
+    """
+    if accounts_settings.BLACKLIST_STORAGE == "compact":
+        queryset = RevokedToken.objects.filter(jti__in=jtis).values_list("jti", flat=True)
+    else:
+        queryset = BlacklistedToken.objects.filter(token__jti__in=jtis).values_list("token__jti", flat=True)
+    return set(queryset)
+
+
+def is_blacklisted(jti, exp=None, lookup=True):
+    """
+    Returns True if `jti` is blacklisted. The cache is asked first. On a
+    miss the database is only asked when `lookup` is True and the cache
+    is not authoritative, and that answer is cached.
+    """
+    cache = get_blacklist_cache()
+
+    blacklisted = cache.get(jti)
+    if blacklisted is not None:
+        return blacklisted
+
+    if not lookup or accounts_settings.BLACKLIST_CACHE_AUTHORITATIVE:
+        return False
+
+    blacklisted = blacklisted_queryset(jti).exists()
+    cache.set(jti, blacklisted, cache.timeout_for(blacklisted, exp))
+    return blacklisted
+
+
+def filter_blacklisted(tokens, lookup=True):
+    """
+    Batch version of `is_blacklisted()`. Takes a `{jti: exp}` dictionary
+    and returns the set of blacklisted jtis. The cache misses are looked
+    up together in one query, and those answers are cached.
+    """
+    cache = get_blacklist_cache()
+
+    answers = cache.get_many(tokens)
+    blacklisted = {jti for jti, answer in answers.items() if answer}
+    missing = [jti for jti in tokens if jti not in answers]
+
+    if not missing or not lookup or accounts_settings.BLACKLIST_CACHE_AUTHORITATIVE:
+        return blacklisted
+
+    found = blacklisted_jtis(missing)
+    for jti in missing:
+        cache.set(jti, jti in found, cache.timeout_for(jti in found, tokens[jti]))
+    return blacklisted | found
+
+
+def record_blacklisted(jti, exp=None):
+    """
+    Marks `jti` as blacklisted in the cache. Called after the
+    `BlacklistedToken` (or `RevokedToken`) row has been written.
+    """
+    cache = get_blacklist_cache()
+    cache.set(jti, True, cache.timeout_for(True, exp))
+
+
+def record_blacklisted_many(tokens):
+    """
+    Batch version of `record_blacklisted()` for a `{jti: exp}`
+    dictionary. Every answer is kept until the last token expires, an
+    expired token is refused before the blacklist is asked anyway.
+    """
+    if not tokens:
+        return
+    cache = get_blacklist_cache()
+    cache.set_many(tokens, True, cache.timeout_for(True, max(tokens.values())))
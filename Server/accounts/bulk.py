@@ -0,0 +1,182 @@
+# Import the core libraries and functions
+import json
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+# Import the used database tables
+from accounts.models import UNIQUE_ERRORS, User
+
+# Import the used serializers
+from accounts.serializers import BulkRegistrationSerializer
+
+from accounts.hashing import hash_passwords, hashing_pool
+
+
+# Number of rows validated, hashed and inserted together
+DEFAULT_BATCH_SIZE = 1000
+
+
+def iter_records(stream):
+    """
+    Reads registration records from a file-like object. A stream starting
+    with `[` is read as one JSON array, anything else as NDJSON (one object
+    per line). NDJSON is read line by line, so use it for large imports.
+    Lines that are not valid JSON are yielded as `ValueError`s so they can
+    be reported against their row, and so are lines that are not valid
+    UTF-8. A JSON array that can't be parsed raises `ValueError`.
+    """
+    # Skip leading whitespace to find out which format this is. The
+    # character is kept undecoded, it may be half of one.
+    first = stream.read(1)
+    while first and first.isspace():
+        first = stream.read(1)
+
+    if first in ("[", b"["):
+        yield from json.loads(first + stream.read())
+        return
+
+    for number, line in enumerate(stream):
+        # Put back the character used to detect the format
+        if number == 0:
+            line = first + line
+        try:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if not line.strip():
+                continue
+            yield json.loads(line)
+        except UnicodeDecodeError as e:
+            yield ValueError(f"Invalid UTF-8: {e}")
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+
+
+class BulkRegistrationResult:
+    """
+    Outcome of a bulk registration: how many users were created and the
+    errors of every rejected row (rows are numbered from 1).
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, row, errors):
+        self.errors.append({"row": row, "errors": errors})
+
+    def as_dict(self):
+        return {"created": self.created, "failed": len(self.errors), "errors": self.errors}
+
+
+def bulk_register(records, batch_size=DEFAULT_BATCH_SIZE, workers=None, executor=None):
+    """
+    Creates users from an iterable of registration records. Records are
+    handled in batches: each batch is validated, checked for duplicates
+    with one query per unique field, hashed across a process pool and
+    inserted with `bulk_create`. Bad rows are reported in the result and
+    never stop the rest of the import.
+
+    Passwords are hashed on `executor` when one is given, such as the
+    shared `accounts.hashing.get_executor()`. Otherwise a pool of
+    `workers` processes is started for this import, which suits a
+    one-off command but not a request. `workers=0` hashes in-process.
+    """
+    result = BulkRegistrationResult()
+    records = enumerate(records, start=1)
+
+    own_executor = executor is None and workers != 0
+    if own_executor:
+        executor = hashing_pool(workers)
+    try:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            _register_batch(batch, result, executor)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    return result
+
+
+def _register_batch(batch, result, executor):
+    """
+    Validates and inserts one batch of `(row, record)` pairs.
+    """
+    rows = []
+    for row, record in batch:
+        if isinstance(record, Exception):
+            result.add_error(row, {"non_field_errors": [str(record)]})
+            continue
+        if not isinstance(record, dict):
+            result.add_error(row, {"non_field_errors": ["Expected a JSON object."]})
+            continue
+        serializer = BulkRegistrationSerializer(data=record)
+        if not serializer.is_valid():
+            result.add_error(row, serializer.errors)
+            continue
+        data = serializer.validated_data
+        data["email"] = User.objects.normalize_email(data["email"])
+        rows.append((row, data))
+
+    if not rows:
+        return
+
+    # One query per unique field for the whole batch, ignoring case like
+    # the unique indexes do
+    taken_emails = set(
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=[data["email"].lower() for row, data in rows])
+        .values_list("email_lower", flat=True)
+    )
+    taken_usernames = set(
+        User.objects.annotate(username_lower=Lower("username"))
+        .filter(username_lower__in=[data["username"].lower() for row, data in rows])
+        .values_list("username_lower", flat=True)
+    )
+
+    unique_rows = []
+    for row, data in rows:
+        email, username = data["email"].lower(), data["username"].lower()
+        errors = {}
+        if email in taken_emails:
+            errors["email"] = [UNIQUE_ERRORS["email"]]
+        if username in taken_usernames:
+            errors["username"] = [UNIQUE_ERRORS["username"]]
+        if errors:
+            result.add_error(row, errors)
+            continue
+        # Later rows in the same batch may not reuse these values either
+        taken_emails.add(email)
+        taken_usernames.add(username)
+        unique_rows.append((row, data))
+
+    if not unique_rows:
+        return
+
+    passwords = hash_passwords([data.pop("password") for row, data in unique_rows], executor)
+    users = [
+        User(password=password, **data)
+        for (row, data), password in zip(unique_rows, passwords)
+    ]
+    for user in users:
+        user.refresh_display_name()
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+        result.created += len(users)
+    except IntegrityError:
+        # Another writer took some of the values in the meantime. Insert
+        # the rows one by one to find out which.
+        for (row, data), user in zip(unique_rows, users):
+            try:
+                with transaction.atomic():
+                    user.save()
+                result.created += 1
+            except IntegrityError:
+                errors = User.objects.unique_errors(user.email, user.username)
+                result.add_error(row, errors or {"non_field_errors": ["A user with that email address or username already exists."]})
@@ -0,0 +1,73 @@
+# Import the core libraries and functions
+import threading
+import time
+from collections import OrderedDict
+
+
+# Sentinel returned by `LRUCache.get` when nothing usable is stored
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Small, thread-safe, in-process cache. Holds at most `max_entries` keys,
+    evicting the least recently used key first, and every key carries its
+    own expiry time.
+    """
+
+    def __init__(self, max_entries=10_000, timeout=300):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        """
+        Returns the stored value for `key`, or `default` if the key is
+        unknown or has expired.
+        """
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            # Mark the key as recently used
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        """
+        Stores `value` under `key` for `timeout` seconds (defaults to the
+        cache-wide timeout).
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if timeout <= 0:
+            self.delete(key)
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            # Drop the oldest keys once the size limit is passed
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Removes `key` from the cache if present.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Empties the cache.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
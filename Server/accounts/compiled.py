@@ -0,0 +1,208 @@
+# Import the core libraries and functions
+from operator import attrgetter, itemgetter
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import fields as drf_fields
+from rest_framework.relations import HyperlinkedIdentityField, Hyperlink
+
+from accounts.conf import accounts_settings
+
+
+# ----------------------------------------------------------------
+# Precompiled output for read-only model serializers. DRF builds the
+# fields of a `ModelSerializer` from the model on every instantiation,
+# then walks them for every object rendered. Here the fields are built
+# once per class and turned into a flat plan of `(name, getter)` pairs,
+# so rendering an object is one dictionary comprehension. The same plan
+# renders rows from `QuerySet.values()`, without building model objects.
+# ----------------------------------------------------------------
+
+# Fields whose `to_representation` returns model values unchanged
+PASSTHROUGH_FIELDS = (
+    drf_fields.BooleanField,
+    drf_fields.CharField,
+    drf_fields.IntegerField,
+    drf_fields.ReadOnlyField,
+)
+
+# Fields whose `to_representation` does not depend on the context
+CONVERTED_FIELDS = (
+    drf_fields.DateField,
+    drf_fields.DateTimeField,
+    drf_fields.DecimalField,
+    drf_fields.FloatField,
+    drf_fields.UUIDField,
+)
+
+
+def convert(field, getter):
+    """
+    Wraps `getter` with the field's conversion, keeping None as DRF does.
+    """
+    to_representation = field.to_representation
+
+    def get(source, context):
+        value = getter(source)
+        return None if value is None else to_representation(value)
+    return get
+
+
+def passthrough(getter):
+    return lambda source, context: getter(source)
+
+
+def lookup_namespace(column):
+    return lambda row: SimpleNamespace(**{column: row[column]})
+
+
+def hyperlink(field, getter):
+    """
+    Renders a `HyperlinkedIdentityField` the way DRF does. Only the lookup
+    field of the object is read, so `values()` rows are passed in as a
+    namespace holding it.
+    """
+    def get(source, context):
+        obj = getter(source)
+        request = context.get("request")
+        assert request is not None, (
+            "`HyperlinkedIdentityField` requires the request in the serializer context."
+        )
+        url = field.get_url(obj, field.view_name, request, context.get("format"))
+        return None if url is None else Hyperlink(url, obj)
+    return get
+
+
+def call_attribute(name):
+    """
+    Reads an attribute, calling it when it is a method, like `ReadOnlyField`.
+    """
+    def get(instance):
+        value = getattr(instance, name)
+        return value() if callable(value) else value
+    return get
+
+
+class Plan:
+    """
+    The compiled fields of one serializer class. `instance` and `values`
+    hold the getters for model objects and for `values()` rows, `columns`
+    the database columns each field reads. Fields that can't be read from
+    `values()` rows are missing from `values`.
+    """
+
+    def __init__(self, serializer_class):
+        model = serializer_class.Meta.model
+        prototype = serializer_class()
+
+        self.names = []
+        self.instance = {}
+        self.values = {}
+        self.columns = {}
+
+        for name, field in prototype.fields.items():
+            if field.write_only:
+                continue
+            self.names.append(name)
+
+            if isinstance(field, HyperlinkedIdentityField):
+                column = field.lookup_field
+                self.instance[name] = hyperlink(field, lambda instance: instance)
+                self.values[name] = hyperlink(field, lookup_namespace(column))
+                self.columns[name] = (column,)
+                continue
+
+            if len(field.source_attrs) != 1 or not isinstance(field, PASSTHROUGH_FIELDS + CONVERTED_FIELDS):
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{name}: {type(field).__name__} can't be precompiled."
+                )
+
+            source = field.source_attrs[0]
+            if isinstance(field, drf_fields.ReadOnlyField):
+                self.instance[name] = passthrough(call_attribute(source))
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                self.instance[name] = passthrough(attrgetter(source))
+            else:
+                self.instance[name] = convert(field, attrgetter(source))
+            if is_column(model, source):
+                self.values[name] = (
+                    passthrough(itemgetter(source)) if isinstance(field, PASSTHROUGH_FIELDS) else convert(field, itemgetter(source))
+                )
+                self.columns[name] = (source,)
+
+    def select(self, fields=None):
+        """
+        The field names to render, checking that `fields` are all known.
+        """
+        if fields is None:
+            return self.names
+        unknown = set(fields) - set(self.names)
+        if unknown:
+            raise ImproperlyConfigured(f"Unknown fields: {', '.join(sorted(unknown))}.")
+        return [name for name in self.names if name in fields]
+
+    def values_columns(self, fields=None):
+        """
+        The columns to pass to `values()` for rendering `fields`.
+        """
+        columns = []
+        for name in self.select(fields):
+            if name not in self.values:
+                raise ImproperlyConfigured(f"Field {name} can't be rendered from values() rows.")
+            columns.extend(column for column in self.columns[name] if column not in columns)
+        return columns
+
+
+def is_column(model, name):
+    """
+    Whether `name` is a plain column that `values()` can return.
+    """
+    if name == "pk":
+        return True
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return field.concrete and not field.is_relation
+
+
+class CompiledSerializerMixin:
+    """
+    Renders a read-only `ModelSerializer` from a plan compiled once per
+    class, while `ACCOUNTS['FAST_SERIALIZERS']` is on.
+
+    `selected_fields` limits the fields rendered.
+    """
+    selected_fields = None
+
+    @classmethod
+    def get_plan(cls):
+        plan = cls.__dict__.get("_plan")
+        if plan is None:
+            plan = Plan(cls)
+            cls._plan = plan
+        return plan
+
+    def to_representation(self, instance):
+        if not accounts_settings.FAST_SERIALIZERS:
+            return super().to_representation(instance)
+        plan = self.get_plan()
+        context = self.context
+        getters = plan.instance
+        return {name: getters[name](instance, context) for name in plan.select(self.selected_fields)}
+
+    @classmethod
+    def values_columns(cls, fields=None):
+        return cls.get_plan().values_columns(fields)
+
+    @classmethod
+    def render_values(cls, rows, fields=None, context=None):
+        """
+        Renders `QuerySet.values(*cls.values_columns(fields))` rows as a
+        list of dictionaries, the same as `cls(instances, many=True).data`.
+        """
+        plan = cls.get_plan()
+        plan.values_columns(fields)
+        context = context or {}
+        getters = [(name, plan.values[name]) for name in plan.select(fields)]
+        return [{name: get(row, context) for name, get in getters} for row in rows]
@@ -0,0 +1,169 @@
+# Import the core libraries and functions
+from django.conf import settings
+from django.test.signals import setting_changed
+from rest_framework.settings import APISettings
+
+
+# Default values for the `ACCOUNTS` dictionary in `core/settings.py`.
+# Any key left out of the project settings falls back to the value below.
+DEFAULTS = {
+    # Class that stores "is this jti blacklisted" answers in front of the
+    # `token_blacklist` tables.
+    "BLACKLIST_CACHE_BACKEND": "accounts.blacklist.LocMemBlacklistCache",
+    # Name of the Django cache used by `DjangoBlacklistCache`
+    "BLACKLIST_CACHE_ALIAS": "default",
+    # Upper bound on the number of jti values held by the local-memory cache
+    "BLACKLIST_CACHE_MAX_ENTRIES": 100_000,
+    # Seconds a blacklisted jti is remembered. `None` uses the refresh token lifetime.
+    "BLACKLIST_CACHE_TIMEOUT": None,
+    # Seconds a "not blacklisted" answer is remembered before asking the database again
+    "BLACKLIST_CACHE_NEGATIVE_TIMEOUT": 5,
+    # When True, a cache miss is treated as "not blacklisted" without a database
+    # lookup. Only safe with a cache shared by every server process.
+    "BLACKLIST_CACHE_AUTHORITATIVE": False,
+    # Where blacklisted tokens are stored: "simplejwt" (the `token_blacklist`
+    # tables, which also keep every issued token) or "compact" (only the jti
+    # and expiry of blacklisted tokens, in `accounts.RevokedToken`)
+    "BLACKLIST_STORAGE": "simplejwt",
+    # Seconds between in-process prunes of expired token rows. `None` turns
+    # the scheduler off; use `manage.py prune_tokens` from cron instead.
+    "TOKEN_PRUNE_INTERVAL": None,
+    # Rows deleted per transaction when pruning
+    "TOKEN_PRUNE_BATCH_SIZE": 1000,
+    # Seconds to sleep between prune batches, to leave room for other writers
+    "TOKEN_PRUNE_PAUSE": 0,
+    # Global token epoch. Tokens issued under a lower value are refused, so
+    # raising it revokes every token at once, e.g. after a key incident.
+    "TOKEN_EPOCH": 0,
+    # Django cache holding each user's current `token_version` (see
+    # `accounts/token_versions.py`). Every server process sees a revocation
+    # straight away only when this cache is shared between them.
+    "TOKEN_VERSION_CACHE_ALIAS": "default",
+    # Seconds a user's `token_version` is cached, the longest a revocation
+    # can take to reach processes that don't share the cache
+    "TOKEN_VERSION_CACHE_TIMEOUT": 300,
+    # Tokens blacklisted per bulk insert by `accounts.revocation`
+    "TOKEN_REVOKE_BATCH_SIZE": 1000,
+    # Sign HMAC tokens through `accounts.minting` instead of PyJWT. Tokens
+    # are identical either way; other algorithms always use PyJWT.
+    "FAST_TOKEN_MINTING": True,
+    # Compiled claim templates kept by `accounts.minting`, about one per user
+    "TOKEN_TEMPLATE_CACHE_MAX_ENTRIES": 10_000,
+    # Render `UserSerializer` and `GroupSerializer` from the plans compiled
+    # by `accounts.compiled` instead of walking DRF's fields. Same output.
+    "FAST_SERIALIZERS": True,
+    # Access tokens remembered by `VerifiedTokenJWTAuthentication`
+    "VERIFIED_TOKEN_CACHE_MAX_ENTRIES": 10_000,
+    # Asymmetric keys to sign tokens with instead of `SIMPLE_JWT`'s HMAC
+    # secret, as dictionaries with a `kid`, an `algorithm` ("RS256" or
+    # "EdDSA") and PEM `private_key` / `public_key`. See `accounts/keys.py`
+    "JWT_SIGNING_KEYS": (),
+    # How long clients may cache the key set served at `/accounts/jwks/`
+    "JWKS_MAX_AGE": 300,
+    # Most tokens accepted by one call to `/accounts/introspect/`
+    "INTROSPECTION_MAX_BATCH": 100,
+    # Per-request timings and SQL counts from `accounts.instrumentation`,
+    # sent as `Server-Timing` headers and served at `/accounts/metrics/`
+    "INSTRUMENTATION": False,
+    # Set to False to keep the timings out of the responses
+    "INSTRUMENTATION_SERVER_TIMING": True,
+    # Addresses allowed to read `/accounts/metrics/`
+    "METRICS_ALLOWED_IPS": ("127.0.0.1", "::1"),
+    # Token bucket limits from `accounts.throttling`, as "count/period"
+    # (s, min, hour or day). `None` turns a limit off.
+    "THROTTLE_RATES": {
+        # Login attempts per client IP, and per email address
+        "login_ip": None,
+        "login_email": None,
+        # Registrations per client IP
+        "register_ip": None,
+    },
+    # Where the attempts are counted. Use `accounts.throttling.CacheThrottleStore`
+    # to share the limits between server processes through `CACHES`.
+    "THROTTLE_STORE": "accounts.throttling.LocalThrottleStore",
+    "THROTTLE_CACHE_ALIAS": "default",
+    # Buckets kept by the local store
+    "THROTTLE_MAX_KEYS": 1_000_000,
+    # Reverse proxies in front of the server. With 0 the client IP is
+    # `REMOTE_ADDR`, since anyone can send an `X-Forwarded-For` header.
+    # Otherwise it is the address that many hops from the end of it.
+    "THROTTLE_NUM_PROXIES": 0,
+    # Seconds a full `User` row is kept by `CachedUserJWTAuthentication`
+    # and `ClaimsUser.instance`
+    "USER_CACHE_TIMEOUT": 30,
+    # Upper bound on the number of users held by that cache
+    "USER_CACHE_MAX_ENTRIES": 10_000,
+    # Django cache holding the permission cache versions (see
+    # `accounts/permissions.py`). Every server process sees an invalidation
+    # only when this cache is shared between them.
+    "PERMISSION_CACHE_ALIAS": "default",
+    # Upper bound on the number of users whose permissions are kept in-process
+    "PERMISSION_CACHE_MAX_ENTRIES": 10_000,
+    # Seconds a user's permissions are kept, the longest a missed
+    # invalidation can go unnoticed
+    "PERMISSION_CACHE_TIMEOUT": 300,
+    # Rows validated, hashed and inserted together by `accounts.bulk`
+    "BULK_REGISTER_BATCH_SIZE": 1000,
+    # Processes the `bulk_register` command hashes passwords with. `None`
+    # uses every CPU, 0 hashes in the command's process. The API endpoint
+    # never starts processes, it uses `PASSWORD_HASHING_EXECUTOR`.
+    "BULK_REGISTER_WORKERS": None,
+    # Where login and registration hash passwords: None (request thread),
+    # "thread" (thread pool, for GIL-releasing hashers such as PBKDF2) or
+    # "process" (process pool)
+    "PASSWORD_HASHING_EXECUTOR": None,
+    # Size of that pool. `None` uses every CPU.
+    "PASSWORD_HASHING_WORKERS": None,
+    # Named password hashing profiles: the `algorithm` new hashes use, which
+    # must be in `PASSWORD_HASHERS`, and its cost parameters. Parameters left
+    # out use the hasher's defaults. See `accounts/hashers.py`.
+    "PASSWORD_HASHER_PROFILES": {
+        # The first of `PASSWORD_HASHERS`, as Django ships it
+        "default": {},
+        "pbkdf2": {"algorithm": "pbkdf2_sha256", "iterations": 390_000},
+        # Memory-hard, needs the `argon2-cffi` package
+        "argon2": {"algorithm": "argon2", "time_cost": 2, "memory_cost": 19_456, "parallelism": 1},
+        # Memory-hard, built into Python
+        "scrypt": {"algorithm": "scrypt", "work_factor": 2 ** 14, "block_size": 8, "parallelism": 1},
+    },
+    # Profile new hashes are made with. Hashes from another profile are
+    # upgraded at the user's next successful login.
+    "PASSWORD_HASHER_PROFILE": "default",
+    # URL names in `accounts/urls.py` served by the async views in
+    # `accounts/async_views.py` instead of the DRF views. Available:
+    # "current_user", "token_obtain_pair", "token_refresh",
+    # "register_user" and "blacklist".
+    "ASYNC_VIEWS": (),
+}
+
+# Settings that hold dotted paths and are imported on access
+IMPORT_STRINGS = (
+    "BLACKLIST_CACHE_BACKEND",
+    "THROTTLE_STORE",
+)
+
+
+class AccountsSettings(APISettings):
+    """
+    DRF's settings loader pointed at the `ACCOUNTS` dictionary instead of `REST_FRAMEWORK`.
+    """
+
+    @property
+    def user_settings(self):
+        if not hasattr(self, "_user_settings"):
+            self._user_settings = getattr(settings, "ACCOUNTS", {})
+        return self._user_settings
+
+
+accounts_settings = AccountsSettings(defaults=DEFAULTS, import_strings=IMPORT_STRINGS)
+
+
+def reload_accounts_settings(*args, **kwargs):
+    """
+    Drops the cached values when `ACCOUNTS` is overridden (mostly in tests).
+    """
+    if kwargs["setting"] == "ACCOUNTS":
+        accounts_settings.reload()
+
+
+setting_changed.connect(reload_accounts_settings)
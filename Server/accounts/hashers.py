@@ -0,0 +1,105 @@
+# Import the core libraries and functions
+from django.contrib.auth import hashers
+from django.core.exceptions import ImproperlyConfigured
+
+from accounts.conf import accounts_settings
+
+
+# ----------------------------------------------------------------
+# Password hashing profiles. `ACCOUNTS['PASSWORD_HASHER_PROFILE']`
+# names one of `ACCOUNTS['PASSWORD_HASHER_PROFILES']`: the algorithm
+# new hashes are made with and its cost parameters. A stored hash made
+# with another algorithm or other parameters is rehashed at the next
+# successful login (see `accounts.hashing`).
+#
+# The hashers below read their parameters from the active profile, so
+# list them in `PASSWORD_HASHERS` instead of Django's own.
+# ----------------------------------------------------------------
+
+def get_profile():
+    """
+    Returns the active profile's dictionary.
+    """
+    name = accounts_settings.PASSWORD_HASHER_PROFILE
+    try:
+        return accounts_settings.PASSWORD_HASHER_PROFILES[name]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown PASSWORD_HASHER_PROFILE {name!r}.") from None
+
+
+def get_preferred_hasher():
+    """
+    Returns the hasher new passwords are hashed with. A profile without
+    an `algorithm` uses the first of `PASSWORD_HASHERS`.
+    """
+    return hashers.get_hasher(get_profile().get("algorithm", "default"))
+
+
+def must_update(encoded):
+    """
+    True when `encoded` wasn't made by the active profile and should be
+    replaced at the next successful login.
+    """
+    preferred = get_preferred_hasher()
+    hasher = hashers.identify_hasher(encoded)
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+class ProfileHasherMixin:
+    """
+    Takes the hasher's cost parameters from the active profile when the
+    profile uses the hasher's algorithm.
+    """
+
+    def cost(self, name, default):
+        profile = get_profile()
+        if profile.get("algorithm") != self.algorithm:
+            return default
+        return profile.get(name, default)
+
+
+class PBKDF2PasswordHasher(ProfileHasherMixin, hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return self.cost("iterations", hashers.PBKDF2PasswordHasher.iterations)
+
+
+class Argon2PasswordHasher(ProfileHasherMixin, hashers.Argon2PasswordHasher):
+    """
+    Memory-hard. Needs the `argon2-cffi` package.
+    """
+
+    @property
+    def time_cost(self):
+        return self.cost("time_cost", hashers.Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return self.cost("memory_cost", hashers.Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return self.cost("parallelism", hashers.Argon2PasswordHasher.parallelism)
+
+
+class ScryptPasswordHasher(ProfileHasherMixin, hashers.ScryptPasswordHasher):
+    """
+    Memory-hard, built into Python. Uses about `128 * work_factor *
+    block_size` bytes per hash; raise `maxmem` past OpenSSL's 32 MiB.
+    """
+
+    @property
+    def work_factor(self):
+        return self.cost("work_factor", hashers.ScryptPasswordHasher.work_factor)
+
+    @property
+    def block_size(self):
+        return self.cost("block_size", hashers.ScryptPasswordHasher.block_size)
+
+    @property
+    def parallelism(self):
+        return self.cost("parallelism", hashers.ScryptPasswordHasher.parallelism)
+
+    @property
+    def maxmem(self):
+        return self.cost("maxmem", hashers.ScryptPasswordHasher.maxmem)
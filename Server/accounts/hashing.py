@@ -0,0 +1,177 @@
+# Import the core libraries and functions
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.contrib.auth import hashers
+from django.test.signals import setting_changed
+
+from accounts.conf import accounts_settings
+from accounts.hashers import get_preferred_hasher, must_update
+from accounts.instrumentation import span
+
+
+# ----------------------------------------------------------------
+# Password hashing off the request thread. `PASSWORD_HASHING_EXECUTOR`
+# picks where the work runs:
+#   None      -> in the calling thread (Django's default behaviour)
+#   "thread"  -> a thread pool, for hashers that release the GIL (PBKDF2)
+#   "process" -> a process pool, for hashers that hold the GIL
+# ----------------------------------------------------------------
+
+def _init_worker():
+    """
+    Makes sure Django is set up in a pool worker, which is needed when the
+    worker was spawned rather than forked.
+    """
+    if not apps.ready:
+        django.setup()
+
+
+def hashing_pool(workers=None):
+    """
+    Returns a process pool for `hash_passwords`. `workers` defaults to the
+    number of CPUs.
+    """
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker)
+
+
+def build_executor(kind, workers=None):
+    """
+    Builds the executor for `kind` ("thread", "process" or None).
+    """
+    if kind is None:
+        return None
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers or os.cpu_count(), thread_name_prefix="password-hashing")
+    if kind == "process":
+        return hashing_pool(workers)
+    raise ValueError(f"Unknown PASSWORD_HASHING_EXECUTOR {kind!r}, expected 'thread', 'process' or None.")
+
+
+_executor = None
+
+
+def get_executor():
+    """
+    Returns the shared hashing executor, building it on first use.
+    None means hashing runs in the calling thread.
+    """
+    global _executor
+
+    if _executor is None and accounts_settings.PASSWORD_HASHING_EXECUTOR is not None:
+        _executor = build_executor(
+            accounts_settings.PASSWORD_HASHING_EXECUTOR,
+            accounts_settings.PASSWORD_HASHING_WORKERS,
+        )
+    return _executor
+
+
+def reset_executor(*args, **kwargs):
+    """
+    Shuts the shared executor down so the next call rebuilds it from settings.
+    """
+    global _executor
+
+    if kwargs.get("setting") in (None, "ACCOUNTS") and _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+setting_changed.connect(reset_executor)
+
+
+def _make_password(password):
+    """
+    Pool-friendly `make_password` with the active hasher profile.
+    """
+    return hashers.make_password(password, hasher=get_preferred_hasher())
+
+
+def _check_password(password, encoded):
+    """
+    Pool-friendly check. Returns `(valid, must_update)` so the caller can
+    upgrade the hash without another round trip. A valid hash must be
+    updated when it wasn't made by the active hasher profile.
+    """
+    valid = hashers.check_password(password, encoded)
+    return valid, valid and must_update(encoded)
+
+
+def make_password(password):
+    """
+    Drop-in for Django's `make_password`, run on the hashing executor
+    with the active hasher profile.
+    """
+    executor = get_executor()
+    with span("hash"):
+        if executor is None:
+            return _make_password(password)
+        return executor.submit(_make_password, password).result()
+
+
+def check_password(password, encoded, setter=None):
+    """
+    Drop-in for Django's `check_password`, run on the hashing executor.
+    `setter(password)` is called in this thread when the hash needs upgrading.
+    """
+    if password is None or not hashers.is_password_usable(encoded):
+        return False
+
+    executor = get_executor()
+    with span("hash"):
+        if executor is None:
+            valid, must_update = _check_password(password, encoded)
+        else:
+            valid, must_update = executor.submit(_check_password, password, encoded).result()
+
+    if must_update and setter:
+        setter(password)
+    return valid
+
+
+async def amake_password(password):
+    """
+    Awaitable `make_password` that keeps the event loop free.
+    """
+    executor = get_executor()
+    with span("hash"):
+        if executor is None:
+            return await sync_to_async(_make_password, thread_sensitive=False)(password)
+        return await _run_in_executor(executor, _make_password, password)
+
+
+async def acheck_password(password, encoded):
+    """
+    Awaitable password check that keeps the event loop free. Returns
+    `(valid, must_update)`.
+    """
+    if password is None or not hashers.is_password_usable(encoded):
+        return False, False
+
+    executor = get_executor()
+    with span("hash"):
+        if executor is None:
+            return await sync_to_async(_check_password, thread_sensitive=False)(password, encoded)
+        return await _run_in_executor(executor, _check_password, password, encoded)
+
+
+async def _run_in_executor(executor, func, *args):
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+def hash_passwords(passwords, executor=None):
+    """
+    Hashes raw passwords with the active hasher profile, keeping their order. The work
+    is spread across `executor` when one is given, else done in-process.
+    """
+    passwords = list(passwords)
+    if executor is None or len(passwords) < 2:
+        return [_make_password(password) for password in passwords]
+
+    # Send the passwords in a few large chunks to keep pickling overhead low
+    chunksize = max(1, len(passwords) // (os.cpu_count() * 4))
+    return list(executor.map(_make_password, passwords, chunksize=chunksize))
@@ -0,0 +1,196 @@
+# Import the core libraries and functions
+import time
+from contextvars import ContextVar
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+
+from accounts.conf import accounts_settings
+from accounts.metrics import registry
+
+
+# ----------------------------------------------------------------
+# Per-request timings. `InstrumentationMiddleware` (first in
+# `MIDDLEWARE`) opens a `RequestTimings` for the request and
+# `ViewTimingMiddleware` (last) times what runs inside the middleware
+# stack. `span()` blocks in the JWT authentication, password hashing
+# and serializers add their own sections, and every SQL query is
+# counted and timed. The results are sent back in a `Server-Timing`
+# header and added to the metrics registry.
+#
+# When `ACCOUNTS['INSTRUMENTATION']` is off both middleware remove
+# themselves, and a `span()` only reads one context variable.
+# ----------------------------------------------------------------
+
+_current = ContextVar("accounts_request_timings", default=None)
+
+
+class RequestTimings:
+    """
+    Durations, in seconds, collected while serving one request.
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self.queries = 0
+        self.sql = 0.0
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def server_timing(self):
+        """
+        Returns the value of the `Server-Timing` header.
+        """
+        metrics = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.durations.items()]
+        metrics.append(f'sql;dur={self.sql * 1000:.2f};desc="{self.queries} queries"')
+        return ", ".join(metrics)
+
+
+class span:
+    """
+    Times a block into the current request's timings under `name`.
+    Does nothing outside an instrumented request.
+
+        with span("hash"):
+            ...
+    """
+    __slots__ = ("name", "timings", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.timings = _current.get()
+        if self.timings is not None:
+            self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.add(self.name, time.perf_counter() - self.start)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper counting and timing queries of instrumented requests.
+    """
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.sql += time.perf_counter() - start
+
+
+def instrument(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """
+    Adds `record_query` to new database connections while instrumentation is on.
+    """
+    if accounts_settings.INSTRUMENTATION:
+        instrument(connection)
+
+
+def view_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match._func_path
+
+
+class InstrumentationMiddleware:
+    """
+    Times the whole request and reports it. Put it first in `MIDDLEWARE`.
+    """
+
+    def __init__(self, get_response):
+        if not accounts_settings.INSTRUMENTATION:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Connections opened before instrumentation was turned on
+        for connection in connections.all(initialized_only=True):
+            instrument(connection)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+
+        # Everything outside the view is middleware, including this one
+        timings.durations["middleware"] = total - timings.durations.get("app", total)
+        timings.durations["total"] = total
+
+        if accounts_settings.INSTRUMENTATION_SERVER_TIMING:
+            response["Server-Timing"] = timings.server_timing()
+        self.record(view_label(request), response.status_code, timings)
+        return response
+
+    def record(self, view, status_code, timings):
+        labels = (("view", view),)
+        registry.inc(
+            "accounts_requests_total", labels + (("status", str(status_code)),),
+            help_text="Requests served.",
+        )
+        for name, seconds in timings.durations.items():
+            registry.observe(
+                "accounts_request_seconds", seconds, labels + (("phase", name),),
+                help_text="Time spent per request, by phase.",
+            )
+        registry.observe("accounts_sql_seconds", timings.sql, labels, help_text="SQL time per request.")
+        registry.inc("accounts_sql_queries_total", labels, timings.queries, help_text="SQL queries run.")
+
+
+class ViewTimingMiddleware:
+    """
+    Times URL resolution and the view as "app". Put it last in `MIDDLEWARE`.
+    """
+
+    def __init__(self, get_response):
+        if not accounts_settings.INSTRUMENTATION:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with span("app"):
+            return self.get_response(request)
+
+
+class TimedSerializerMixin:
+    """
+    Times building a serializer's `data` as "serialize".
+    """
+
+    @property
+    def data(self):
+        with span("serialize"):
+            return super().data
+
+
+def metrics_view(request):
+    """
+    Serves the metrics registry in the Prometheus text format. Only
+    answered while instrumentation is on, and only to the addresses
+    in `ACCOUNTS['METRICS_ALLOWED_IPS']`.
+    """
+    if not accounts_settings.INSTRUMENTATION:
+        raise Http404()
+    if request.META.get("REMOTE_ADDR") not in accounts_settings.METRICS_ALLOWED_IPS:
+        return HttpResponse(status=403)
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,189 @@
+# Import the core libraries and functions
+import json
+
+import jwt
+from jwt.algorithms import get_default_algorithms
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404, HttpResponse
+from django.test.signals import setting_changed
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from accounts.conf import accounts_settings
+from accounts.verifier import ALGORITHMS, TokenVerifier
+
+
+# ----------------------------------------------------------------
+# Asymmetric signing keys. With `ACCOUNTS['JWT_SIGNING_KEYS']` set,
+# tokens are signed with a private key and carry its `kid` in their
+# header, and the public keys are served at `/accounts/jwks/`. Other
+# services then verify tokens locally with `accounts.verifier`,
+# without the shared secret and without calling this server.
+#
+# To rotate, put the new key first: it signs from then on, while the
+# old one keeps verifying the tokens already issued. Drop the old key
+# once `REFRESH_TOKEN_LIFETIME` has passed.
+# ----------------------------------------------------------------
+
+# PyJWT only has the asymmetric algorithms when cryptography is installed
+JWT_ALGORITHMS = get_default_algorithms()
+
+
+class SigningKey:
+    """
+    One entry of `JWT_SIGNING_KEYS`: a `kid`, an algorithm and PEM keys.
+    Retired keys may leave out the private key.
+    """
+
+    def __init__(self, kid, algorithm, private_key=None, public_key=None):
+        if algorithm not in ALGORITHMS:
+            raise ImproperlyConfigured(f"JWT_SIGNING_KEYS: unsupported algorithm {algorithm} for key {kid}.")
+        if algorithm not in JWT_ALGORITHMS:
+            raise ImproperlyConfigured(f"JWT_SIGNING_KEYS: {algorithm} needs the cryptography package.")
+        if private_key is None and public_key is None:
+            raise ImproperlyConfigured(f"JWT_SIGNING_KEYS: key {kid} has neither a private nor a public key.")
+
+        self.kid = kid
+        self.algorithm = algorithm
+        prepare_key = JWT_ALGORITHMS[algorithm].prepare_key
+        self.private_key = prepare_key(private_key) if private_key is not None else None
+        self.public_key = prepare_key(public_key) if public_key is not None else self.private_key.public_key()
+
+    def jwk(self):
+        """
+        The public key as a JSON Web Key.
+        """
+        data = json.loads(JWT_ALGORITHMS[self.algorithm].to_jwk(self.public_key))
+        data.pop("key_ops", None)
+        return dict(data, kid=self.kid, alg=self.algorithm, use="sig")
+
+
+class KeyRing:
+    """
+    The parsed `JWT_SIGNING_KEYS`. The first key with a private key signs.
+    """
+
+    def __init__(self, keys):
+        self.keys = [SigningKey(**key) for key in keys]
+        kids = [key.kid for key in self.keys]
+        if len(set(kids)) != len(kids):
+            raise ImproperlyConfigured("JWT_SIGNING_KEYS: every key needs a distinct kid.")
+
+        self.signing_key = next((key for key in self.keys if key.private_key is not None), None)
+        if self.signing_key is None:
+            raise ImproperlyConfigured("JWT_SIGNING_KEYS: no key has a private key to sign with.")
+
+        self.jwks = {"keys": [key.jwk() for key in self.keys]}
+        self.jwks_json = json.dumps(self.jwks).encode()
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """
+    simplejwt backend that signs with the key ring's signing key and
+    verifies through `TokenVerifier`, the same code other services use.
+    """
+
+    def __init__(self, keyring, audience=None, issuer=None, leeway=None, json_encoder=None):
+        # simplejwt doesn't list EdDSA, so its algorithm check is skipped
+        self.keyring = keyring
+        self.algorithm = keyring.signing_key.algorithm
+        self.signing_key = keyring.signing_key.private_key
+        self.verifying_key = None
+        self.audience = audience
+        self.issuer = issuer
+        self.jwks_client = None
+        self.leeway = leeway
+        self.json_encoder = json_encoder
+        self.headers = {"kid": keyring.signing_key.kid}
+        self.verifier = TokenVerifier(
+            jwks=keyring.jwks,
+            audience=audience,
+            issuer=issuer,
+            leeway=self.get_leeway().total_seconds(),
+        )
+
+    def encode(self, payload):
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload["aud"] = self.audience
+        if self.issuer is not None:
+            jwt_payload["iss"] = self.issuer
+
+        return jwt.encode(
+            jwt_payload,
+            self.signing_key,
+            algorithm=self.algorithm,
+            headers=self.headers,
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify=True):
+        if not verify:
+            try:
+                return jwt.decode(token, options={"verify_signature": False})
+            except jwt.InvalidTokenError:
+                raise TokenBackendError(_("Token is invalid or expired"))
+
+        try:
+            return self.verifier.verify(token)
+        except jwt.InvalidTokenError:
+            raise TokenBackendError(_("Token is invalid or expired"))
+
+
+_backend = None
+
+
+def get_token_backend():
+    """
+    Returns the key ring backend when `JWT_SIGNING_KEYS` is set, else
+    simplejwt's own backend built from `SIMPLE_JWT`.
+    """
+    global _backend
+
+    if _backend is None:
+        if accounts_settings.JWT_SIGNING_KEYS:
+            _backend = KeyRingTokenBackend(
+                KeyRing(accounts_settings.JWT_SIGNING_KEYS),
+                audience=jwt_settings.AUDIENCE,
+                issuer=jwt_settings.ISSUER,
+                leeway=jwt_settings.LEEWAY,
+                json_encoder=jwt_settings.JSON_ENCODER,
+            )
+        else:
+            from rest_framework_simplejwt.state import token_backend
+            _backend = token_backend
+    return _backend
+
+
+def reset_token_backend(*args, **kwargs):
+    global _backend
+
+    if kwargs.get("setting") in (None, "ACCOUNTS", "SIMPLE_JWT"):
+        _backend = None
+
+
+setting_changed.connect(reset_token_backend)
+
+
+class KeyRingMixin:
+    """
+    Signs and verifies tokens with `get_token_backend()`.
+    """
+
+    def get_token_backend(self):
+        return get_token_backend()
+
+
+def jwks_view(request):
+    """
+    Serves the public keys as a JSON Web Key Set. Only answered when
+    `JWT_SIGNING_KEYS` is set, there is nothing to publish otherwise.
+    """
+    backend = get_token_backend()
+    if not isinstance(backend, KeyRingTokenBackend):
+        raise Http404()
+    response = HttpResponse(backend.keyring.jwks_json, content_type="application/json")
+    response["Cache-Control"] = f"public, max-age={accounts_settings.JWKS_MAX_AGE}"
+    return response
@@ -0,0 +1,53 @@
+# Import the core libraries and functions
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import User, format_full_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds `User.display_name` for rows whose name fields were changed "
+        "with `QuerySet.update()`. Migration 0009 fills the rows saved before "
+        "the column existed. Walks the table by primary key in "
+        "small batches, so it is safe to run while the server is up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows read and updated per transaction.")
+        parser.add_argument("--pause", type=float, default=0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        start = time.perf_counter()
+        last_pk = None
+        scanned = updated = 0
+
+        while True:
+            queryset = User.objects.order_by("pk")
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            rows = list(queryset.values_list("pk", "username", "first_name", "last_name", "display_name")[:batch_size])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            scanned += len(rows)
+
+            changed = []
+            for pk, username, first_name, last_name, display_name in rows:
+                name = format_full_name(username, first_name, last_name)
+                if name != display_name:
+                    changed.append(User(pk=pk, display_name=name))
+            if changed:
+                with transaction.atomic():
+                    User.objects.bulk_update(changed, ["display_name"])
+                updated += len(changed)
+
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {updated} of {scanned} users in {time.perf_counter() - start:.2f}s."
+        ))
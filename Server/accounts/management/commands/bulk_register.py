@@ -0,0 +1,51 @@
+# Import the core libraries and functions
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.bulk import bulk_register, iter_records
+from accounts.conf import accounts_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates users from a JSON list or an NDJSON file (one user per line). "
+        "Rows that fail are written to stderr and do not stop the import."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, or '-' for stdin.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=accounts_settings.BULK_REGISTER_BATCH_SIZE,
+            help="Rows validated, hashed and inserted together.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=accounts_settings.BULK_REGISTER_WORKERS,
+            help="Processes used to hash passwords (0 hashes in this process).",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        if options["path"] == "-":
+            result = bulk_register(iter_records(sys.stdin), options["batch_size"], options["workers"])
+        else:
+            with open(options["path"], encoding="utf-8") as stream:
+                result = bulk_register(iter_records(stream), options["batch_size"], options["workers"])
+
+        elapsed = time.perf_counter() - start
+
+        # One JSON line per rejected row, so the output can be fed back in
+        for error in result.errors:
+            self.stderr.write(json.dumps(error))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result.created} users, {len(result.errors)} rows failed "
+            f"({result.created / max(elapsed, 1e-6):.0f} users/sec)."
+        ))
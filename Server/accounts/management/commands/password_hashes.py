@@ -0,0 +1,73 @@
+# Import the core libraries and functions
+from collections import Counter
+
+from django.contrib.auth.hashers import identify_hasher, is_password_usable
+from django.core.management.base import BaseCommand
+
+from accounts.conf import accounts_settings
+from accounts.hashers import must_update
+from accounts.models import User
+
+
+# Parts of a decoded hash that differ per user rather than per setting
+PER_USER = frozenset(("algorithm", "salt", "hash", "checksum", "params"))
+
+
+def describe(encoded):
+    """
+    Returns `(algorithm, parameters)` for a stored password, for example
+    `("pbkdf2_sha256", "iterations=390000")`.
+    """
+    if not is_password_usable(encoded):
+        return "unusable", ""
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return "unknown", ""
+    try:
+        decoded = hasher.decode(encoded)
+    except (ValueError, NotImplementedError):
+        # Hashers without `decode()`, or whose library isn't installed
+        return hasher.algorithm, "?"
+    parameters = ", ".join(f"{key}={value}" for key, value in sorted(decoded.items()) if key not in PER_USER)
+    return hasher.algorithm, parameters
+
+
+def upgrade_status(encoded, algorithm):
+    """
+    Whether the active profile upgrades `encoded` at the next login.
+    """
+    if algorithm in ("unusable", "unknown"):
+        return "no login"
+    try:
+        return "upgraded at next login" if must_update(encoded) else "current"
+    except ValueError:
+        # The hasher's library isn't installed
+        return "unknown"
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports how the passwords in `accounts.User` are hashed: users per "
+        "algorithm and cost parameters, and which hashes the active "
+        "`PASSWORD_HASHER_PROFILE` will upgrade at the next login."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per database round trip.")
+
+    def handle(self, *args, **options):
+        counts = Counter()
+        statuses = {}
+        for encoded in User.objects.values_list("password", flat=True).iterator(chunk_size=options["chunk_size"]):
+            key = describe(encoded)
+            counts[key] += 1
+            if key not in statuses:
+                # Every hash with the same parameters gets the same answer
+                statuses[key] = upgrade_status(encoded, key[0])
+
+        total = sum(counts.values())
+        self.stdout.write(f"Profile: {accounts_settings.PASSWORD_HASHER_PROFILE}. Users: {total}.")
+        for key, count in counts.most_common():
+            algorithm, parameters = key
+            self.stdout.write(f"{algorithm:<16} {count:>9} {count / total:>7.1%}  {statuses[key]:<22} {parameters}")
@@ -0,0 +1,37 @@
+# Import the core libraries and functions
+from django.core.management.base import BaseCommand
+
+from accounts.conf import accounts_settings
+from accounts.pruning import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired outstanding, blacklisted and revoked token rows in "
+        "small batches. Safe to run from cron while the server is up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=accounts_settings.TOKEN_PRUNE_BATCH_SIZE,
+            help="Rows deleted per transaction.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=accounts_settings.TOKEN_PRUNE_PAUSE,
+            help="Seconds to sleep between batches.",
+        )
+
+    def handle(self, *args, **options):
+        result = prune_expired_tokens(options["batch_size"], options["pause"])
+
+        for name, deleted in result.deleted.items():
+            self.stdout.write(f"{name}: {deleted} rows")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {result.total} expired token rows in {result.seconds:.2f}s "
+            f"({result.rows_per_second:.0f} rows/sec)."
+        ))
@@ -0,0 +1,50 @@
+# Import the core libraries and functions
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.conf import accounts_settings
+from accounts.models import User
+from accounts.revocation import revoke_user_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Revokes every token of the given users by bumping their token "
+        "version, and blacklists their outstanding refresh tokens with bulk "
+        "inserts. Pick users by --email and --id, or --all users."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", action="append", default=[], help="User email, can be repeated.")
+        parser.add_argument("--id", action="append", type=int, default=[], help="User id, can be repeated.")
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Blacklist the refresh tokens of every user. Raise TOKEN_EPOCH to revoke access tokens too.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=accounts_settings.TOKEN_REVOKE_BATCH_SIZE,
+            help="Tokens blacklisted per insert.",
+        )
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            user_ids = None
+        elif options["email"] or options["id"]:
+            user_ids = set(options["id"])
+            user_ids.update(User.objects.filter(email__in=options["email"]).values_list("pk", flat=True))
+        else:
+            raise CommandError("Pass --email, --id or --all.")
+
+        try:
+            result = revoke_user_tokens(user_ids, options["batch_size"])
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+
+        users = "every user" if user_ids is None else f"{result.users} users"
+        self.stdout.write(self.style.SUCCESS(
+            f"Revoked the tokens of {users} and blacklisted {result.revoked} "
+            f"refresh tokens in {result.seconds:.2f}s."
+        ))
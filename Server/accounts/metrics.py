@@ -0,0 +1,138 @@
+# Import the core libraries and functions
+import bisect
+import threading
+
+
+# ----------------------------------------------------------------
+# In-process metrics registry, exported in the Prometheus text format
+# by `accounts.instrumentation.metrics_view`. Each server process has
+# its own registry, so scrape every process (or worker) separately.
+# ----------------------------------------------------------------
+
+# Upper bounds, in seconds, of the histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """
+    A value that only goes up.
+    """
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self, name, labels):
+        yield name, labels, self.value
+
+
+class Histogram:
+    """
+    Observations counted into fixed buckets, plus their count and sum.
+    """
+    kind = "histogram"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f"{name}_bucket", labels + (("le", repr(bound)),), cumulative
+        yield f"{name}_bucket", labels + (("le", "+Inf"),), self.count
+        yield f"{name}_count", labels, self.count
+        yield f"{name}_sum", labels, self.sum
+
+
+class MetricsRegistry:
+    """
+    Thread-safe collection of named metrics, each split by label values.
+    Collectors add metrics kept elsewhere (such as cache counters) at
+    scrape time.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._help = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get(self, kind, name, labels, help_text):
+        key = (name, labels)
+        metric = self._metrics.get(key)
+        if metric is None:
+            metric = self._metrics[key] = kind()
+            self._help.setdefault(name, (metric.kind, help_text))
+        return metric
+
+    def inc(self, name, labels=(), amount=1, help_text=""):
+        """
+        Adds `amount` to a counter. `labels` is a tuple of `(name, value)` pairs.
+        """
+        with self._lock:
+            self._get(Counter, name, labels, help_text).inc(amount)
+
+    def observe(self, name, value, labels=(), help_text=""):
+        """
+        Records one observation in a histogram.
+        """
+        with self._lock:
+            self._get(Histogram, name, labels, help_text).observe(value)
+
+    def register_collector(self, collector):
+        """
+        `collector()` returns `(name, kind, help_text, labels, value)` tuples.
+        """
+        self._collectors.append(collector)
+
+    def clear(self):
+        with self._lock:
+            self._metrics.clear()
+            self._help.clear()
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        families = {}
+        with self._lock:
+            for (name, labels), metric in sorted(self._metrics.items()):
+                families.setdefault(name, []).extend(metric.samples(name, labels))
+            help_texts = dict(self._help)
+
+        for collector in self._collectors:
+            for name, kind, help_text, labels, value in collector():
+                families.setdefault(name, []).append((name, labels, value))
+                help_texts.setdefault(name, (kind, help_text))
+
+        lines = []
+        for name, samples in families.items():
+            kind, help_text = help_texts[name]
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
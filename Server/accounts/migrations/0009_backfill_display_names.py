@@ -0,0 +1,52 @@
+# Generated by Django 4.1 on 2026-10-18 10:02
+
+from django.db import migrations
+
+
+# Rows read and updated together, like `backfill_display_names`
+BATCH_SIZE = 1000
+
+
+def format_full_name(username, first_name, last_name):
+    """
+    Copy of `accounts.models.format_full_name` as of this migration, so
+    later changes to the app code don't change what it writes.
+    """
+    if (not first_name) and (not last_name):
+        return f"{username}"
+    elif not first_name:
+        return f"{username} | {last_name}"
+    elif not last_name:
+        return f"{username} | {first_name}"
+    return f"{username} | {first_name} {last_name}"
+
+
+def backfill_display_names(apps, schema_editor):
+    """
+    Fills in `display_name` for the rows that existed before 0005 added
+    it, walking the table by primary key in batches.
+    """
+    User = apps.get_model('accounts', 'User')
+    queryset = User.objects.filter(display_name='').order_by('pk')
+
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).values_list('pk', 'username', 'first_name', 'last_name')[:BATCH_SIZE])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        User.objects.bulk_update(
+            [User(pk=pk, display_name=format_full_name(username, first_name, last_name)) for pk, username, first_name, last_name in rows],
+            ['display_name'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_user_token_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_display_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,165 @@
+# Import the core libraries and functions
+import hashlib
+import hmac
+import json
+
+from django.test.signals import setting_changed
+from jwt.utils import base64url_encode
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from accounts.cache import LRUCache, MISSING
+from accounts.conf import accounts_settings
+
+
+# ----------------------------------------------------------------
+# Fast path for signing tokens with the HMAC algorithms. PyJWT builds
+# and encodes the header, JSON-encodes the whole payload and prepares
+# the key for every token. Here the header segment and the HMAC key
+# schedule are computed once, and the JSON of the claims that stay the
+# same between a user's tokens is kept in a template cache, so only
+# `exp`, `iat` and the jti are encoded per token. The output is byte
+# for byte what simplejwt's `TokenBackend.encode()` returns.
+# ----------------------------------------------------------------
+
+HMAC_ALGORITHMS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+def dumps(value):
+    """
+    JSON encoding with the separators used by PyJWT.
+    """
+    return json.dumps(value, separators=(",", ":"))
+
+
+class TokenMinter:
+    """
+    Signs token payloads for one `TokenBackend` configuration.
+    """
+
+    def __init__(self, backend, max_entries):
+        self.backend = backend
+        header = dumps({"typ": "JWT", "alg": backend.algorithm}).encode()
+        self.header = base64url_encode(header) + b"."
+        key = backend.signing_key
+        if isinstance(key, str):
+            key = key.encode()
+        self._hmac = hmac.new(key, digestmod=HMAC_ALGORITHMS[backend.algorithm])
+
+        # Claims that change with every token
+        self.dynamic_claims = frozenset(("exp", "iat", jwt_settings.JTI_CLAIM))
+        self.extra_claims = {}
+        if backend.audience is not None:
+            self.extra_claims["aud"] = backend.audience
+        if backend.issuer is not None:
+            self.extra_claims["iss"] = backend.issuer
+
+        # Templates are keyed by the claim values, so they never go stale
+        self._templates = LRUCache(max_entries=max_entries, timeout=float("inf"))
+
+    @classmethod
+    def supports(cls, backend):
+        """
+        True if `backend` produces tokens this class can reproduce exactly.
+        """
+        return backend.algorithm in HMAC_ALGORITHMS and backend.json_encoder is None
+
+    def compile(self, payload):
+        """
+        Turns the payload into a list of `(json_prefix, dynamic_claim)` parts.
+        Each prefix holds the static claims before the next dynamic one.
+        """
+        parts = []
+        prefix = "{"
+        for number, (claim, value) in enumerate(payload.items()):
+            if number:
+                prefix += ","
+            prefix += dumps(claim) + ":"
+            if claim in self.dynamic_claims:
+                parts.append((prefix, claim))
+                prefix = ""
+            else:
+                prefix += dumps(value)
+        parts.append((prefix + "}", None))
+        return parts
+
+    def template_for(self, payload):
+        """
+        Returns the compiled template for the payload's static claims.
+        """
+        key = tuple(
+            (claim, None if claim in self.dynamic_claims else value)
+            for claim, value in payload.items()
+        )
+        try:
+            template = self._templates.get(key)
+        except TypeError:
+            # Unhashable claim values (lists, dicts) are compiled every time
+            return self.compile(payload)
+        if template is MISSING:
+            template = self.compile(payload)
+            self._templates.set(key, template)
+        return template
+
+    def encode(self, payload):
+        """
+        Returns the signed token for `payload`, like `TokenBackend.encode()`.
+        """
+        if self.extra_claims:
+            payload = {**payload, **self.extra_claims}
+
+        body = "".join(
+            prefix if claim is None else prefix + dumps(payload[claim])
+            for prefix, claim in self.template_for(payload)
+        )
+        signing_input = self.header + base64url_encode(body.encode())
+
+        signature = self._hmac.copy()
+        signature.update(signing_input)
+        return (signing_input + b"." + base64url_encode(signature.digest())).decode()
+
+
+_minter = None
+
+
+def get_minter(backend):
+    """
+    Returns the minter for `backend`, or None if tokens must be signed by
+    simplejwt (fast minting turned off, or a non-HMAC algorithm).
+    """
+    global _minter
+
+    if not accounts_settings.FAST_TOKEN_MINTING or not TokenMinter.supports(backend):
+        return None
+    if _minter is None or _minter.backend is not backend:
+        _minter = TokenMinter(backend, accounts_settings.TOKEN_TEMPLATE_CACHE_MAX_ENTRIES)
+    return _minter
+
+
+def reset_minter(*args, **kwargs):
+    """
+    Drops the current minter so the next token rebuilds it from settings.
+    """
+    global _minter
+
+    if kwargs.get("setting") in (None, "ACCOUNTS", "SIMPLE_JWT"):
+        _minter = None
+
+
+setting_changed.connect(reset_minter)
+
+
+class FastMintMixin:
+    """
+    Signs the token through `TokenMinter` when the configuration allows it.
+    """
+
+    def __str__(self):
+        backend = self.get_token_backend()
+        minter = get_minter(backend)
+        if minter is None:
+            return backend.encode(self.payload)
+        return minter.encode(self.payload)
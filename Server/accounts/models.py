@@ -1,9 +1,37 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from accounts import hashing
+
+
+def format_full_name(username, first_name, last_name):
+    """
+    Builds the display name for a user from its name fields. Shared by
+    `User` and the token-backed `ClaimsUser`.
+    """
+    if (not first_name) and (not last_name):
+        return f"{username}"
+    elif not first_name:
+        return f"{username} | {last_name}"
+    elif not last_name:
+        return f"{username} | {first_name}"
+    return f"{username} | {first_name} {last_name}"
+
+
+# Fields `User.display_name` is built from
+NAME_FIELDS = frozenset(("username", "first_name", "last_name"))
+
+# Errors for an email or username that's already taken, the same as
+# Django's messages for the `unique` fields
+UNIQUE_ERRORS = {
+    "email": "user with this email address already exists.",
+    "username": "A user with that username already exists.",
+}
+
 
 class CustomAccountManager(BaseUserManager):
 
@@ -27,6 +55,26 @@ class CustomAccountManager(BaseUserManager):
 
         return self.create_user(email, username, password, first_name, last_name, **other_fields)
 
+    def unique_errors(self, email, username):
+        """
+        Returns the field errors for whichever of `email` and `username`
+        already belong to a user, ignoring case. One query, served by the
+        case-insensitive unique indexes.
+        """
+        email, username = email.lower(), username.lower()
+        taken = (
+            self.alias(email_lower=Lower("email"), username_lower=Lower("username"))
+            .filter(models.Q(email_lower=email) | models.Q(username_lower=username))
+            .values_list("email", "username")
+        )
+        errors = {}
+        for taken_email, taken_username in taken:
+            if taken_email.lower() == email:
+                errors["email"] = [UNIQUE_ERRORS["email"]]
+            if taken_username.lower() == username:
+                errors["username"] = [UNIQUE_ERRORS["username"]]
+        return errors
+
     def create_user(self, email, username, password, first_name="", last_name="", **other_fields):
         """
         Function that creates a standard user that is registered on the server
@@ -62,6 +110,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')
     is_active = models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.', verbose_name='active')
     date_joined = models.DateTimeField(default=timezone.now, verbose_name='date joined')
+    # Stored `format_full_name()` of the name fields, kept up to date by `save()`.
+    # Rows changed with `QuerySet.update()` are fixed by `python manage.py backfill_display_names`.
+    display_name = models.CharField(max_length=454, blank=True, editable=False, verbose_name='display name')
+    # Embedded in every token. Tokens carrying an older value are refused,
+    # so bumping it revokes all of the user's tokens (see `accounts.token_versions`).
+    token_version = models.PositiveIntegerField(default=0, editable=False, verbose_name='token version')
 
     # Extends the functions of the base `User` model with
     # custom functions
@@ -77,19 +131,54 @@ class User(AbstractBaseUser, PermissionsMixin):
         """
         Display the user's name based on provided information.
         """
-        if (not self.first_name) and (not self.last_name):
-            return f"{self.username}"
-        elif not self.first_name:
-            return f"{self.username} | {self.last_name}"
-        elif not self.last_name:
-            return f"{self.username} | {self.first_name}"
-        return f"{self.username} | {self.first_name} {self.last_name}"
+        return format_full_name(self.username, self.first_name, self.last_name)
+
+    def save(self, *args, **kwargs):
+        """
+        Rebuilds `display_name` before saving. A save limited to some of
+        the name fields with `update_fields` writes it too.
+        """
+        self.refresh_display_name()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and NAME_FIELDS.intersection(update_fields):
+            kwargs["update_fields"] = {*update_fields, "display_name"}
+        super().save(*args, **kwargs)
+
+    def refresh_display_name(self):
+        """
+        Sets `display_name` from the name fields. `save()` calls it, but
+        `bulk_create()` doesn't, so call it before bulk inserts.
+        """
+        self.display_name = format_full_name(self.username, self.first_name, self.last_name)
+
+    def set_password(self, raw_password):
+        """
+        Same as Django's `set_password`, but the hashing runs on the
+        executor configured in `accounts.hashing`.
+        """
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Same as Django's `check_password`, but the hashing runs on the
+        executor configured in `accounts.hashing`. Outdated hashes are
+        upgraded on a successful check.
+        """
+
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # Password hash upgrades shouldn't be considered password changes.
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return hashing.check_password(raw_password, self.password, setter)
 
     def full_name(self):
         """
         Returns a name string for easy display.
         """
-        return self.__str__()
+        return self.display_name or self.__str__()
 
     # Set the database information
     class Meta:
@@ -100,4 +189,48 @@ class User(AbstractBaseUser, PermissionsMixin):
             "last_name",
             "first_name",
             "username",
-        )
\ No newline at end of file
+        )
+        indexes = [
+            # Default ordering of the admin list
+            models.Index(fields=["-start_date"], name="user_start_date_idx"),
+            # Incremental exports, see `accounts.export`
+            models.Index(fields=["date_joined"], name="user_date_joined_idx"),
+            # Prefix search, see `accounts.search`. Emails use `user_email_ci_unique`.
+            models.Index(Lower("display_name"), name="user_display_name_lower_idx"),
+            models.Index(Lower("first_name"), name="user_first_name_lower_idx"),
+            models.Index(Lower("last_name"), name="user_last_name_lower_idx"),
+        ]
+        constraints = [
+            # Emails and usernames are unique ignoring case. Registration
+            # inserts straight away and relies on these, see
+            # `accounts.serializers.insert_user`.
+            models.UniqueConstraint(
+                Lower("email"),
+                name="user_email_ci_unique",
+                violation_error_message=UNIQUE_ERRORS["email"],
+            ),
+            models.UniqueConstraint(
+                Lower("username"),
+                name="user_username_ci_unique",
+                violation_error_message=UNIQUE_ERRORS["username"],
+            ),
+        ]
+
+
+class RevokedToken(models.Model):
+    """
+    Compact blacklist entry: only the token's jti and expiry. Used instead
+    of simplejwt's `OutstandingToken` / `BlacklistedToken` tables when
+    `ACCOUNTS['BLACKLIST_STORAGE']` is "compact".
+    """
+
+    jti = models.CharField(max_length=255, primary_key=True, verbose_name='jti')
+    expires_at = models.DateTimeField(db_index=True, verbose_name='expires at')
+
+    def __str__(self):
+        return f"Revoked token {self.jti}"
+
+    # Set the database information
+    class Meta:
+        verbose_name = "Revoked token"
+        verbose_name_plural = "Revoked tokens"
@@ -0,0 +1,60 @@
+# Import the core libraries and functions
+import codecs
+import io
+import re
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from accounts.bulk import iter_records
+from accounts.renderers import FastJSONRenderer, orjson
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON. Returns a generator of records that
+    reads the request body lazily, one line at a time. Bad lines are
+    yielded as errors, a body that can't be read at all raises `ParseError`.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return self.records(stream)
+
+    def records(self, stream):
+        try:
+            yield from iter_records(stream)
+        except ValueError as e:
+            raise ParseError(f"NDJSON parse error - {e}")
+
+
+# Runs of 19 or more digits. orjson turns integers outside
+# [-2**63, 2**64 - 1] into floats, and the shortest of those has 19
+# digits, so bodies that may hold one go to DRF's parser, which keeps
+# them exact. Digits in strings match too, which only costs the slower
+# parse.
+LONG_NUMBER = re.compile(rb"[0-9]{19,}")
+
+
+class FastJSONParser(JSONParser):
+    """
+    `JSONParser` that decodes UTF-8 bodies with orjson. Bodies orjson
+    rejects, or that may hold integers past 64 bits, are parsed by DRF,
+    so results and errors read the same.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_NUMBER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
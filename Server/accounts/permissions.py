@@ -0,0 +1,267 @@
+# Import the core libraries and functions
+import secrets
+import threading
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import caches
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+
+# Import the used database tables
+from accounts.models import User
+
+from accounts.cache import LRUCache, MISSING
+from accounts.conf import accounts_settings
+from accounts.metrics import registry
+
+
+# ----------------------------------------------------------------
+# Cache of each user's permissions, as sets of "app_label.codename"
+# strings. An entry is stored with two versions: a global one, changed
+# whenever a group or permission changes, and one for the user,
+# changed when their groups, permissions or superuser status change.
+# The versions live in a Django cache (`PERMISSION_CACHE_ALIAS`), so
+# with a shared cache every server process sees an invalidation. A
+# warm check is one cache read and a set lookup, without any query.
+# ----------------------------------------------------------------
+
+class PermissionSet:
+    """
+    Permissions of one user, split the way `ModelBackend` reports them.
+    """
+
+    __slots__ = ("is_superuser", "user", "group", "all")
+
+    def __init__(self, is_superuser=False, user=frozenset(), group=frozenset()):
+        self.is_superuser = is_superuser
+        self.user = frozenset(user)
+        self.group = frozenset(group)
+        self.all = self.user | self.group
+
+
+def permission_names(queryset):
+    return {f"{app_label}.{codename}" for app_label, codename in queryset.values_list("content_type__app_label", "codename")}
+
+
+def load_permissions(user_id):
+    """
+    Reads a user's permissions from the database, like `ModelBackend`:
+    superusers have every permission. Unknown users have none.
+    """
+    is_superuser = User.objects.filter(pk=user_id).values_list("is_superuser", flat=True).first()
+    if is_superuser is None:
+        return PermissionSet()
+    if is_superuser:
+        everything = permission_names(Permission.objects.all())
+        return PermissionSet(True, everything, everything)
+    return PermissionSet(
+        False,
+        permission_names(Permission.objects.filter(user__pk=user_id)),
+        permission_names(Permission.objects.filter(group__user__pk=user_id)),
+    )
+
+
+def new_version():
+    return secrets.token_hex(8)
+
+
+class PermissionCache:
+    """
+    Bounded LRU of `PermissionSet`s by user id, checked against the
+    versions in the Django cache on every read.
+    """
+
+    global_key = "accounts:permissions:version"
+    user_key_prefix = "accounts:permissions:user:"
+
+    def __init__(self):
+        self._versions = caches[accounts_settings.PERMISSION_CACHE_ALIAS]
+        self._entries = LRUCache(
+            max_entries=accounts_settings.PERMISSION_CACHE_MAX_ENTRIES,
+            timeout=accounts_settings.PERMISSION_CACHE_TIMEOUT,
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def user_key(self, user_id):
+        return f"{self.user_key_prefix}{user_id}"
+
+    def versions(self, user_id):
+        """
+        Returns the `(global, user)` versions in one cache round trip.
+        """
+        keys = (self.global_key, self.user_key(user_id))
+        found = self._versions.get_many(keys)
+        for key in keys:
+            if key not in found:
+                # Never set, or evicted. Start from a fresh value so that
+                # entries stored under the lost one can't match it.
+                self._versions.add(key, new_version(), None)
+                found[key] = self._versions.get(key)
+        return found[keys[0]], found[keys[1]]
+
+    def get(self, user_id):
+        """
+        Returns the `PermissionSet` of `user_id`, loading it when the
+        stored one is missing or outdated.
+        """
+        # Read before loading, so a change made during the load leaves
+        # the entry outdated rather than wrongly current
+        versions = self.versions(user_id)
+        entry = self._entries.get(user_id)
+        if entry is not MISSING and entry[0] == versions:
+            with self._lock:
+                self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            self.misses += 1
+        permissions = load_permissions(user_id)
+        self._entries.set(user_id, (versions, permissions))
+        return permissions
+
+    def invalidate_user(self, user_id):
+        self._versions.set(self.user_key(user_id), new_version(), None)
+
+    def invalidate_all(self):
+        self._versions.set(self.global_key, new_version(), None)
+
+    def stats(self):
+        """
+        Counters for monitoring.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def clear(self):
+        self._entries.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+_permission_cache = None
+
+
+def get_permission_cache():
+    """
+    Returns the permission cache, building it on first use.
+    """
+    global _permission_cache
+
+    if _permission_cache is None:
+        _permission_cache = PermissionCache()
+    return _permission_cache
+
+
+def reset_permission_cache(*args, **kwargs):
+    """
+    Throws away the cache when the settings it reads change.
+    """
+    global _permission_cache
+
+    if kwargs.get("setting") in (None, "ACCOUNTS", "CACHES"):
+        _permission_cache = None
+
+
+setting_changed.connect(reset_permission_cache)
+
+
+def permission_cache_metrics():
+    """
+    Metrics registry collector for the permission cache.
+    """
+    stats = get_permission_cache().stats()
+    return [
+        ("accounts_permission_cache_hits_total", "counter", "Permission cache hits.", (), stats["hits"]),
+        ("accounts_permission_cache_misses_total", "counter", "Permission cache misses.", (), stats["misses"]),
+        ("accounts_permission_cache_entries", "gauge", "Users in the permission cache.", (), stats["entries"]),
+    ]
+
+
+registry.register_collector(permission_cache_metrics)
+
+
+# ----------------------------------------------------------------
+# Invalidation. Row deletes cascade to the m2m tables without an
+# `m2m_changed` signal, so deletes change the global version.
+# ----------------------------------------------------------------
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    A user's groups or direct permissions changed. From the group or
+    permission side (`reverse`), `pk_set` holds the users.
+    """
+    if not action.startswith("post_"):
+        return
+    cache = get_permission_cache()
+    if not reverse:
+        cache.invalidate_user(instance.pk)
+    elif pk_set is None:
+        # `clear()` from the group or permission side doesn't say who was removed
+        cache.invalidate_all()
+    else:
+        for user_id in pk_set:
+            cache.invalidate_user(user_id)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, action, **kwargs):
+    if action.startswith("post_"):
+        get_permission_cache().invalidate_all()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def permission_rows_changed(sender, **kwargs):
+    get_permission_cache().invalidate_all()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, created=False, update_fields=None, **kwargs):
+    """
+    Superusers have every permission, so a change of `is_superuser` (or
+    a save that may include it) is an invalidation.
+    """
+    if created:
+        return
+    if update_fields is None or "is_superuser" in update_fields:
+        get_permission_cache().invalidate_user(instance.pk)
+
+
+class CachedPermissionBackend(ModelBackend):
+    """
+    `ModelBackend` with the permission lookups served from the
+    permission cache. Authentication is unchanged.
+    """
+
+    def get_permission_set(self, user_obj):
+        """
+        The user's `PermissionSet`, kept on the object for its lifetime
+        like `ModelBackend` does, so a request reads the cache once.
+        """
+        if not hasattr(user_obj, "_permission_set"):
+            user_obj._permission_set = get_permission_cache().get(user_obj.pk)
+        return user_obj._permission_set
+
+    def get_user_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return self.get_permission_set(user_obj).user
+
+    def get_group_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return self.get_permission_set(user_obj).group
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return self.get_permission_set(user_obj).all
@@ -0,0 +1,141 @@
+# Import the core libraries and functions
+import logging
+import threading
+import time
+
+from django.core.signals import request_started
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Import the used database tables
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from accounts.models import RevokedToken
+
+from accounts.conf import accounts_settings
+
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------------
+# Removes token rows that can no longer matter. An expired refresh
+# token fails verification before the blacklist is ever asked, so its
+# `OutstandingToken`, `BlacklistedToken` and `RevokedToken` rows can
+# go. Rows are deleted in short batches, one transaction each, so no
+# lock is held for long and other writers can run in between. Tables
+# are pruned child first, so the cascades find nothing left to delete.
+# ----------------------------------------------------------------
+
+class PruneResult:
+    """
+    Outcome of a prune: rows deleted per table and the time it took.
+    """
+
+    def __init__(self):
+        self.deleted = {}
+        self.seconds = 0.0
+
+    @property
+    def total(self):
+        return sum(self.deleted.values())
+
+    @property
+    def rows_per_second(self):
+        return self.total / max(self.seconds, 1e-6)
+
+
+def prune_queryset(queryset, batch_size, pause=0):
+    """
+    Deletes every row of `queryset` in batches of `batch_size` primary
+    keys, sleeping `pause` seconds between batches. Returns the number
+    of rows deleted.
+    """
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return deleted
+            total, per_model = queryset.model.objects.filter(pk__in=pks).delete()
+            deleted += per_model.get(queryset.model._meta.label, 0)
+        if len(pks) < batch_size:
+            return deleted
+        if pause:
+            time.sleep(pause)
+
+
+def prune_expired_tokens(batch_size=None, pause=None, now=None):
+    """
+    Deletes the token rows that expired before `now` from both blacklist
+    storages. Returns a `PruneResult`.
+    """
+    if batch_size is None:
+        batch_size = accounts_settings.TOKEN_PRUNE_BATCH_SIZE
+    if pause is None:
+        pause = accounts_settings.TOKEN_PRUNE_PAUSE
+    if now is None:
+        now = timezone.now()
+
+    result = PruneResult()
+    start = time.perf_counter()
+
+    querysets = (
+        ("blacklisted", BlacklistedToken.objects.filter(token__expires_at__lt=now)),
+        ("outstanding", OutstandingToken.objects.filter(expires_at__lt=now)),
+        ("revoked", RevokedToken.objects.filter(expires_at__lt=now)),
+    )
+    for name, queryset in querysets:
+        result.deleted[name] = prune_queryset(queryset, batch_size, pause)
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+class PruneScheduler:
+    """
+    Daemon thread running `prune_expired_tokens()` every `interval`
+    seconds inside the server process.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self.run, name="accounts-prune-tokens", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                prune_expired_tokens()
+            except Exception:
+                # A failed prune is retried on the next tick, but a prune
+                # that always fails must still be noticed
+                logger.exception("Pruning expired tokens failed, retrying in %ss.", self.interval)
+            finally:
+                connection.close()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_scheduler(**kwargs):
+    """
+    Starts the prune scheduler if `TOKEN_PRUNE_INTERVAL` is set. Hooked to
+    `request_started`, so management commands never start it.
+    """
+    global _scheduler
+
+    interval = accounts_settings.TOKEN_PRUNE_INTERVAL
+    if interval is None or _scheduler is not None:
+        return
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PruneScheduler(interval)
+            _scheduler.start()
+    request_started.disconnect(dispatch_uid="accounts.pruning.start_scheduler")
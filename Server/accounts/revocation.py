@@ -0,0 +1,105 @@
+# Import the core libraries and functions
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+
+# Import the used database tables
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from accounts.authentication import get_verified_token_cache
+from accounts.blacklist import record_blacklisted_many
+from accounts.conf import accounts_settings
+from accounts.token_versions import bump_token_versions
+
+
+# ----------------------------------------------------------------
+# Revokes every token of a set of users, for a compromised account or
+# a whole cohort. Their `token_version` is bumped with one UPDATE,
+# which refuses their access and refresh tokens at once (see
+# `accounts.token_versions`). With simplejwt storage, the unexpired
+# `OutstandingToken` rows without a blacklist entry are then
+# blacklisted too, so the blacklist tables stay the record of revoked
+# tokens. They are read by primary key in batches, and each batch is
+# blacklisted with one bulk insert: two queries per `batch_size`
+# tokens, without building a token object per row.
+# ----------------------------------------------------------------
+
+class RevokeResult:
+    """
+    Outcome of a revocation: users whose token version was bumped,
+    tokens blacklisted and the time it took.
+    """
+
+    def __init__(self):
+        self.users = 0
+        self.revoked = 0
+        self.seconds = 0.0
+
+
+def revoke_user_tokens(user_ids=None, batch_size=None):
+    """
+    Revokes every token of `user_ids`, or of every user when it is None.
+    Returns a `RevokeResult`. For every user, raising `TOKEN_EPOCH` is
+    the cheaper option. With compact storage, which doesn't record the
+    tokens it issues, it is the only one.
+    """
+    if user_ids is None and accounts_settings.BLACKLIST_STORAGE == "compact":
+        raise ImproperlyConfigured(
+            "Compact storage doesn't record the tokens it issues. "
+            "Raise ACCOUNTS['TOKEN_EPOCH'] to revoke every token instead."
+        )
+    if batch_size is None:
+        batch_size = accounts_settings.TOKEN_REVOKE_BATCH_SIZE
+
+    result = RevokeResult()
+    start = time.perf_counter()
+
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        result.users = bump_token_versions(user_ids)
+
+    if accounts_settings.BLACKLIST_STORAGE != "compact":
+        result.revoked = blacklist_outstanding(user_ids, batch_size)
+
+    cache = get_verified_token_cache()
+    if user_ids is None:
+        cache.clear()
+    else:
+        for user_id in user_ids:
+            cache.evict_user(user_id)
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def blacklist_outstanding(user_ids, batch_size):
+    """
+    Blacklists the unexpired outstanding refresh tokens of `user_ids`
+    (every user when None). Returns how many there were.
+    """
+    queryset = OutstandingToken.objects.filter(expires_at__gt=timezone.now(), blacklistedtoken__isnull=True)
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    queryset = queryset.order_by("pk").values_list("pk", "jti", "expires_at")
+
+    revoked = 0
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not rows:
+            return revoked
+        last_pk = rows[-1][0]
+
+        with transaction.atomic():
+            # A token blacklisted since the read is skipped by the unique `token` column
+            BlacklistedToken.objects.bulk_create(
+                [BlacklistedToken(token_id=pk) for pk, jti, expires_at in rows],
+                ignore_conflicts=True,
+            )
+        record_blacklisted_many({jti: expires_at.timestamp() for pk, jti, expires_at in rows})
+        revoked += len(rows)
+
+        if len(rows) < batch_size:
+            return revoked
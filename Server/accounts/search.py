@@ -0,0 +1,36 @@
+# Import the core libraries and functions
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+
+# Fields searched by `/accounts/users/` and the admin. Each has a
+# `Lower(...)` index or unique constraint on `User`. The display name starts
+# with the username, so it covers the username and "username | first last".
+# First and last names are searched on their own too.
+SEARCH_FIELDS = ("email", "display_name", "first_name", "last_name")
+
+
+def prefix_range(prefix):
+    """
+    Returns the `[low, high)` range holding every lowercase string that
+    starts with `prefix`.
+    """
+    low = prefix.lower()
+    return low, low[:-1] + chr(ord(low[-1]) + 1)
+
+
+def prefix_search(queryset, term, fields=SEARCH_FIELDS):
+    """
+    Case-insensitive prefix search of `term` over `fields`. Written as a
+    range on `LOWER(field)` rather than `LIKE`, so every database can
+    answer it from the expression indexes.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+
+    low, high = prefix_range(term)
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f"{field}_lower__gte": low, f"{field}_lower__lt": high})
+    return queryset.alias(**{f"{field}_lower": Lower(field) for field in fields}).filter(condition)
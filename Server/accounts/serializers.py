@@ -1,27 +1,81 @@
 # Import the core libraries and functions
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
 # Import the used database tables
 from accounts.models import User
 from django.contrib.auth.models import Group
 
+# Import the token classes
+from accounts.tokens import RefreshToken, USER_CLAIMS
+
+from accounts.compiled import CompiledSerializerMixin
+from accounts.conf import accounts_settings
+from accounts.instrumentation import TimedSerializerMixin
+from accounts.token_versions import is_current, is_token_current
+
 
 # Serialize the `User` table.
 # Used to pass user information during the login process
-class UserSerializer(serializers.HyperlinkedModelSerializer):
+class UserSerializer(TimedSerializerMixin, CompiledSerializerMixin, serializers.HyperlinkedModelSerializer):
+    # Stored on the row, nothing to compute
+    full_name = serializers.CharField(source="display_name", read_only=True)
+
     class Meta:
         model = User
         fields = ["id", "username", "email", "first_name", "last_name", "full_name",]
 
 
+# Serialize users for the staff user list. The `fields` argument
+# picks which of the fields to render.
+class UserListSerializer(TimedSerializerMixin, CompiledSerializerMixin, serializers.ModelSerializer):
+    full_name = serializers.CharField(source="display_name", read_only=True)
+
+    class Meta:
+        model = User
+        fields = ["id", "username", "email", "first_name", "last_name", "full_name", "is_active", "is_staff", "date_joined",]
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selected_fields = fields
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.selected_fields is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in self.selected_fields}
+
+
 # Serialize the `Group` table.
-class GroupSerializer(serializers.HyperlinkedModelSerializer):
+class GroupSerializer(TimedSerializerMixin, CompiledSerializerMixin, serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Group
         fields = ["url", "name"]
 
 
-class RegistrationSerializer(serializers.ModelSerializer):
+def insert_user(instance):
+    """
+    Saves a new user in one INSERT, with no uniqueness queries up front.
+    When the case-insensitive unique indexes refuse it, one query finds
+    the taken fields and they are raised as a `ValidationError`.
+    """
+    try:
+        with transaction.atomic():
+            instance.save(force_insert=True)
+    except IntegrityError:
+        errors = User.objects.unique_errors(instance.email, instance.username)
+        # Not a uniqueness problem after all
+        if not errors:
+            raise
+        raise serializers.ValidationError(errors)
+    return instance
+
+
+class RegistrationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Currently unused in preference of the below.
     """
@@ -44,6 +98,95 @@ class RegistrationSerializer(serializers.ModelSerializer):
         if password is not None:
             # Call the method to encrypt the password and set it into the object
             instance.set_password(password)
-        # Save the new user
-        instance.save()
-        return instance
\ No newline at end of file
+        # Save the new user. Duplicates are left to the unique indexes.
+        return insert_user(instance)
+
+
+class BulkRegistrationSerializer(RegistrationSerializer):
+    """
+    Validates one row of a bulk registration. Only checks the row itself,
+    uniqueness is checked for a whole batch at once in `accounts.bulk`.
+    """
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default="")
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default="")
+
+    class Meta(RegistrationSerializer.Meta):
+        fields = ("email", "username", "password", "first_name", "last_name",)
+
+
+# Checks the shape of a login request. Used by the async login view,
+# which checks the credentials itself.
+class LoginSerializer(serializers.Serializer):
+    email = serializers.CharField()
+    password = serializers.CharField(write_only=True)
+
+
+class RevokeTokensSerializer(serializers.Serializer):
+    users = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+
+
+class TokenIntrospectionSerializer(serializers.Serializer):
+    tokens = serializers.ListField(child=serializers.CharField(trim_whitespace=False), allow_empty=False)
+
+    def validate_tokens(self, value):
+        """
+        Batches are capped at `ACCOUNTS['INTROSPECTION_MAX_BATCH']` tokens.
+        """
+        limit = accounts_settings.INTROSPECTION_MAX_BATCH
+        if len(value) > limit:
+            raise serializers.ValidationError(_("At most {limit} tokens per request.").format(limit=limit))
+        return value
+
+
+# Issues token pairs using the `accounts` refresh token, so every
+# blacklist check goes through the cache layer.
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        """
+        Rotates the refresh token and refreshes its user claims. Instead of asking the database whether
+        the token is blacklisted and then blacklisting it, the token is
+        blacklisted straight away: if the row already existed, the token
+        was used before and is rejected. This saves a query and closes the
+        race where two requests rotate the same token.
+        """
+        if not (jwt_settings.ROTATE_REFRESH_TOKENS and jwt_settings.BLACKLIST_AFTER_ROTATION):
+            if not is_token_current(self.token_class(attrs["refresh"]).payload):
+                raise TokenError(_("Token has been revoked"))
+            return super().validate(attrs)
+
+        refresh = self.token_class(attrs["refresh"], lookup_blacklist=False)
+
+        # Copy current user details into the new tokens, so claim-backed
+        # users never run more than one refresh behind the database
+        claims = (
+            User.objects
+            .filter(**{jwt_settings.USER_ID_FIELD: refresh[jwt_settings.USER_ID_CLAIM]})
+            .values(*USER_CLAIMS)
+            .first()
+        )
+        if claims is None or not claims["is_active"]:
+            raise TokenError(_("User is inactive"))
+        # Checked against the row itself, the new tokens take its version
+        if not is_current(refresh.payload, claims["token_version"]):
+            raise TokenError(_("Token has been revoked"))
+        refresh.set_user_claims(claims)
+
+        data = {"access": str(refresh.access_token)}
+
+        blacklisted_token, created = refresh.blacklist()
+        if not created:
+            raise TokenError(_("Token is blacklisted"))
+
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+
+        data["refresh"] = str(refresh)
+
+        return data
@@ -0,0 +1,124 @@
+import json
+from asgiref.sync import sync_to_async
+from django.test import AsyncRequestFactory, TestCase
+from accounts.async_views import (
+    AsyncBlacklistTokenView, AsyncCurrentUser, AsyncRegisterUser, AsyncTokenObtainPairView, AsyncTokenRefreshView,
+)
+from accounts.models import User
+from accounts.tests.test_models import CreateUser
+from accounts.throttling import get_throttle_store
+
+
+class AsyncViewsTestCase(TestCase):
+    def setUp(self) -> None:
+        get_throttle_store().clear()
+        self.factory = AsyncRequestFactory()
+        return super().setUp()
+
+    async def post(self, view, data):
+        """
+        Posts JSON data straight to an async view
+        """
+        request = self.factory.post("/", data=json.dumps(data), content_type="application/json")
+        response = await view.as_view()(request)
+        return response.status_code, json.loads(response.content)
+
+    async def log_in(self):
+        """
+        Creates a user and logs it in through the async view
+        """
+        u = CreateUser(username="Test", email="test@example.com", password="password123!")
+        await sync_to_async(u.create_user)()
+        status_code, data = await self.post(AsyncTokenObtainPairView, dict(email=u.email, password=u.password))
+        return u, data
+
+    async def test_async_log_in(self):
+        """
+        The async login returns a token pair for valid credentials
+        """
+        u = CreateUser(username="Test", email="test@example.com", password="password123!")
+        await sync_to_async(u.create_user)()
+
+        status_code, data = await self.post(AsyncTokenObtainPairView, dict(email=u.email, password=u.password))
+
+        self.assertEqual(status_code, 200, f"Login status_code not 200. Got {status_code} instead.")
+        self.assertRegex(data["access"], r"^[\w-]*\.[\w-]*\.[\w-]*$", f"Unexpected JWT access token. Got {data['access']}")
+        self.assertRegex(data["refresh"], r"^[\w-]*\.[\w-]*\.[\w-]*$", f"Unexpected JWT refresh token. Got {data['refresh']}")
+
+    async def test_async_log_in_bad_password(self):
+        """
+        The async login refuses a bad password with the DRF error message
+        """
+        u = CreateUser(username="Test", email="test@example.com", password="password123!")
+        await sync_to_async(u.create_user)()
+
+        status_code, data = await self.post(AsyncTokenObtainPairView, dict(email=u.email, password="bad_password"))
+
+        self.assertEqual(status_code, 401, f"Login status_code not 401. Got {status_code} instead.")
+        self.assertEqual(
+            data["detail"].title(),
+            "No Active Account Found With The Given Credentials",
+            "Login error message does not match",
+        )
+
+    async def test_async_register(self):
+        """
+        The async registration creates a user with a hashed password
+        """
+        status_code, data = await self.post(
+            AsyncRegisterUser,
+            dict(email="test@example.com", username="Test", password="password123!"),
+        )
+
+        self.assertEqual(status_code, 201, f"Register status_code not 201. Got {status_code} instead.")
+        self.assertEqual(data, {"email": "test@example.com", "username": "Test"}, "Registration data mis-match")
+        user = await User.objects.aget(username="Test")
+        self.assertTrue(await sync_to_async(user.check_password)("password123!"), "Password not hashed")
+
+    async def test_async_register_duplicate(self):
+        """
+        The async registration reports a taken email, in any case, as a field error
+        """
+        data = dict(email="test@example.com", username="Test", password="password123!")
+        await self.post(AsyncRegisterUser, data)
+        status_code, errors = await self.post(AsyncRegisterUser, dict(data, email="TEST@example.com", username="Other"))
+
+        self.assertEqual(status_code, 400, f"Register status_code not 400. Got {status_code} instead.")
+        self.assertEqual(errors, {"email": ["user with this email address already exists."]}, "Errors mis-match")
+
+    async def test_async_current_user(self):
+        """
+        The async current user view answers from the token claims
+        """
+        u, tokens = await self.log_in()
+
+        request = self.factory.get("/", AUTHORIZATION=f"JWT {tokens['access']}")
+        response = await AsyncCurrentUser.as_view()(request)
+        data = json.loads(response.content)
+
+        self.assertEqual(response.status_code, 200, f"User status_code not 200. Got {response.status_code} instead.")
+        self.assertEqual(data["username"], "Test", "Username mis-match")
+        self.assertEqual(data["full_name"], "Test", "Full name mis-match")
+
+        response = await AsyncCurrentUser.as_view()(self.factory.get("/"))
+        self.assertEqual(response.status_code, 401, f"User status_code not 401. Got {response.status_code} instead.")
+
+    async def test_async_refresh_and_logout(self):
+        """
+        The async refresh rotates the token, and the async logout blacklists it
+        """
+        u, tokens = await self.log_in()
+
+        status_code, data = await self.post(AsyncTokenRefreshView, dict(refresh=tokens["refresh"]))
+        self.assertEqual(status_code, 200, f"Refresh status_code not 200. Got {status_code} instead.")
+
+        status_code, reused = await self.post(AsyncTokenRefreshView, dict(refresh=tokens["refresh"]))
+        self.assertEqual(status_code, 401, f"Reused refresh status_code not 401. Got {status_code} instead.")
+        self.assertEqual(reused["code"], "token_not_valid", "Refresh error code does not match")
+
+        request = self.factory.post("/", data=json.dumps(dict(refresh_token=data["refresh"])), content_type="application/json")
+        response = await AsyncBlacklistTokenView.as_view()(request)
+        self.assertEqual(response.status_code, 205, f"Logout status code not 205. Got {response.status_code} instead.")
+
+        status_code, data = await self.post(AsyncTokenRefreshView, dict(refresh=data["refresh"]))
+        self.assertEqual(status_code, 401, f"Refresh after logout status_code not 401. Got {status_code} instead.")
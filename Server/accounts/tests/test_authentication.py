@@ -0,0 +1,121 @@
+from unittest import mock
+from django.test import TestCase
+from accounts.authentication import VerifiedTokenJWTAuthentication, get_verified_token_cache
+from accounts.tests.test_views import CreateCustomerViews
+from accounts.token_versions import get_token_version_cache
+from accounts.views import CurrentUserViewSet
+
+
+class ClaimsAuthenticationTestCase(TestCase):
+    def setUp(self) -> None:
+        get_token_version_cache().clear()
+        return super().setUp()
+
+    def test_current_user_without_query(self):
+        """
+        The current user is answered from the token claims alone, once their token version is cached
+        """
+        u = CreateCustomerViews(username="Test", email="test@example.com", password="password123!")
+        u.login()
+
+        # The first request loads the token version
+        with self.assertNumQueries(1):
+            u.client.get(path="/accounts/user/")
+        with self.assertNumQueries(0):
+            response = u.client.get(path="/accounts/user/")
+
+        self.assertEqual(
+            response.status_code,
+            200,
+            f"User status_code not 200. Got {response.status_code} instead.",
+        )
+        self.assertEqual(response.data["id"], u.user.id, "User ID mis-match")
+        self.assertEqual(response.data["username"], "Test", "Username mis-match")
+        self.assertEqual(response.data["email"], "test@example.com", "Email mis-match")
+        self.assertEqual(response.data["full_name"], u.user.full_name(), "Full name mis-match")
+
+    def test_current_user_requires_token(self):
+        """
+        The current user endpoint is closed to anonymous requests
+        """
+        u = CreateCustomerViews()
+        response = u.client.get(path="/accounts/user/")
+
+        self.assertEqual(
+            response.status_code,
+            401,
+            f"User status_code not 401. Got {response.status_code} instead.",
+        )
+
+    def test_refresh_rejects_inactive_user(self):
+        """
+        Deactivated users can no longer refresh their claims
+        """
+        u = CreateCustomerViews()
+        u.login()
+        u.user.is_active = False
+        u.user.save()
+
+        response = u.client.post(
+            path="/accounts/token/refresh/",
+            data=dict(refresh=u.refresh_token),
+        )
+
+        self.assertEqual(
+            response.status_code,
+            401,
+            f"Refresh status_code not 401. Got {response.status_code} instead.",
+        )
+
+
+class VerifiedTokenCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        # DRF reads the authentication classes when the view is defined
+        patcher = mock.patch.object(CurrentUserViewSet, "authentication_classes", (VerifiedTokenJWTAuthentication,))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        get_verified_token_cache().clear()
+        return super().setUp()
+
+    def test_repeated_token_hits_cache(self):
+        """
+        The second request with the same access token is a cache hit
+        """
+        u = CreateCustomerViews()
+        u.login()
+
+        for _ in range(3):
+            response = u.client.get(path="/accounts/user/")
+            self.assertEqual(response.status_code, 200, f"User status_code not 200. Got {response.status_code} instead.")
+
+        stats = get_verified_token_cache().stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1), f"Unexpected hit/miss counts. Got {stats}")
+
+    def test_bad_token_not_cached(self):
+        """
+        Tokens that fail verification never enter the cache
+        """
+        u = CreateCustomerViews()
+        u.login()
+        u.client.defaults["HTTP_AUTHORIZATION"] = f"JWT {u.access_token[:-2]}xx"
+
+        for _ in range(2):
+            response = u.client.get(path="/accounts/user/")
+            self.assertEqual(response.status_code, 401, f"User status_code not 401. Got {response.status_code} instead.")
+        self.assertEqual(get_verified_token_cache().stats()["entries"], 0, "Invalid token was cached")
+
+    def test_logout_evicts_tokens(self):
+        """
+        Logging out drops the user's cached access tokens
+        """
+        u = CreateCustomerViews()
+        u.login()
+        u.client.get(path="/accounts/user/")
+
+        u.logout()
+        self.assertEqual(u.logout_response.status_code, 205, "Logout failed")
+        u.client.get(path="/accounts/user/")
+
+        stats = get_verified_token_cache().stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (0, 2), f"Token still cached after logout. Got {stats}")
+        self.assertEqual(stats["evictions"], 1, "Logout eviction not counted")
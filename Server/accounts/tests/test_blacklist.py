@@ -0,0 +1,84 @@
+from django.test import TestCase
+from accounts.blacklist import get_blacklist_cache
+from accounts.tests.test_views import CreateCustomerViews
+
+
+class BlacklistCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        get_blacklist_cache().clear()
+        return super().setUp()
+
+    def refresh(self, u, refresh_token):
+        """
+        Posts a refresh token to the refresh endpoint
+        """
+        return u.client.post(
+            path="/accounts/token/refresh/",
+            data=dict(refresh=refresh_token),
+        )
+
+    def test_refresh_rotates_token(self):
+        """
+        Refreshing returns a new refresh token and blacklists the old one
+        """
+        u = CreateCustomerViews()
+        u.login()
+
+        response = self.refresh(u, u.refresh_token)
+
+        self.assertEqual(
+            response.status_code,
+            200,
+            f"Refresh status_code not 200. Got {response.status_code} instead.",
+        )
+        self.assertNotEqual(response.data["refresh"], u.refresh_token, "Refresh token was not rotated")
+
+    def test_reused_refresh_token_rejected(self):
+        """
+        A refresh token can only be used once when tokens rotate
+        """
+        u = CreateCustomerViews()
+        u.login()
+
+        self.refresh(u, u.refresh_token)
+        response = self.refresh(u, u.refresh_token)
+
+        self.assertEqual(
+            response.status_code,
+            401,
+            f"Reused refresh status_code not 401. Got {response.status_code} instead.",
+        )
+
+    def test_logout_blacklists_without_query(self):
+        """
+        After logout the refresh token is refused from the cache alone
+        """
+        u = CreateCustomerViews()
+        u.login()
+        u.logout()
+
+        with self.assertNumQueries(0):
+            response = self.refresh(u, u.refresh_token)
+
+        self.assertEqual(
+            response.status_code,
+            401,
+            f"Blacklisted refresh status_code not 401. Got {response.status_code} instead.",
+        )
+
+    def test_uncached_blacklist_falls_back_to_database(self):
+        """
+        An empty cache still finds blacklisted tokens in the database
+        """
+        u = CreateCustomerViews()
+        u.login()
+        u.logout()
+        get_blacklist_cache().clear()
+
+        response = self.refresh(u, u.refresh_token)
+
+        self.assertEqual(
+            response.status_code,
+            401,
+            f"Blacklisted refresh status_code not 401. Got {response.status_code} instead.",
+        )
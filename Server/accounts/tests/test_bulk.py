@@ -0,0 +1,82 @@
+import io
+import json
+from django.test import TestCase
+from accounts.bulk import bulk_register, iter_records
+from accounts.models import User
+from accounts.tests.test_views import CreateCustomerViews
+
+
+class BulkRegistrationTestCase(TestCase):
+    def test_bulk_register_reports_bad_rows(self):
+        """
+        Valid rows are created while invalid and duplicate rows are reported
+        """
+        CreateCustomerViews(username="Taken", email="taken@example.com", password="password123!").create_user()
+        records = [
+            dict(email="one@example.com", username="One", password="password123!"),
+            dict(email="not-an-email", username="Two", password="password123!"),
+            dict(email="taken@example.com", username="Three", password="password123!"),
+            dict(email="four@example.com", username="One", password="password123!"),
+            dict(email="five@example.com", username="Five", password="password123!", first_name="Fifth"),
+        ]
+
+        result = bulk_register(records, batch_size=2, workers=0)
+
+        self.assertEqual(result.created, 2, "Created count mis-match")
+        self.assertEqual([e["row"] for e in result.errors], [2, 3, 4], "Failed rows mis-match")
+        self.assertIn("email", result.errors[0]["errors"], "Invalid email not reported")
+        self.assertIn("email", result.errors[1]["errors"], "Existing email not reported")
+        self.assertIn("username", result.errors[2]["errors"], "Duplicate username not reported")
+        self.assertTrue(User.objects.get(username="Five").check_password("password123!"), "Password not hashed")
+
+    def test_iter_records_ndjson(self):
+        """
+        NDJSON lines are parsed one by one and bad lines are kept as errors
+        """
+        stream = io.StringIO('{"username": "One"}\n\nnot json\n{"username": "Two"}\n')
+        records = list(iter_records(stream))
+
+        self.assertEqual(records[0], {"username": "One"}, "First record mis-match")
+        self.assertIsInstance(records[1], ValueError, "Bad line not reported")
+        self.assertEqual(records[2], {"username": "Two"}, "Last record mis-match")
+
+    def test_bulk_register_view_bad_body(self):
+        """
+        Lines that are not UTF-8 are reported as rows and an unreadable array is a 400
+        """
+        admin = CreateCustomerViews()
+        admin.create_or_set_admin()
+        admin.login()
+
+        body = b'\xff\xfe\n' + json.dumps(dict(email="u@example.com", username="u", password="password123!")).encode()
+        response = admin.client.post("/accounts/register/bulk/", data=body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 201, f"Bulk status_code not 201. Got {response.status_code} instead.")
+        self.assertEqual(response.data["created"], 1, "Created count mis-match")
+        self.assertEqual([e["row"] for e in response.data["errors"]], [1], "Failed rows mis-match")
+
+        response = admin.client.post("/accounts/register/bulk/", data=b'[{"email": \xff]', content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 400, f"Bulk status_code not 400. Got {response.status_code} instead.")
+
+        # A JSON body must be a list of users
+        for body in ('{"email": "u@example.com"}', "5", '"users"', "null"):
+            response = admin.client.post("/accounts/register/bulk/", data=body, content_type="application/json")
+            self.assertEqual(response.status_code, 400, f"Bulk status_code for {body} not 400. Got {response.status_code} instead.")
+
+    def test_bulk_register_view_staff_only(self):
+        """
+        Only staff members can register users in bulk
+        """
+        body = "\n".join(json.dumps(dict(email=f"u{i}@example.com", username=f"u{i}", password="password123!")) for i in range(3))
+
+        u = CreateCustomerViews()
+        u.login()
+        response = u.client.post("/accounts/register/bulk/", data=body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 403, f"Bulk status_code not 403. Got {response.status_code} instead.")
+
+        admin = CreateCustomerViews()
+        admin.create_or_set_admin()
+        admin.login()
+        with self.settings(ACCOUNTS={"BULK_REGISTER_WORKERS": 0}):
+            response = admin.client.post("/accounts/register/bulk/", data=body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 201, f"Bulk status_code not 201. Got {response.status_code} instead.")
+        self.assertEqual(response.data["created"], 3, "Created count mis-match")
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from accounts.models import User
+from accounts.serializers import GroupSerializer, UserListSerializer, UserSerializer
+from accounts.tests.test_views import CreateCustomerViews
+
+
+SLOW = override_settings(ACCOUNTS=dict(settings.ACCOUNTS, FAST_SERIALIZERS=False))
+
+
+class CompiledSerializerTestCase(TestCase):
+    def setUp(self) -> None:
+        User.objects.create_user(email="one@example.com", username="One", password="password123!")
+        User.objects.create_user(email="two@example.com", username="Two", password="password123!", first_name="Second")
+        User.objects.create_user(email="three@example.com", username="Three", password="password123!", last_name="Third")
+        return super().setUp()
+
+    def test_same_output(self):
+        """
+        Compiled plans render users exactly like DRF does
+        """
+        for serializer_class in (UserSerializer, UserListSerializer):
+            users = list(User.objects.order_by("email"))
+            fast = serializer_class(users, many=True).data
+            with SLOW:
+                slow = serializer_class(users, many=True).data
+
+            self.assertEqual(fast, slow, f"{serializer_class.__name__} output mis-match")
+            self.assertEqual(fast[0]["full_name"], str(users[0]), "Full name mis-match")
+
+    def test_values_rows(self):
+        """
+        `values()` rows render the same as the users they come from
+        """
+        for fields in (None, ["id", "full_name", "date_joined"]):
+            queryset = User.objects.order_by("email")
+            with SLOW:
+                expected = UserListSerializer(queryset, many=True, fields=fields).data
+
+            rows = queryset.values(*UserListSerializer.values_columns(fields))
+            with self.assertNumQueries(1):
+                rendered = UserListSerializer.render_values(rows, fields)
+            self.assertEqual(rendered, expected, f"Values output mis-match for {fields}")
+
+    def test_group_plan(self):
+        """
+        The group serializer's hyperlink is compiled too
+        """
+        plan = GroupSerializer.get_plan()
+        self.assertEqual(plan.names, ["url", "name"], "Group fields mis-match")
+        self.assertEqual(plan.values_columns(), ["pk", "name"], "Group columns mis-match")
+
+    def test_user_list_fallback(self):
+        """
+        The user list renders the same pages with the fast serializers off
+        """
+        admin = CreateCustomerViews()
+        admin.create_or_set_admin()
+        admin.login()
+
+        fast = admin.client.get(path="/accounts/users/?fields=id,full_name,is_staff").data
+        with SLOW:
+            slow = admin.client.get(path="/accounts/users/?fields=id,full_name,is_staff").data
+        self.assertEqual(fast["results"], slow["results"], "User list mis-match")
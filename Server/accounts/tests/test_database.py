@@ -0,0 +1,68 @@
+import os
+import tempfile
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+from core.database import SQLITE_PRAGMAS, database_from_environment
+
+
+class DatabaseProfileTestCase(SimpleTestCase):
+    def test_sqlite_profile(self):
+        """
+        Without an engine, the tuned SQLite backend is used with persistent connections
+        """
+        database = database_from_environment({}, "default.sqlite3")
+        self.assertEqual(database["ENGINE"], "core.db.sqlite3", "Engine mis-match")
+        self.assertEqual(database["NAME"], "default.sqlite3", "Default name mis-match")
+        self.assertEqual(database["CONN_MAX_AGE"], 600, "CONN_MAX_AGE mis-match")
+        self.assertEqual(database["OPTIONS"], {"pragmas": SQLITE_PRAGMAS}, "Options mis-match")
+
+        database = database_from_environment({"DATABASE_NAME": "other.sqlite3", "DATABASE_CONN_MAX_AGE": "0"}, "default.sqlite3")
+        self.assertEqual(database["NAME"], "other.sqlite3", "Name mis-match")
+        self.assertEqual(database["CONN_MAX_AGE"], 0, "CONN_MAX_AGE mis-match")
+
+    def test_postgresql_profile(self):
+        """
+        `DATABASE_ENGINE=postgresql` reads the connection from the environment
+        """
+        environ = {
+            "DATABASE_ENGINE": "postgresql",
+            "DATABASE_NAME": "accounts",
+            "DATABASE_USER": "server",
+            "DATABASE_PASSWORD": "secret",
+            "DATABASE_HOST": "db.internal",
+            "DATABASE_PORT": "5432",
+            "DATABASE_CONN_MAX_AGE": "60",
+        }
+        database = database_from_environment(environ)
+        self.assertEqual(database["ENGINE"], "django.db.backends.postgresql", "Engine mis-match")
+        self.assertEqual(
+            (database["NAME"], database["USER"], database["PASSWORD"], database["HOST"], database["PORT"]),
+            ("accounts", "server", "secret", "db.internal", "5432"),
+            "Connection mis-match",
+        )
+        self.assertEqual(database["CONN_MAX_AGE"], 60, "CONN_MAX_AGE mis-match")
+        self.assertTrue(database["CONN_HEALTH_CHECKS"], "Health checks off")
+        self.assertEqual(database["OPTIONS"], {"connect_timeout": 5}, "Options mis-match")
+        self.assertNotIn("DISABLE_SERVER_SIDE_CURSORS", database, "Server-side cursors disabled without a pooler")
+
+        database = database_from_environment(dict(environ, DATABASE_POOLER="pgbouncer"))
+        self.assertTrue(database["DISABLE_SERVER_SIDE_CURSORS"], "Server-side cursors kept behind PgBouncer")
+
+    def test_sqlite_pragmas(self):
+        """
+        The SQLite backend runs its PRAGMAs on every new connection
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            name = os.path.join(directory, "pragmas.sqlite3")
+            connection = ConnectionHandler({"default": database_from_environment({}, name)})["default"]
+            try:
+                with connection.cursor() as cursor:
+                    values = {}
+                    for pragma in ("journal_mode", "synchronous", "busy_timeout", "temp_store"):
+                        cursor.execute(f"PRAGMA {pragma}")
+                        values[pragma] = cursor.fetchone()[0]
+            finally:
+                connection.close()
+
+        # synchronous NORMAL is 1, temp_store MEMORY is 2
+        self.assertEqual(values, {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000, "temp_store": 2}, "PRAGMAs mis-match")
@@ -0,0 +1,69 @@
+import io
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from accounts.models import User
+from accounts.throttling import get_throttle_store
+
+
+def profile_settings(profile, **profiles):
+    """
+    `ACCOUNTS` with cheap hasher profiles, `profile` active
+    """
+    profiles = dict(
+        cheap={"algorithm": "pbkdf2_sha256", "iterations": 1000},
+        scrypt={"algorithm": "scrypt", "work_factor": 2 ** 10, "block_size": 8, "parallelism": 1},
+        **profiles,
+    )
+    return dict(settings.ACCOUNTS, PASSWORD_HASHER_PROFILES=profiles, PASSWORD_HASHER_PROFILE=profile)
+
+
+class HasherProfileTestCase(TestCase):
+    def setUp(self) -> None:
+        get_throttle_store().clear()
+        with override_settings(ACCOUNTS=profile_settings("cheap")):
+            self.user = User.objects.create_user(email="test@example.com", username="Test", password="password123!")
+        return super().setUp()
+
+    def log_in(self):
+        return Client().post(path="/accounts/token/", data=dict(email="test@example.com", password="password123!"))
+
+    def test_profile_sets_cost(self):
+        """
+        New hashes use the active profile's algorithm and parameters
+        """
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"), "Profile iterations not used")
+
+        with override_settings(ACCOUNTS=profile_settings("scrypt")):
+            self.user.set_password("password123!")
+        self.assertTrue(self.user.password.startswith("scrypt$1024$"), "Profile algorithm not used")
+
+    def test_login_rehashes(self):
+        """
+        Logging in with a hash from another profile upgrades it, a current one is left alone
+        """
+        with override_settings(ACCOUNTS=profile_settings("cheap")):
+            self.assertEqual(self.log_in().status_code, 200, "Login failed")
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"), "Current hash replaced")
+
+        with override_settings(ACCOUNTS=profile_settings("scrypt")):
+            self.assertEqual(self.log_in().status_code, 200, "Login failed")
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith("scrypt$1024$"), "Hash not upgraded")
+            self.assertEqual(self.log_in().status_code, 200, "Login with upgraded hash failed")
+
+    def test_password_hashes_command(self):
+        """
+        The report counts users per algorithm and parameters
+        """
+        User.objects.create(email="other@example.com", username="Other", password=make_password(None))
+        stdout = io.StringIO()
+        with override_settings(ACCOUNTS=profile_settings("scrypt")):
+            call_command("password_hashes", stdout=stdout)
+        lines = stdout.getvalue().splitlines()
+
+        self.assertEqual(lines[0], "Profile: scrypt. Users: 2.", "Summary mis-match")
+        self.assertRegex(stdout.getvalue(), r"pbkdf2_sha256\s+1\s+50.0%\s+upgraded at next login\s+iterations=1000")
+        self.assertRegex(stdout.getvalue(), r"unusable\s+1\s+50.0%\s+no login")
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from accounts.metrics import registry
+from accounts.tests.test_views import CreateCustomerViews
+from accounts.token_versions import get_token_version_cache
+
+
+@override_settings(ACCOUNTS=dict(settings.ACCOUNTS, INSTRUMENTATION=True))
+class InstrumentationTestCase(TestCase):
+    def setUp(self) -> None:
+        registry.clear()
+        get_token_version_cache().clear()
+        return super().setUp()
+
+    def test_server_timing_header(self):
+        """
+        Instrumented responses carry their timings and SQL count
+        """
+        u = CreateCustomerViews()
+        u.login()
+
+        header = u.login_response["Server-Timing"]
+        for name in ("total", "middleware", "app", "hash", "sql"):
+            self.assertIn(f"{name};dur=", header, f"Missing {name} timing. Got {header}")
+        self.assertNotIn('desc="0 queries"', header, "Login queries not counted")
+
+        # The first request loads the token version, later ones run no query
+        response = u.client.get(path="/accounts/user/")
+        self.assertIn('desc="1 queries"', response["Server-Timing"], "Token version query not counted")
+        response = u.client.get(path="/accounts/user/")
+        header = response["Server-Timing"]
+        for name in ("jwt", "serialize"):
+            self.assertIn(f"{name};dur=", header, f"Missing {name} timing. Got {header}")
+        self.assertIn('desc="0 queries"', header, "User endpoint ran queries")
+
+    def test_metrics_endpoint(self):
+        """
+        The scrape endpoint serves the recorded requests
+        """
+        u = CreateCustomerViews()
+        u.login()
+
+        response = u.client.get(path="/accounts/metrics/")
+        body = response.content.decode()
+
+        self.assertEqual(response.status_code, 200, f"Metrics status_code not 200. Got {response.status_code} instead.")
+        self.assertIn('accounts_requests_total{view="token_obtain_pair",status="200"} 1', body, "Login not counted")
+        self.assertIn("accounts_request_seconds_bucket", body, "Timings not exported")
+        self.assertIn("accounts_verified_token_cache_hits_total", body, "Cache counters not exported")
+
+        response = u.client.get(path="/accounts/metrics/", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, 403, f"Metrics status_code not 403. Got {response.status_code} instead.")
+
+
+class InstrumentationDisabledTestCase(TestCase):
+    def test_disabled(self):
+        """
+        With instrumentation off there is no header and no metrics endpoint
+        """
+        u = CreateCustomerViews()
+        u.login()
+
+        self.assertFalse(u.login_response.has_header("Server-Timing"), "Timings sent while disabled")
+        response = u.client.get(path="/accounts/metrics/")
+        self.assertEqual(response.status_code, 404, f"Metrics status_code not 404. Got {response.status_code} instead.")
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from accounts.blacklist import get_blacklist_cache
+from accounts.tests.test_views import CreateCustomerViews
+from accounts.token_versions import get_token_version_cache
+
+
+class TokenIntrospectionTestCase(TestCase):
+    def setUp(self) -> None:
+        get_blacklist_cache().clear()
+        get_token_version_cache().clear()
+        self.gateway = CreateCustomerViews()
+        self.gateway.create_or_set_admin()
+        self.gateway.login()
+        return super().setUp()
+
+    def introspect(self, tokens):
+        return self.gateway.client.post(path="/accounts/introspect/", data=dict(tokens=tokens), content_type="application/json")
+
+    def test_batch_results(self):
+        """
+        Each token gets its own answer, with one blacklist query and one token version query for the batch
+        """
+        users = [CreateCustomerViews() for _ in range(3)]
+        for u in users:
+            u.login()
+        users[0].logout()
+
+        tokens = [users[0].refresh_token, users[1].access_token, "not.a.token", users[2].refresh_token]
+        # Plus the gateway's own token version
+        with self.assertNumQueries(3):
+            response = self.introspect(tokens)
+
+        self.assertEqual(response.status_code, 200, f"Introspect status_code not 200. Got {response.status_code} instead.")
+        results = response.data["results"]
+        self.assertEqual([r["active"] for r in results], [False, True, False, True], "Active flags mis-match")
+        self.assertEqual(results[0]["error"], "token_blacklisted", "Blacklisted token not reported")
+        self.assertEqual(results[2]["error"], "token_not_valid", "Invalid token not reported")
+        self.assertEqual(results[1]["email"], users[1].email, "Claims missing")
+        self.assertEqual(results[3]["token_type"], "refresh", "Token type missing")
+
+        # The answers are cached now
+        with self.assertNumQueries(0):
+            self.introspect(tokens)
+
+    @override_settings(ACCOUNTS=dict(settings.ACCOUNTS, INTROSPECTION_MAX_BATCH=2))
+    def test_batch_size_capped(self):
+        """
+        Batches over the cap are rejected
+        """
+        tokens = [self.gateway.access_token] * 3
+        response = self.introspect(tokens)
+        self.assertEqual(response.status_code, 400, f"Introspect status_code not 400. Got {response.status_code} instead.")
+        self.assertEqual(self.introspect(tokens[:2]).status_code, 200, "Batch at the cap rejected")
+
+    def test_staff_only(self):
+        """
+        Only staff members can introspect tokens
+        """
+        u = CreateCustomerViews()
+        u.login()
+        response = u.client.post(path="/accounts/introspect/", data=dict(tokens=[u.access_token]), content_type="application/json")
+        self.assertEqual(response.status_code, 403, f"Introspect status_code not 403. Got {response.status_code} instead.")
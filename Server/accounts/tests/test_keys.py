@@ -0,0 +1,110 @@
+import json
+import unittest
+from unittest import mock
+import jwt
+from jwt.algorithms import has_crypto
+from django.conf import settings
+from django.test import TestCase, override_settings
+from accounts.tests.test_views import CreateCustomerViews
+from accounts.verifier import TokenVerifier
+
+
+def pem_keys(algorithm):
+    """
+    Returns a new `(private, public)` PEM key pair.
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        key = ed25519.Ed25519PrivateKey.generate()
+    private = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    public = key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return private.decode(), public.decode()
+
+
+def signing_keys(*keys):
+    return override_settings(ACCOUNTS=dict(settings.ACCOUNTS, JWT_SIGNING_KEYS=keys))
+
+
+@unittest.skipUnless(has_crypto, "cryptography is not installed")
+class SigningKeysTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.rsa_private, cls.rsa_public = pem_keys("RS256")
+        cls.ed_private, cls.ed_public = pem_keys("EdDSA")
+
+    def test_login_with_each_algorithm(self):
+        """
+        Tokens are signed with the configured key and verified by the API
+        """
+        for algorithm, private in (("RS256", self.rsa_private), ("EdDSA", self.ed_private)):
+            with signing_keys(dict(kid=f"{algorithm}-1", algorithm=algorithm, private_key=private)):
+                u = CreateCustomerViews()
+                u.login()
+
+                header = jwt.get_unverified_header(u.access_token)
+                self.assertEqual((header["alg"], header["kid"]), (algorithm, f"{algorithm}-1"), "Token header mis-match")
+                response = u.client.get(path="/accounts/user/")
+                self.assertEqual(response.status_code, 200, f"User status_code not 200. Got {response.status_code} instead.")
+
+    def test_jwks_and_rotation(self):
+        """
+        The key set publishes every key, and tokens signed with a retired key stay valid
+        """
+        old = dict(kid="old", algorithm="RS256", private_key=self.rsa_private)
+        with signing_keys(old):
+            u = CreateCustomerViews()
+            u.login()
+
+        new = dict(kid="new", algorithm="EdDSA", private_key=self.ed_private)
+        retired = dict(kid="old", algorithm="RS256", public_key=self.rsa_public)
+        with signing_keys(new, retired):
+            response = u.client.get(path="/accounts/user/")
+            self.assertEqual(response.status_code, 200, "Token of the retired key rejected")
+
+            response = u.client.get(path="/accounts/jwks/")
+            jwks = json.loads(response.content)
+            self.assertEqual([key["kid"] for key in jwks["keys"]], ["new", "old"], "Published keys mis-match")
+            self.assertNotIn("d", jwks["keys"][0], "Private key published")
+            self.assertIn("max-age", response["Cache-Control"], "Key set not cacheable")
+
+        with signing_keys(new):
+            response = u.client.get(path="/accounts/user/")
+            self.assertEqual(response.status_code, 401, "Token of a dropped key accepted")
+
+    def test_jwks_not_served_with_hmac(self):
+        """
+        Without signing keys there is no key set to publish
+        """
+        response = CreateCustomerViews().client.get(path="/accounts/jwks/")
+        self.assertEqual(response.status_code, 404, f"JWKS status_code not 404. Got {response.status_code} instead.")
+
+    def test_verifier_refetches_unknown_kid(self):
+        """
+        A remote verifier fetches the key set once, and again only for new kids
+        """
+        with signing_keys(dict(kid="first", algorithm="EdDSA", private_key=self.ed_private)):
+            u = CreateCustomerViews()
+            u.login()
+            first = json.loads(u.client.get(path="/accounts/jwks/").content)
+
+        with signing_keys(dict(kid="second", algorithm="RS256", private_key=self.rsa_private)):
+            v = CreateCustomerViews()
+            v.login()
+            second = json.loads(v.client.get(path="/accounts/jwks/").content)
+
+        verifier = TokenVerifier(jwks_url="https://auth.example.com/accounts/jwks/", min_refresh_interval=0)
+        with mock.patch.object(verifier, "fetch", side_effect=[first, second]) as fetch:
+            for _ in range(3):
+                self.assertEqual(verifier.verify(u.access_token)["email"], u.email, "Payload mis-match")
+            self.assertEqual(fetch.call_count, 1, "Key set fetched more than once")
+
+            self.assertEqual(verifier.verify(v.access_token)["email"], v.email, "Payload mis-match")
+            self.assertEqual(fetch.call_count, 2, "Unknown kid did not refetch")
+
+        with self.assertRaises(jwt.InvalidTokenError):
+            TokenVerifier(jwks=second).verify(u.access_token)
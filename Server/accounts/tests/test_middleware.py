@@ -0,0 +1,52 @@
+import logging
+from django.test import AsyncClient, Client, TestCase
+from accounts.tests.test_views import CreateCustomerViews
+
+
+class LeanMiddlewareTestCase(TestCase):
+    def test_api_skips_sessions(self):
+        """
+        Requests to the JWT API skip the session, CSRF and message middleware
+        """
+        u = CreateCustomerViews()
+        u.login()
+
+        response = u.client.get(path="/accounts/user/")
+
+        self.assertEqual(response.status_code, 200, f"User status_code not 200. Got {response.status_code} instead.")
+        self.assertFalse(hasattr(response.wsgi_request, "session"), "Session loaded for the API")
+        self.assertFalse(hasattr(response.wsgi_request, "_messages"), "Messages loaded for the API")
+        self.assertFalse(response.cookies, "API response sets cookies")
+
+    def test_admin_keeps_sessions(self):
+        """
+        The admin still gets sessions, CSRF protection and `request.user`
+        """
+        client = Client(enforce_csrf_checks=True)
+        response = client.get(path="/admin/login/")
+
+        self.assertEqual(response.status_code, 200, f"Admin status_code not 200. Got {response.status_code} instead.")
+        self.assertTrue(hasattr(response.wsgi_request, "session"), "Admin has no session")
+        self.assertIn("csrftoken", response.cookies, "Admin CSRF cookie missing")
+
+        # Without the CSRF token, the login form is refused
+        response = client.post(path="/admin/login/", data=dict(username="admin", password="password"))
+        self.assertEqual(response.status_code, 403, f"Admin status_code not 403. Got {response.status_code} instead.")
+
+    async def test_async_stack_not_adapted(self):
+        """
+        Under ASGI the scoped middleware runs async, for the API and the admin alike
+        """
+        # Django only logs adaptations with DEBUG on
+        with self.settings(DEBUG=True), self.assertLogs("django.request", "DEBUG") as logs:
+            logging.getLogger("django.request").debug("Loading the async handler")
+            client = AsyncClient()
+            api = await client.get(path="/accounts/user/")
+            admin = await client.get(path="/admin/login/")
+
+        self.assertEqual(api.status_code, 401, f"API status_code not 401. Got {api.status_code} instead.")
+        self.assertFalse(api.cookies, "API response sets cookies")
+        self.assertEqual(admin.status_code, 200, f"Admin status_code not 200. Got {admin.status_code} instead.")
+        self.assertIn("csrftoken", admin.cookies, "Admin CSRF cookie missing")
+        adapted = [line for line in logs.output if "adapted for middleware core.middleware.PathScopedMiddleware" in line]
+        self.assertEqual(adapted, [], "Middleware adapted between sync and async")
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.backends import TokenBackend
+from accounts.minting import TokenMinter, get_minter
+from accounts.tests.test_models import CreateUser
+from accounts.tokens import RefreshToken
+
+
+class TokenMintingTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        u = CreateUser(username="Test", email="test@example.com", password="password123!")
+        u.create_user()
+        cls.user = u.user
+        return super().setUpTestData()
+
+    def test_tokens_match_simplejwt(self):
+        """
+        The fast path signs exactly the same token as simplejwt
+        """
+        refresh = RefreshToken.for_user(self.user)
+        access = refresh.access_token
+        backend = refresh.get_token_backend()
+
+        self.assertIsNotNone(get_minter(backend), "Fast minting not used for HS256")
+        self.assertEqual(str(refresh), backend.encode(refresh.payload), "Refresh token mis-match")
+        self.assertEqual(str(access), backend.encode(access.payload), "Access token mis-match")
+        self.assertEqual(backend.decode(str(access))["username"], "Test", "Claims mis-match")
+
+    def test_template_reused_per_user(self):
+        """
+        Tokens for the same user share one compiled template
+        """
+        minter = TokenMinter(TokenBackend("HS512", "secret", audience="api", issuer="server"), max_entries=10)
+        first = RefreshToken.for_user(self.user).access_token
+        second = RefreshToken.for_user(self.user).access_token
+
+        self.assertEqual(minter.encode(first.payload), minter.backend.encode(first.payload), "HS512 token mis-match")
+        self.assertEqual(minter.encode(second.payload), minter.backend.encode(second.payload), "HS512 token mis-match")
+        self.assertEqual(len(minter._templates), 1, "Template not reused")
+
+    def test_fast_minting_disabled(self):
+        """
+        Turning the setting off falls back to simplejwt
+        """
+        with override_settings(ACCOUNTS=dict(settings.ACCOUNTS, FAST_TOKEN_MINTING=False)):
+            refresh = RefreshToken.for_user(self.user)
+            self.assertIsNone(get_minter(refresh.get_token_backend()), "Fast minting still used")
+            self.assertEqual(str(refresh), refresh.get_token_backend().encode(refresh.payload), "Refresh token mis-match")
@@ -1,3 +1,5 @@
+import io
+from django.core.management import call_command
 from django.test import TestCase
 from accounts.models import User
 from generic_functions.generic_test_helpers import random_string, random_length_string
@@ -104,3 +106,33 @@ class UserTestCases(TestCase):
 
         user = User.objects.get(username="Test")
         self.assertTrue(user.is_staff, "Admin flag not set.")
+
+
+class DisplayNameTestCases(TestCase):
+    def test_kept_up_to_date(self):
+        """
+        The stored display name follows the name fields, also on partial saves
+        """
+        user = User.objects.create_user(email="name@example.com", username="Name", password="password123!")
+        self.assertEqual(user.display_name, "Name", "Display name not set")
+
+        user.first_name = "First"
+        user.save(update_fields=["first_name"])
+        user.refresh_from_db()
+        self.assertEqual(user.display_name, "Name | First", "Display name not updated")
+        self.assertEqual(user.full_name(), str(user), "Full name mis-match")
+
+    def test_backfill_command(self):
+        """
+        The backfill command fixes rows whose display name is stale
+        """
+        for number in range(5):
+            User.objects.create_user(email=f"user{number}@example.com", username=f"User{number}", password="password123!", last_name="Last")
+        User.objects.update(display_name="")
+
+        out = io.StringIO()
+        call_command("backfill_display_names", "--batch-size", "2", stdout=out)
+
+        self.assertIn("Updated 5 of 5 users", out.getvalue(), "Backfill count mis-match")
+        for user in User.objects.all():
+            self.assertEqual(user.display_name, str(user), "Display name not backfilled")
@@ -0,0 +1,68 @@
+from django.contrib.auth.models import Group, Permission
+from django.test import TestCase
+from accounts.authentication import ClaimsUser
+from accounts.models import User
+from accounts.permissions import get_permission_cache
+from accounts.tokens import RefreshToken
+
+
+class PermissionCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        get_permission_cache().clear()
+        self.user = User.objects.create_user(email="test@example.com", username="Test", password="password123!")
+        self.group = Group.objects.create(name="Editors")
+        self.group.permissions.add(Permission.objects.get(codename="change_group"))
+        self.user.groups.add(self.group)
+        self.user.user_permissions.add(Permission.objects.get(codename="view_group"))
+        return super().setUp()
+
+    def fresh_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_warm_checks_without_query(self):
+        """
+        Once loaded, permission checks on a new user object make no query
+        """
+        self.assertTrue(self.fresh_user().has_perm("auth.change_group"), "Group permission missing")
+
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perms(["auth.change_group", "auth.view_group"]), "Permissions missing")
+            self.assertFalse(user.has_perm("auth.delete_group"), "Unexpected permission")
+            self.assertTrue(user.has_module_perms("auth"), "Module permission missing")
+        self.assertEqual(user.get_group_permissions(), {"auth.change_group"}, "Group permissions mis-match")
+
+    def test_invalidation(self):
+        """
+        Changes to groups, group permissions, user permissions and superuser status show up at once
+        """
+        self.assertTrue(self.fresh_user().has_perm("auth.change_group"), "Group permission missing")
+
+        self.group.permissions.remove(Permission.objects.get(codename="change_group"))
+        self.assertFalse(self.fresh_user().has_perm("auth.change_group"), "Group permission change missed")
+
+        self.group.permissions.add(Permission.objects.get(codename="delete_group"))
+        self.assertTrue(self.fresh_user().has_perm("auth.delete_group"), "Group permission change missed")
+
+        self.group.user_set.remove(self.user)
+        self.assertFalse(self.fresh_user().has_perm("auth.delete_group"), "Group membership change missed")
+
+        self.user.user_permissions.clear()
+        self.assertFalse(self.fresh_user().has_perm("auth.view_group"), "User permission change missed")
+
+        user = self.fresh_user()
+        user.is_superuser = True
+        user.save(update_fields=["is_superuser"])
+        self.assertIn("auth.add_permission", self.fresh_user().get_all_permissions(), "Superuser change missed")
+
+    def test_claims_user(self):
+        """
+        The token-backed user answers permission checks from the same cache
+        """
+        user = ClaimsUser(RefreshToken.for_user(self.user).access_token)
+        self.assertTrue(user.has_perm("auth.change_group"), "Group permission missing")
+        self.assertFalse(user.is_superuser, "Unexpected superuser")
+
+        user = ClaimsUser(RefreshToken.for_user(self.user).access_token)
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perms(["auth.change_group", "auth.view_group"]), "Permissions missing")
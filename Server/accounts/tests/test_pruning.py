@@ -0,0 +1,103 @@
+import io
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from accounts.blacklist import get_blacklist_cache
+from accounts.models import RevokedToken
+from accounts.pruning import PruneScheduler, prune_expired_tokens
+from accounts.tests.test_views import CreateCustomerViews
+
+
+class PruneTokensTestCase(TestCase):
+    def setUp(self) -> None:
+        get_blacklist_cache().clear()
+        return super().setUp()
+
+    def test_prune_expired_tokens(self):
+        """
+        Expired rows are deleted in batches, live rows are kept
+        """
+        u = CreateCustomerViews()
+        u.login()
+        u.client.post(path="/accounts/token/refresh/", data=dict(refresh=u.refresh_token))
+        now = timezone.now()
+        RevokedToken.objects.create(jti="expired", expires_at=now - timedelta(days=1))
+        RevokedToken.objects.create(jti="live", expires_at=now + timedelta(days=1))
+
+        result = prune_expired_tokens(batch_size=1, now=now)
+
+        self.assertEqual(result.deleted, {"blacklisted": 0, "outstanding": 0, "revoked": 1}, "Live rows were pruned")
+        self.assertEqual(OutstandingToken.objects.count(), 1, "Outstanding token was pruned")
+
+        # Once every refresh token has expired, everything goes
+        result = prune_expired_tokens(batch_size=1, now=now + timedelta(days=30))
+
+        self.assertEqual(result.deleted, {"blacklisted": 1, "outstanding": 1, "revoked": 1}, "Expired rows not pruned")
+        self.assertFalse(BlacklistedToken.objects.exists(), "Blacklisted tokens left behind")
+        self.assertFalse(RevokedToken.objects.exists(), "Revoked tokens left behind")
+
+    def test_prune_command(self):
+        """
+        The management command reports its rows/sec
+        """
+        RevokedToken.objects.create(jti="expired", expires_at=timezone.now() - timedelta(days=1))
+
+        stdout = io.StringIO()
+        call_command("prune_tokens", batch_size=10, stdout=stdout)
+
+        self.assertIn("revoked: 1 rows", stdout.getvalue(), "Command output mis-match")
+        self.assertIn("Deleted 1 expired token rows", stdout.getvalue(), "Command output mis-match")
+        self.assertFalse(RevokedToken.objects.exists(), "Expired revoked token not pruned")
+
+    def test_scheduler_logs_failures(self):
+        """
+        A failing background prune is logged and retried
+        """
+        scheduler = PruneScheduler(interval=0.01)
+        calls = []
+
+        def fail():
+            calls.append(1)
+            if len(calls) >= 2:
+                scheduler.stop()
+            raise RuntimeError("lock timeout")
+
+        with mock.patch("accounts.pruning.prune_expired_tokens", fail), mock.patch("accounts.pruning.connection"):
+            with self.assertLogs("accounts.pruning", level="ERROR") as logs:
+                scheduler.run()
+
+        self.assertEqual(len(calls), 2, "Failed prune not retried")
+        self.assertIn("lock timeout", logs.output[0], "Exception not logged")
+
+
+@override_settings(ACCOUNTS=dict(settings.ACCOUNTS, BLACKLIST_STORAGE="compact"))
+class CompactStorageTestCase(TestCase):
+    def setUp(self) -> None:
+        get_blacklist_cache().clear()
+        return super().setUp()
+
+    def test_compact_refresh_and_logout(self):
+        """
+        Compact storage skips the outstanding token table but still blacklists
+        """
+        u = CreateCustomerViews()
+        u.login()
+        self.assertFalse(OutstandingToken.objects.exists(), "Outstanding token stored in compact mode")
+
+        response = u.client.post(path="/accounts/token/refresh/", data=dict(refresh=u.refresh_token))
+        self.assertEqual(response.status_code, 200, f"Refresh status_code not 200. Got {response.status_code} instead.")
+        self.assertTrue(RevokedToken.objects.exists(), "Rotated token not revoked")
+
+        # The database answers once the cache has forgotten the token
+        get_blacklist_cache().clear()
+        reused = u.client.post(path="/accounts/token/refresh/", data=dict(refresh=u.refresh_token))
+        self.assertEqual(reused.status_code, 401, f"Reused refresh status_code not 401. Got {reused.status_code} instead.")
+
+        response = u.client.post(path="/accounts/logout/blacklist/", data=dict(refresh_token=response.data["refresh"]))
+        self.assertEqual(response.status_code, 205, f"Logout status code not 205. Got {response.status_code} instead.")
+        self.assertEqual(RevokedToken.objects.count(), 2, "Logout did not revoke the token")
+        self.assertFalse(BlacklistedToken.objects.exists(), "simplejwt tables used in compact mode")
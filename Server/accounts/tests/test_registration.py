@@ -0,0 +1,40 @@
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from accounts.models import User
+from accounts.throttling import get_throttle_store
+
+
+class RegistrationTestCase(TestCase):
+    def setUp(self) -> None:
+        get_throttle_store().clear()
+        User.objects.create_user(email="taken@example.com", username="Taken", password="password123!")
+        return super().setUp()
+
+    def register(self, **data):
+        data.setdefault("password", "password123!")
+        return Client().post(path="/accounts/register/", data=data)
+
+    def test_register_single_insert(self):
+        """
+        A new user is created with one INSERT and no uniqueness queries
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.register(email="new@example.com", username="New")
+
+        self.assertEqual(response.status_code, 201, f"Register status_code not 201. Got {response.status_code} instead.")
+        statements = [query["sql"].split()[0] for query in queries.captured_queries]
+        self.assertEqual([s for s in statements if s in ("SELECT", "INSERT")], ["INSERT"], "Unexpected queries")
+
+    def test_register_duplicates_ignore_case(self):
+        """
+        Taken emails and usernames, in any case, are field errors rather than a 500
+        """
+        response = self.register(email="TAKEN@example.com", username="New")
+        self.assertEqual(response.status_code, 400, f"Register status_code not 400. Got {response.status_code} instead.")
+        self.assertEqual(response.data, {"email": ["user with this email address already exists."]}, "Errors mis-match")
+
+        response = self.register(email="taken@example.com", username="taken")
+        self.assertEqual(set(response.data), {"email", "username"}, "Errors mis-match")
+        self.assertEqual(response.data["username"], ["A user with that username already exists."], "Errors mis-match")
+        self.assertEqual(User.objects.count(), 1, "Duplicate user created")
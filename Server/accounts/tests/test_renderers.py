@@ -0,0 +1,66 @@
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from django.utils.translation import gettext_lazy as _
+from django.test import TestCase
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+from accounts.parsers import FastJSONParser
+from accounts.renderers import FastJSONRenderer
+
+
+class FastJSONTestCase(TestCase):
+    data = ReturnDict({
+        "name": "Zo\u00eb\u2028line",
+        "joined": datetime(2022, 9, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+        "balance": Decimal("1.50"),
+        "message": _("This field is required."),
+        "ids": {1, 2},
+        1: None,
+        "big": 2 ** 70,
+    }, serializer=None)
+
+    def test_renderer_same_content(self):
+        """
+        Rendered JSON decodes to the same content as DRF's
+        """
+        fast = FastJSONRenderer().render(self.data)
+        expected = JSONRenderer().render(self.data)
+
+        self.assertEqual(json.loads(fast), json.loads(expected), "Rendered content mis-match")
+        self.assertIn(b"\\u2028", fast, "Line separator not escaped")
+
+        data = {key: value for key, value in self.data.items() if key != "big"}
+        fast = FastJSONRenderer().render(data)
+        self.assertEqual(fast, JSONRenderer().render(data), "Rendered bytes mis-match")
+
+        indented = FastJSONRenderer().render({"a": 1}, "application/json; indent=4")
+        self.assertEqual(indented, JSONRenderer().render({"a": 1}, "application/json; indent=4"), "Indent ignored")
+
+    def test_parser_same_content(self):
+        """
+        Parsed bodies and parse errors match DRF's
+        """
+        body = '{"email": "zoë@example.com", "values": [1, 2.5, null, true]}'.encode()
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+            "Parsed content mis-match",
+        )
+
+        # Integers past 64 bits stay exact instead of turning into floats
+        body = b'{"id": 12345678901234567890123, "max": 18446744073709551616, "min": -9223372036854775809}'
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            {"id": 12345678901234567890123, "max": 18446744073709551616, "min": -9223372036854775809},
+            "Large integer mis-match",
+        )
+
+        for body in (b"{bad", b'{"value": NaN}'):
+            with self.assertRaises(Exception) as fast:
+                FastJSONParser().parse(io.BytesIO(body))
+            with self.assertRaises(Exception) as expected:
+                JSONParser().parse(io.BytesIO(body))
+            self.assertEqual(str(fast.exception), str(expected.exception), "Parse error mis-match")
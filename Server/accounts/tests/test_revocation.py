@@ -0,0 +1,77 @@
+import io
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from accounts.revocation import revoke_user_tokens
+from accounts.tests.test_views import CreateCustomerViews
+from accounts.token_versions import get_token_version_cache
+from accounts.tokens import RefreshToken
+
+
+class RevokeTokensTestCase(TestCase):
+    def setUp(self) -> None:
+        self.u = CreateCustomerViews(username="Test", email="test@example.com", password="password123!")
+        self.u.login()
+        self.other = CreateCustomerViews(username="Other", email="other@example.com", password="password123!")
+        self.other.login()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        # Bumped versions outlive the test's rows, and user ids are reused
+        get_token_version_cache().clear()
+        return super().tearDown()
+
+    def refresh(self, token):
+        return Client().post(path="/accounts/token/refresh/", data=dict(refresh=token)).status_code
+
+    def test_revoke_in_bulk(self):
+        """
+        Every token of the user is blacklisted with a fixed number of queries
+        """
+        tokens = [str(RefreshToken.for_user(self.u.user)) for _ in range(20)]
+
+        # Bump the version, read, then insert inside a savepoint
+        with self.assertNumQueries(5):
+            result = revoke_user_tokens([self.u.user.pk])
+
+        self.assertEqual(result.users, 1, "User count mis-match")
+        self.assertEqual(result.revoked, 21, "Revoked count mis-match")
+        self.assertEqual(self.u.client.get(path="/accounts/user/").status_code, 401, "Revoked access token accepted")
+        self.assertEqual(self.refresh(tokens[0]), 401, "Revoked token refreshed")
+        self.assertEqual(self.refresh(self.u.refresh_token), 401, "Revoked token refreshed")
+        self.assertEqual(self.refresh(self.other.refresh_token), 200, "Other user's token revoked")
+        self.assertEqual(revoke_user_tokens([self.u.user.pk], batch_size=2).revoked, 0, "Tokens revoked twice")
+
+    def test_endpoints(self):
+        """
+        Users can revoke their own tokens, and only staff members those of others
+        """
+        response = self.u.client.post(path="/accounts/revoke/", data=dict(users=[self.other.user.pk]), content_type="application/json")
+        self.assertEqual(response.status_code, 403, f"Revoke status_code not 403. Got {response.status_code} instead.")
+
+        response = self.u.client.post(path="/accounts/logout/all/")
+        self.assertEqual(response.data, {"users": 1, "revoked": 1}, "Logout all mis-match")
+        self.assertEqual(self.refresh(self.u.refresh_token), 401, "Revoked token refreshed")
+
+        self.u.create_or_set_admin()
+        self.u.login()
+        response = self.u.client.post(path="/accounts/revoke/", data=dict(users=[self.other.user.pk]), content_type="application/json")
+        self.assertEqual(response.data, {"users": 1, "revoked": 1}, "Revoke mis-match")
+        self.assertEqual(self.refresh(self.other.refresh_token), 401, "Revoked token refreshed")
+
+        # Compact storage records no tokens, but the version bump still revokes them
+        with override_settings(ACCOUNTS=dict(settings.ACCOUNTS, BLACKLIST_STORAGE="compact")):
+            response = self.u.client.post(path="/accounts/logout/all/")
+            self.assertEqual(response.data, {"users": 1, "revoked": 0}, "Compact logout all mis-match")
+            self.assertEqual(self.u.client.get(path="/accounts/user/").status_code, 401, "Revoked access token accepted")
+
+    def test_command(self):
+        """
+        The command revokes the tokens of the users picked by email
+        """
+        stdout = io.StringIO()
+        call_command("revoke_tokens", "--email", "other@example.com", stdout=stdout)
+
+        self.assertIn("Revoked the tokens of 1 users and blacklisted 1 refresh tokens", stdout.getvalue(), "Command output mis-match")
+        self.assertEqual(self.refresh(self.other.refresh_token), 401, "Revoked token refreshed")
+        self.assertEqual(self.refresh(self.u.refresh_token), 200, "Other user's token revoked")
@@ -0,0 +1,161 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from django.conf import settings
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, Client, TestCase, override_settings
+from accounts.async_views import AsyncTokenObtainPairView
+from accounts.throttling import CacheThrottleStore, LocalThrottleStore, get_throttle_store
+from accounts.tests.test_views import CreateCustomerViews
+
+
+THROTTLE_RATES = {"login_ip": "3/min", "login_email": "2/min", "register_ip": "1/hour"}
+
+
+@override_settings(ACCOUNTS=dict(settings.ACCOUNTS, THROTTLE_RATES=THROTTLE_RATES))
+class ThrottlingTestCase(TestCase):
+    def setUp(self) -> None:
+        get_throttle_store().clear()
+        return super().setUp()
+
+    def log_in(self, email, ip="127.0.0.1", **headers):
+        return Client(REMOTE_ADDR=ip, **headers).post(path="/accounts/token/", data=dict(email=email, password="bad_password"))
+
+    def test_login_limited_per_ip(self):
+        """
+        An IP out of tokens is refused before any password is checked
+        """
+        for number in range(3):
+            response = self.log_in(f"user{number}@example.com")
+            self.assertEqual(response.status_code, 401, f"Login status_code not 401. Got {response.status_code} instead.")
+
+        with self.assertNumQueries(0):
+            response = self.log_in("user3@example.com")
+
+        self.assertEqual(response.status_code, 429, f"Login status_code not 429. Got {response.status_code} instead.")
+        self.assertIn("Retry-After", response, "Retry-After header missing")
+        # Other clients are not affected
+        self.assertEqual(self.log_in("user3@example.com", ip="10.0.0.1").status_code, 401, "Other IP was throttled")
+
+    def test_spoofed_forwarded_for(self):
+        """
+        A new `X-Forwarded-For` per attempt doesn't get a new bucket, unless proxies are trusted
+        """
+        codes = [
+            self.log_in(f"user{number}@example.com", HTTP_X_FORWARDED_FOR=f"10.0.0.{number}").status_code
+            for number in range(4)
+        ]
+        self.assertEqual(codes, [401, 401, 401, 429], f"Unexpected status codes. Got {codes} instead.")
+
+        # Behind one trusted proxy, its last entry is the client
+        with override_settings(ACCOUNTS=dict(settings.ACCOUNTS, THROTTLE_RATES=THROTTLE_RATES, THROTTLE_NUM_PROXIES=1)):
+            codes = [
+                self.log_in(f"user{number}@example.com", HTTP_X_FORWARDED_FOR=f"1.2.3.4, {ip}").status_code
+                for number, ip in enumerate(["10.0.0.9"] * 4 + ["10.0.0.8"])
+            ]
+        self.assertEqual(codes, [401, 401, 401, 429, 401], f"Unexpected status codes. Got {codes} instead.")
+
+    def test_login_limited_per_email(self):
+        """
+        Spreading attempts for one email over many IPs does not help
+        """
+        u = CreateCustomerViews()
+        u.create_user()
+
+        for number in range(2):
+            self.assertEqual(self.log_in(u.email, ip=f"10.0.0.{number}").status_code, 401, "Login was throttled")
+        response = self.log_in(u.email.upper(), ip="10.0.0.9")
+
+        self.assertEqual(response.status_code, 429, f"Login status_code not 429. Got {response.status_code} instead.")
+
+    def test_register_limited_per_ip(self):
+        """
+        Registrations are limited per IP
+        """
+        client = Client()
+        data = dict(email="test@example.com", username="Test", password="password123!")
+        self.assertEqual(client.post(path="/accounts/register/", data=data).status_code, 201, "Registration failed")
+
+        data = dict(email="other@example.com", username="Other", password="password123!")
+        response = client.post(path="/accounts/register/", data=data)
+        self.assertEqual(response.status_code, 429, f"Register status_code not 429. Got {response.status_code} instead.")
+
+    async def test_async_login_limited(self):
+        """
+        The async login view shares the same limits
+        """
+        factory = AsyncRequestFactory()
+        body = json.dumps(dict(email="test@example.com", password="bad_password"))
+
+        codes = []
+        for _ in range(3):
+            request = factory.post("/", data=body, content_type="application/json")
+            codes.append((await AsyncTokenObtainPairView.as_view()(request)).status_code)
+
+        self.assertEqual(codes, [401, 401, 429], f"Unexpected status codes. Got {codes} instead.")
+
+    async def test_async_login_cache_store(self):
+        """
+        The async login view counts attempts in the cache store off the event loop
+        """
+        factory = AsyncRequestFactory()
+        body = json.dumps(dict(email="test@example.com", password="bad_password"))
+
+        threads = []
+        take = CacheThrottleStore.take
+
+        def record_thread(store, *args):
+            threads.append(threading.get_ident())
+            return take(store, *args)
+
+        store_settings = dict(settings.ACCOUNTS, THROTTLE_RATES=THROTTLE_RATES, THROTTLE_STORE="accounts.throttling.CacheThrottleStore")
+        with override_settings(ACCOUNTS=store_settings), mock.patch.object(CacheThrottleStore, "take", record_thread):
+            get_throttle_store().clear()
+            codes = []
+            for _ in range(3):
+                request = factory.post("/", data=body, content_type="application/json")
+                codes.append((await AsyncTokenObtainPairView.as_view()(request)).status_code)
+
+        self.assertEqual(codes, [401, 401, 429], f"Unexpected status codes. Got {codes} instead.")
+        self.assertTrue(threads, "Cache store not used")
+        self.assertNotIn(threading.get_ident(), threads, "Cache store called on the event loop")
+
+    def test_local_store_bounded(self):
+        """
+        The local store never holds more than `THROTTLE_MAX_KEYS` buckets
+        """
+        with override_settings(ACCOUNTS=dict(settings.ACCOUNTS, THROTTLE_MAX_KEYS=10)):
+            store = LocalThrottleStore()
+            for number in range(1000):
+                store.set(f"key{number}", (1, 0), 60)
+
+            self.assertLessEqual(len(store._current) + len(store._previous), 10, "Store grew past its limit")
+            self.assertIsNotNone(store.get("key999"), "Latest bucket was dropped")
+
+    def test_parallel_attempts(self):
+        """
+        Parallel attempts never take more tokens than the bucket holds
+        """
+        for store in (LocalThrottleStore(), CacheThrottleStore()):
+            store.clear()
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                waits = list(pool.map(lambda _: store.take("login_ip:10.0.0.1", 5, 5 / 86400), range(50)))
+
+            allowed = sum(wait is None for wait in waits)
+            self.assertEqual(allowed, 5, f"{type(store).__name__} allowed {allowed} attempts instead of 5")
+            self.assertTrue(all(wait is None or wait > 0 for wait in waits), "Wait time missing")
+
+    def test_cache_store_clear(self):
+        """
+        Clearing the cache store resets the limits and leaves the rest of the cache alone
+        """
+        store = CacheThrottleStore()
+        cache.set("unrelated", "kept")
+        for _ in range(2):
+            store.take("login_ip:10.0.0.1", 1, 1 / 86400)
+        self.assertIsNotNone(store.take("login_ip:10.0.0.1", 1, 1 / 86400), "Limit not reached")
+
+        store.clear()
+        self.assertIsNone(store.take("login_ip:10.0.0.1", 1, 1 / 86400), "Limit not reset")
+        self.assertEqual(cache.get("unrelated"), "kept", "Unrelated cache entry cleared")
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+from accounts.models import User
+from accounts.tests.test_views import CreateCustomerViews
+from accounts.tokens import RefreshToken
+from accounts.token_versions import bump_token_versions, get_token_version_cache
+
+
+class TokenVersionTestCase(TestCase):
+    def setUp(self) -> None:
+        get_token_version_cache().clear()
+        self.u = CreateCustomerViews(username="Test", email="test@example.com", password="password123!")
+        self.u.login()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        # Bumped versions outlive the test's rows, and user ids are reused
+        get_token_version_cache().clear()
+        return super().tearDown()
+
+    def refresh(self, token):
+        return Client().post(path="/accounts/token/refresh/", data=dict(refresh=token)).status_code
+
+    def test_bump_revokes_tokens(self):
+        """
+        Bumping the version refuses the access and refresh tokens issued before it
+        """
+        self.assertEqual(self.u.client.get(path="/accounts/user/").status_code, 200, "Current access token refused")
+
+        self.assertEqual(bump_token_versions([self.u.user.pk]), 1, "Updated count mis-match")
+        self.assertEqual(self.u.client.get(path="/accounts/user/").status_code, 401, "Revoked access token accepted")
+        self.assertEqual(self.refresh(self.u.refresh_token), 401, "Revoked token refreshed")
+
+        self.u.login()
+        self.assertEqual(self.u.client.get(path="/accounts/user/").status_code, 200, "New access token refused")
+        self.assertEqual(self.refresh(self.u.refresh_token), 200, "New refresh token refused")
+
+    def test_stale_login_keeps_bump(self):
+        """
+        A login that read the user before a bump doesn't cache the old version back
+        """
+        stale = User.objects.get(pk=self.u.user.pk)
+        bump_token_versions([self.u.user.pk])
+        RefreshToken.for_user(stale)
+
+        self.assertEqual(self.u.client.get(path="/accounts/user/").status_code, 401, "Revoked access token accepted")
+
+    def test_epoch_revokes_every_token(self):
+        """
+        Raising the epoch refuses every token issued before it
+        """
+        with override_settings(ACCOUNTS=dict(settings.ACCOUNTS, TOKEN_EPOCH=1)):
+            self.assertEqual(self.u.client.get(path="/accounts/user/").status_code, 401, "Old epoch access token accepted")
+            self.assertEqual(self.refresh(self.u.refresh_token), 401, "Old epoch token refreshed")
+
+            self.u.login()
+            self.assertEqual(self.u.client.get(path="/accounts/user/").status_code, 200, "New access token refused")
+
+    def test_warm_check_without_query(self):
+        """
+        Once loaded, the version is checked without a query
+        """
+        with self.assertNumQueries(1):
+            self.assertEqual(self.u.client.get(path="/accounts/user/").status_code, 200, "Current access token refused")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.u.client.get(path="/accounts/user/").status_code, 200, "Current access token refused")
+
+    def test_introspection(self):
+        """
+        Introspection reports revoked tokens
+        """
+        gateway = CreateCustomerViews()
+        gateway.create_or_set_admin()
+        gateway.login()
+        bump_token_versions([self.u.user.pk])
+
+        response = gateway.client.post(path="/accounts/introspect/", data=dict(tokens=[self.u.access_token]), content_type="application/json")
+        result = response.data["results"][0]
+        self.assertFalse(result["active"], "Revoked token active")
+        self.assertEqual(result["error"], "token_revoked", "Revoked token not reported")
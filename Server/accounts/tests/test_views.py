@@ -1,5 +1,6 @@
 from django.test import Client, TestCase
 from accounts.tests.test_models import CreateUser
+from accounts.throttling import get_throttle_store
 
 
 class CreateCustomerViews(CreateUser):
@@ -22,6 +23,8 @@ class CreateCustomerViews(CreateUser):
         except AttributeError:
             self.create_user()
 
+        # Tests log in far more often than the default rate limits allow
+        get_throttle_store().clear()
         self.login_response = self.client.post(
             path="/accounts/token/",
             data=dict(email=self.email, password=self.password),
@@ -33,7 +36,7 @@ class CreateCustomerViews(CreateUser):
             self.access_token = self.login_response.data["access"]
             self.refresh_token = self.login_response.data["refresh"]
             # Update the self.client with JWT token header
-            self.client = Client(AUTHORIZATION=f"JWT {self.access_token}")
+            self.client = Client(HTTP_AUTHORIZATION=f"JWT {self.access_token}")
 
     def logout(self):
         """
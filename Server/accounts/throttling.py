@@ -0,0 +1,255 @@
+# Import the core libraries and functions
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.test.signals import setting_changed
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from accounts.conf import accounts_settings
+
+
+# ----------------------------------------------------------------
+# Token bucket rate limits for the endpoints that hash a password.
+# Each key (an IP address or an email) gets a bucket of `N` tokens
+# refilled at `N` per period, and every attempt takes one token. DRF
+# runs throttles before the view, so a rejected attempt costs one
+# store lookup: no password hash and no query. Rates are set in
+# `ACCOUNTS['THROTTLE_RATES']`, e.g. "5/min".
+#
+# Taking a token must be atomic, or parallel attempts all read the same
+# full bucket and all get through. The local store holds a lock around
+# each bucket update. The cache store can't lock across processes, so it
+# counts attempts per fixed window of one period with the cache's
+# atomic `add()` and `incr()` instead.
+# ----------------------------------------------------------------
+
+PERIODS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+
+
+def parse_rate(rate):
+    """
+    Turns "5/min" into `(capacity, tokens_per_second)`. None means no limit.
+    """
+    if rate is None:
+        return None
+    count, period = rate.split("/")
+    count = int(count)
+    return count, count / PERIODS[period]
+
+
+class LocalThrottleStore:
+    """
+    In-process bucket store. Holds at most `THROTTLE_MAX_KEYS` buckets in
+    two generations: once the current one is half full it becomes the
+    previous one, and buckets not touched since are dropped with it.
+    Dropping a bucket resets it to full, so keep the limit well above
+    the number of keys seen in one refill period.
+    """
+
+    def __init__(self):
+        self.max_keys = accounts_settings.THROTTLE_MAX_KEYS
+        self._current = {}
+        self._previous = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        bucket = self._current.get(key)
+        if bucket is None:
+            bucket = self._previous.get(key)
+        return bucket
+
+    def set(self, key, bucket, timeout):
+        if len(self._current) >= self.max_keys // 2:
+            self._previous, self._current = self._current, {}
+        self._current[key] = bucket
+
+    def clear(self):
+        self._current, self._previous = {}, {}
+
+    def take(self, key, capacity, refill):
+        """
+        Takes one token from the bucket of `key`. Returns None when
+        allowed, else the seconds until the next token.
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucket = self.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens, updated = bucket
+                tokens = min(capacity, tokens + (now - updated) * refill)
+
+            # Keep the bucket until it would be full again
+            if tokens < 1:
+                self.set(key, (tokens, now), capacity / refill)
+                return (1 - tokens) / refill
+            self.set(key, (tokens - 1, now), capacity / refill)
+            return None
+
+
+class CacheThrottleStore:
+    """
+    Keeps fixed window counters in a Django cache (see
+    `THROTTLE_CACHE_ALIAS`), so every server process shares the same
+    limits. A client can spend up to twice the rate across a window
+    boundary, but never more, however many processes race. Keys carry
+    a generation, so `clear()` drops the counters and nothing else in
+    the shared cache.
+    """
+    key_prefix = "accounts:throttle:"
+    generation_key = "accounts:throttle-generation"
+
+    def __init__(self):
+        self._cache = caches[accounts_settings.THROTTLE_CACHE_ALIAS]
+
+    def clear(self):
+        try:
+            self._cache.incr(self.generation_key)
+        except ValueError:
+            self._cache.add(self.generation_key, 1, None)
+
+    def take(self, key, capacity, refill):
+        """
+        Counts one attempt in the current window of `key`. Returns None
+        when allowed, else the seconds until the window ends.
+        """
+        period = capacity / refill
+        now = time.time()
+        window = int(now // period)
+        generation = self._cache.get(self.generation_key, 0)
+        key = f"{self.key_prefix}{generation}:{key}:{window}"
+
+        # Both are atomic, so each attempt gets its own count
+        self._cache.add(key, 0, max(int(period) + 1, 1))
+        try:
+            count = self._cache.incr(key)
+        except ValueError:
+            # Evicted between the two calls
+            self._cache.add(key, 1, max(int(period) + 1, 1))
+            count = 1
+
+        if count > capacity:
+            return (window + 1) * period - now
+        return None
+
+
+_store = None
+
+
+def get_throttle_store():
+    """
+    Returns the configured bucket store, building it on first use.
+    """
+    global _store
+
+    if _store is None:
+        _store = accounts_settings.THROTTLE_STORE()
+    return _store
+
+
+def reset_throttle_store(*args, **kwargs):
+    global _store
+
+    if kwargs.get("setting") in (None, "ACCOUNTS", "CACHES"):
+        _store = None
+
+
+setting_changed.connect(reset_throttle_store)
+
+
+def take_token(scope, key):
+    """
+    Takes one token from the `scope` bucket of `key`. Returns None when
+    allowed, else the seconds until the next token.
+    """
+    rate = parse_rate(accounts_settings.THROTTLE_RATES.get(scope))
+    if rate is None or not key:
+        return None
+    capacity, refill = rate
+    return get_throttle_store().take(f"{scope}:{key}", capacity, refill)
+
+
+def client_ip(request):
+    """
+    The client address. `X-Forwarded-For` is only read when
+    `THROTTLE_NUM_PROXIES` says proxies set it, otherwise a client could
+    send a new address with every attempt and never run out of tokens.
+    """
+    remote_addr = request.META.get("REMOTE_ADDR")
+    num_proxies = accounts_settings.THROTTLE_NUM_PROXIES
+    forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if not num_proxies or not forwarded_for:
+        return remote_addr
+
+    # Each proxy appends the address it got the request from
+    addresses = [address.strip() for address in forwarded_for.split(",")]
+    return addresses[-min(num_proxies, len(addresses))]
+
+
+def check_throttles(request, checks):
+    """
+    Runs `(scope, key)` checks in order and raises DRF's `Throttled` on
+    the first one that is out of tokens.
+    """
+    for scope, key in checks:
+        wait = take_token(scope, key)
+        if wait is not None:
+            raise Throttled(wait)
+
+
+async def acheck_throttles(request, checks):
+    """
+    Async version of `check_throttles()`. The local store only touches
+    memory and runs inline, any other store may wait on the network and
+    runs in a worker thread so the event loop stays free.
+    """
+    if isinstance(get_throttle_store(), LocalThrottleStore):
+        check_throttles(request, checks)
+    else:
+        await sync_to_async(check_throttles, thread_sensitive=False)(request, checks)
+
+
+class BucketThrottle(BaseThrottle):
+    """
+    DRF throttle backed by `take_token`. Subclasses set `scope` and `get_key`.
+    """
+    scope = None
+
+    def get_ident(self, request):
+        return client_ip(request)
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_time = take_token(self.scope, self.get_key(request, view))
+        return self.wait_time is None
+
+    def wait(self):
+        return self.wait_time
+
+
+class LoginIPThrottle(BucketThrottle):
+    scope = "login_ip"
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class LoginEmailThrottle(BucketThrottle):
+    scope = "login_email"
+
+    def get_key(self, request, view):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        return email.strip().lower() if isinstance(email, str) else None
+
+
+class RegisterIPThrottle(BucketThrottle):
+    scope = "register_ip"
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
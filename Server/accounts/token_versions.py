@@ -0,0 +1,181 @@
+# Import the core libraries and functions
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.test.signals import setting_changed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+# Import the used database tables
+from accounts.models import User
+
+from accounts.conf import accounts_settings
+
+
+# ----------------------------------------------------------------
+# Revocation by counter. Every token carries the user's
+# `token_version` and the global `TOKEN_EPOCH` from when it was issued.
+# A token is refused once its epoch is below `TOKEN_EPOCH`, or its
+# version is below the user's current one. Revoking every token of a
+# user is one UPDATE, and of everyone one setting change, however
+# many tokens are out there.
+#
+# Current versions are kept in a Django cache (`TOKEN_VERSION_CACHE_ALIAS`)
+# and read from the database on a miss. They are never cached from a
+# `User` instance, such as the one a login just read: it may predate a
+# concurrent bump, and caching its version would accept revoked
+# tokens. Use a shared cache so that a bump is seen by every server
+# process straight away; otherwise other processes see it within
+# `TOKEN_VERSION_CACHE_TIMEOUT` seconds.
+# ----------------------------------------------------------------
+
+# `token_version` is one of `accounts.tokens.USER_CLAIMS`
+TOKEN_VERSION_CLAIM = "token_version"
+EPOCH_CLAIM = "epoch"
+
+
+class TokenVersionCache:
+    """
+    Map of user id to current `token_version`, in front of the `User` table.
+    """
+
+    key_prefix = "accounts:token_version:"
+
+    def __init__(self):
+        self._cache = caches[accounts_settings.TOKEN_VERSION_CACHE_ALIAS]
+        self.timeout = accounts_settings.TOKEN_VERSION_CACHE_TIMEOUT
+
+    def key(self, user_id):
+        return f"{self.key_prefix}{user_id}"
+
+    def queryset(self, user_ids):
+        return (
+            User.objects
+            .filter(**{f"{jwt_settings.USER_ID_FIELD}__in": user_ids})
+            .order_by()
+            .values_list(jwt_settings.USER_ID_FIELD, "token_version")
+        )
+
+    def cached(self, user_ids):
+        found = self._cache.get_many([self.key(user_id) for user_id in user_ids])
+        return {user_id: found[self.key(user_id)] for user_id in user_ids if self.key(user_id) in found}
+
+    def store(self, versions):
+        if versions:
+            self._cache.set_many({self.key(user_id): version for user_id, version in versions.items()}, self.timeout)
+
+    def get_many(self, user_ids):
+        """
+        Returns `{user_id: version}` in one cache round trip, plus one
+        query for the misses. Unknown users are left out.
+        """
+        versions = self.cached(user_ids)
+        missing = [user_id for user_id in user_ids if user_id not in versions]
+        if missing:
+            loaded = dict(self.queryset(missing))
+            self.store(loaded)
+            versions.update(loaded)
+        return versions
+
+    async def aget_many(self, user_ids):
+        """
+        Async version of `get_many()` using Django's async ORM.
+        """
+        versions = self.cached(user_ids)
+        missing = [user_id for user_id in user_ids if user_id not in versions]
+        if missing:
+            loaded = {user_id: version async for user_id, version in self.queryset(missing)}
+            self.store(loaded)
+            versions.update(loaded)
+        return versions
+
+    def forget(self, user_ids):
+        self._cache.delete_many([self.key(user_id) for user_id in user_ids])
+
+    def clear(self):
+        self._cache.clear()
+
+
+_token_version_cache = None
+
+
+def get_token_version_cache():
+    """
+    Returns the token version cache, building it on first use.
+    """
+    global _token_version_cache
+
+    if _token_version_cache is None:
+        _token_version_cache = TokenVersionCache()
+    return _token_version_cache
+
+
+def reset_token_version_cache(*args, **kwargs):
+    """
+    Throws away the cache when the settings it reads change.
+    """
+    global _token_version_cache
+
+    if kwargs.get("setting") in (None, "ACCOUNTS", "CACHES", "SIMPLE_JWT"):
+        _token_version_cache = None
+
+
+setting_changed.connect(reset_token_version_cache)
+
+
+def is_current(payload, version):
+    """
+    True when a token with `payload` is from the current epoch and not
+    behind `version`, the user's current token version (None when the
+    user is gone).
+    """
+    if payload.get(EPOCH_CLAIM, 0) < accounts_settings.TOKEN_EPOCH:
+        return False
+    if jwt_settings.USER_ID_CLAIM not in payload:
+        return True
+    return version is not None and payload.get(TOKEN_VERSION_CLAIM, 0) >= version
+
+
+def current_payloads(payloads):
+    """
+    Returns the indexes of the `payloads` that are current, with one
+    cache round trip for all of them. None entries are skipped.
+    """
+    payloads = [(index, payload) for index, payload in enumerate(payloads) if payload is not None]
+    user_ids = {payload[jwt_settings.USER_ID_CLAIM] for index, payload in payloads if jwt_settings.USER_ID_CLAIM in payload}
+    versions = get_token_version_cache().get_many(list(user_ids)) if user_ids else {}
+    return {
+        index for index, payload in payloads
+        if is_current(payload, versions.get(payload.get(jwt_settings.USER_ID_CLAIM)))
+    }
+
+
+def is_token_current(payload):
+    """
+    `is_current()` with the user's version from the cache.
+    """
+    return bool(current_payloads([payload]))
+
+
+async def ais_token_current(payload):
+    """
+    Async version of `is_token_current()`.
+    """
+    user_id = payload.get(jwt_settings.USER_ID_CLAIM)
+    versions = await get_token_version_cache().aget_many([user_id]) if user_id is not None else {}
+    return is_current(payload, versions.get(user_id))
+
+
+def bump_token_versions(user_ids):
+    """
+    Revokes every token of `user_ids` with one UPDATE. Returns the
+    number of users updated.
+    """
+    user_ids = list(user_ids)
+    updated = User.objects.filter(**{f"{jwt_settings.USER_ID_FIELD}__in": user_ids}).update(
+        token_version=F("token_version") + 1,
+    )
+    cache = get_token_version_cache()
+    cache.forget(user_ids)
+    # Again once committed, in case a reader cached the old value meanwhile
+    transaction.on_commit(lambda: cache.forget(user_ids))
+    return updated
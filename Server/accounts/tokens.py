@@ -0,0 +1,137 @@
+# Import the core libraries and functions
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+# Import the used database tables
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from accounts.models import RevokedToken
+
+# Import the blacklist cache layer
+from accounts import blacklist as blacklist_cache
+from accounts.conf import accounts_settings
+from accounts.keys import KeyRingMixin
+from accounts.minting import FastMintMixin
+from accounts.token_versions import EPOCH_CLAIM
+
+
+# User fields copied into every token at issue time. `ClaimsUser` is built
+# from these, so most requests never have to load the `User` row.
+USER_CLAIMS = ("username", "email", "first_name", "last_name", "is_staff", "is_active", "token_version")
+
+
+def user_claims(user):
+    """
+    Returns the `USER_CLAIMS` values for a `User` instance.
+    """
+    return {claim: getattr(user, claim) for claim in USER_CLAIMS}
+
+
+class CachedBlacklistMixin:
+    """
+    Replaces simplejwt's blacklist checks with lookups through
+    `accounts.blacklist`, so repeated checks skip the database.
+    """
+
+    def __init__(self, token=None, verify=True, lookup_blacklist=True):
+        # When False, only the cache is asked during `verify()`. Used by the
+        # refresh flow, where `blacklist()` catches already-used tokens anyway.
+        self.lookup_blacklist = lookup_blacklist
+        super().__init__(token, verify)
+
+    def check_blacklist(self):
+        """
+        Raises `TokenError` if this token is known to be blacklisted.
+        """
+        jti = self.payload[api_settings.JTI_CLAIM]
+
+        if blacklist_cache.is_blacklisted(jti, self.payload.get("exp"), lookup=self.lookup_blacklist):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """
+        Writes the token to the blacklist storage, then to the cache.
+        Returns a `(entry, created)` pair like simplejwt, where `created`
+        is False if the token was already blacklisted.
+        """
+        jti = self.payload[api_settings.JTI_CLAIM]
+        exp = self.payload["exp"]
+
+        if accounts_settings.BLACKLIST_STORAGE == "compact":
+            result = RevokedToken.objects.get_or_create(jti=jti, defaults={"expires_at": datetime_from_epoch(exp)})
+        else:
+            result = super().blacklist()
+        blacklist_cache.record_blacklisted(jti, exp)
+        return result
+
+    async def ablacklist(self):
+        """
+        Async version of `blacklist()` using Django's async ORM.
+        """
+        jti = self.payload[api_settings.JTI_CLAIM]
+        exp = self.payload["exp"]
+
+        if accounts_settings.BLACKLIST_STORAGE == "compact":
+            result = await RevokedToken.objects.aget_or_create(jti=jti, defaults={"expires_at": datetime_from_epoch(exp)})
+        else:
+            token, created = await OutstandingToken.objects.aget_or_create(
+                jti=jti,
+                defaults={
+                    "token": str(self),
+                    "expires_at": datetime_from_epoch(exp),
+                },
+            )
+            result = await BlacklistedToken.objects.aget_or_create(token=token)
+        blacklist_cache.record_blacklisted(jti, exp)
+        return result
+
+
+class AccessToken(KeyRingMixin, FastMintMixin, tokens.AccessToken):
+    pass
+
+
+class RefreshToken(KeyRingMixin, FastMintMixin, CachedBlacklistMixin, tokens.RefreshToken):
+    access_token_class = AccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        """
+        Issues a refresh token carrying the `USER_CLAIMS` and the token
+        epoch, and records it in the outstanding token list (skipped with
+        compact storage). Access tokens made from it copy the claims
+        automatically.
+        """
+        # Skip `BlacklistMixin.for_user`, which saves the outstanding token
+        # before any extra claims can be added
+        token = super(tokens.BlacklistMixin, cls).for_user(user)
+        token.set_user_claims(user_claims(user))
+        token[EPOCH_CLAIM] = accounts_settings.TOKEN_EPOCH
+
+        # Compact storage only keeps blacklisted tokens
+        if accounts_settings.BLACKLIST_STORAGE == "compact":
+            return token
+
+        OutstandingToken.objects.create(
+            user=user,
+            jti=token[api_settings.JTI_CLAIM],
+            token=str(token),
+            created_at=token.current_time,
+            expires_at=datetime_from_epoch(token["exp"]),
+        )
+
+        return token
+
+    def set_user_claims(self, claims):
+        """
+        Overwrites the user claims, e.g. with fresh values on refresh.
+        """
+        for claim, value in claims.items():
+            self.payload[claim] = value
+
+
+class UntypedToken(KeyRingMixin, tokens.UntypedToken):
+    """
+    Any token type, checked for its signature and expiry only.
+    """
@@ -1,10 +1,30 @@
 # Import core libraries and functions
 from django.urls import include, path
 from rest_framework import routers
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
 
 # Import the `User` views
-from accounts.views import CurrentUserViewSet, RegisterUser, BlacklistTokenUpdateView
+from accounts.views import (
+    CurrentUserViewSet, TokenObtainPairView, RegisterUser, BulkRegisterUsers, BlacklistTokenUpdateView, UserListView,
+    TokenIntrospectionView, LogoutAllView, RevokeTokensView,
+)
+from accounts.async_views import (
+    AsyncCurrentUser, AsyncTokenObtainPairView, AsyncTokenRefreshView, AsyncRegisterUser, AsyncBlacklistTokenView,
+)
+from accounts.conf import accounts_settings
+from accounts.instrumentation import metrics_view
+from accounts.keys import jwks_view
+
+
+def select_view(name, sync_view, async_view):
+    """
+    Returns the async implementation of an endpoint when its URL name is
+    listed in `ACCOUNTS['ASYNC_VIEWS']`, otherwise the DRF one. The async
+    views only pay off when served through `core/asgi.py`.
+    """
+    if name in accounts_settings.ASYNC_VIEWS:
+        return async_view
+    return sync_view
 
 
 # Wire up our API using automatic URL routing.
@@ -18,12 +38,46 @@ urlpatterns = [
     # Access the current user's information.
     # Because I use a generic `Viewset` in views.py, I have to specify the acceptable
     # methods. In this case, the only method being allowed is `get`.
-    path("user/", CurrentUserViewSet.as_view({'get': 'get'}), name="current_user"),
+    path(
+        "user/",
+        select_view("current_user", CurrentUserViewSet.as_view({'get': 'get'}), AsyncCurrentUser.as_view()),
+        name="current_user",
+    ),
     # Get a new refresh token
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path(
+        'token/refresh/',
+        select_view('token_refresh', TokenRefreshView.as_view(), AsyncTokenRefreshView.as_view()),
+        name='token_refresh',
+    ),
     # Get a session and refresh token
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path(
+        'token/',
+        select_view('token_obtain_pair', TokenObtainPairView.as_view(), AsyncTokenObtainPairView.as_view()),
+        name='token_obtain_pair',
+    ),
     # Register a new user
-    path('register/', RegisterUser.as_view(), name="register_user"),
-    path('logout/blacklist/', BlacklistTokenUpdateView.as_view(), name='blacklist')
-]
\ No newline at end of file
+    path(
+        'register/',
+        select_view('register_user', RegisterUser.as_view(), AsyncRegisterUser.as_view()),
+        name="register_user",
+    ),
+    # List and search users (staff only)
+    path('users/', UserListView.as_view(), name="user_list"),
+    # Register many users at once (staff only)
+    path('register/bulk/', BulkRegisterUsers.as_view(), name="bulk_register_users"),
+    path(
+        'logout/blacklist/',
+        select_view('blacklist', BlacklistTokenUpdateView.as_view(), AsyncBlacklistTokenView.as_view()),
+        name='blacklist',
+    ),
+    # Revokes every refresh token of the current user
+    path('logout/all/', LogoutAllView.as_view(), name='logout_all'),
+    # Revokes every refresh token of a list of users (staff only)
+    path('revoke/', RevokeTokensView.as_view(), name='revoke_tokens'),
+    # Checks a batch of tokens at once (staff only)
+    path('introspect/', TokenIntrospectionView.as_view(), name='introspect'),
+    # Request metrics in the Prometheus format, when instrumentation is on
+    path('metrics/', metrics_view, name='metrics'),
+    # Public keys for verifying tokens, see `accounts/verifier.py`
+    path('jwks/', jwks_view, name='jwks'),
+]
@@ -0,0 +1,150 @@
+"""
+Verifies tokens issued by this server from its public keys, without
+calling back to it. Needs only PyJWT and cryptography, not Django, so
+any Python service can copy this module:
+
+    verifier = TokenVerifier(jwks_url="https://auth.example.com/accounts/jwks/")
+    payload = verifier.verify(raw_token)
+
+Public keys are parsed once and cached by their `kid`. A token signed
+with an unknown `kid` (after a key rotation) triggers one refetch of
+the key set, at most every `min_refresh_interval` seconds, so forged
+`kid` values can't flood the server with requests.
+"""
+# Import the core libraries and functions
+import json
+import threading
+import time
+import urllib.request
+
+import jwt
+
+
+# Algorithms this server signs with when asymmetric keys are configured
+ALGORITHMS = ("RS256", "EdDSA")
+
+
+class TokenVerifier:
+    """
+    Verifies tokens against a JSON Web Key Set, given directly as `jwks`
+    or fetched from `jwks_url`. Raises `jwt.InvalidTokenError` (or one of
+    its subclasses) for any token that doesn't verify.
+    """
+
+    def __init__(
+        self,
+        jwks=None,
+        jwks_url=None,
+        algorithms=ALGORITHMS,
+        audience=None,
+        issuer=None,
+        leeway=0,
+        max_age=300,
+        min_refresh_interval=10,
+        timeout=5,
+    ):
+        if jwks is None and jwks_url is None:
+            raise ValueError("Either `jwks` or `jwks_url` is required.")
+        self.jwks_url = jwks_url
+        self.algorithms = frozenset(algorithms)
+        self.audience = audience
+        self.issuer = issuer
+        self.leeway = leeway
+        # Fetched key sets are reloaded when older than this, which also
+        # drops retired keys
+        self.max_age = max_age
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+
+        self._keys = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        if jwks is not None:
+            self.load(jwks)
+
+    def load(self, jwks):
+        """
+        Parses a key set (a dictionary or its JSON) and replaces the cache.
+        Keys without a `kid` or with an unsupported algorithm are skipped.
+        """
+        if isinstance(jwks, (str, bytes)):
+            jwks = json.loads(jwks)
+
+        keys = {}
+        for data in jwks.get("keys", ()):
+            kid = data.get("kid")
+            if kid is None:
+                continue
+            try:
+                key = jwt.PyJWK(data)
+            except (jwt.PyJWKError, jwt.InvalidKeyError):
+                continue
+            algorithm = data.get("alg") or ("EdDSA" if data.get("kty") == "OKP" else "RS256")
+            if algorithm in self.algorithms:
+                keys[kid] = (key.key, algorithm)
+
+        self._keys = keys
+        self._loaded_at = time.monotonic()
+
+    def fetch(self):
+        """
+        Downloads the key set from `jwks_url`.
+        """
+        with urllib.request.urlopen(self.jwks_url, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def refresh(self, force=False):
+        """
+        Refetches the key set from `jwks_url`, unless it was fetched less
+        than `min_refresh_interval` seconds ago. Keeps the current keys
+        when the fetch fails.
+        """
+        if self.jwks_url is None:
+            return
+        with self._lock:
+            loaded_at = self._loaded_at
+            if not force and loaded_at is not None and time.monotonic() - loaded_at < self.min_refresh_interval:
+                return
+            try:
+                jwks = self.fetch()
+            except (OSError, ValueError):
+                # Try again after the interval rather than on every token
+                self._loaded_at = time.monotonic()
+                return
+            self.load(jwks)
+
+    def get_key(self, kid):
+        """
+        Returns the `(key, algorithm)` pair for `kid`, or None.
+        """
+        if self.jwks_url is not None and (
+            self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age
+        ):
+            self.refresh()
+
+        key = self._keys.get(kid)
+        if key is None:
+            self.refresh()
+            key = self._keys.get(kid)
+        return key
+
+    def verify(self, token):
+        """
+        Checks the signature, expiry, audience and issuer of `token` and
+        returns its payload.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.get_key(kid) if kid is not None else None
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        key, algorithm = key
+
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=self.audience,
+            issuer=self.issuer,
+            leeway=self.leeway,
+            options={"verify_aud": self.audience is not None},
+        )
@@ -1,19 +1,40 @@
 # Import the core libraries and functions
-from django.shortcuts import get_object_or_404
+from types import GeneratorType
+
 from rest_framework import permissions, status, viewsets
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.generics import CreateAPIView, RetrieveUpdateAPIView
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateAPIView
+from rest_framework.pagination import CursorPagination
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt import views as jwt_views
 
 # Import the used database tables
 from accounts.models import User
 from django.contrib.auth.models import Group
 
 # Import the used serializers
-from accounts.serializers import RegistrationSerializer, GroupSerializer, UserSerializer
+from accounts.serializers import (
+    RegistrationSerializer, GroupSerializer, RevokeTokensSerializer, TokenIntrospectionSerializer, UserListSerializer,
+    UserSerializer,
+)
+
+# Import the token classes
+from accounts.tokens import RefreshToken, UntypedToken
+
+from accounts.authentication import get_verified_token_cache
+from accounts.blacklist import filter_blacklisted
+from accounts.bulk import bulk_register
+from accounts.conf import accounts_settings
+from accounts.hashing import get_executor
+from accounts.parsers import FastJSONParser, NDJSONParser
+from accounts.revocation import revoke_user_tokens
+from accounts.search import prefix_search
+from accounts.throttling import LoginEmailThrottle, LoginIPThrottle, RegisterIPThrottle
+from accounts.token_versions import current_payloads
 
 
 # ----------------------------------------------------------------
@@ -27,19 +48,26 @@ class CurrentUserViewSet(viewsets.ViewSet):
         """
         Returns the current user based on their token authentication information.
         This restricts the user's information by binding it directly with
-        the current token.
+        the current token. The user is answered from the token claims, so
+        no database query is needed.
         """
-        queryset = User.objects.all()
-        user = get_object_or_404(queryset, pk=request.auth.payload["user_id"])
-        serializer = UserSerializer(user)
+        serializer = UserSerializer(request.user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+# Login. Same as simplejwt's view, but attempts are rate limited per
+# IP and per email before the password is checked.
+class TokenObtainPairView(jwt_views.TokenObtainPairView):
+    throttle_classes = (LoginIPThrottle, LoginEmailThrottle,)
+
+
 # Creates a new user in the system
 # class CustomUserCreate(APIView):
 class RegisterUser(CreateAPIView):
     # Any user should be allowed to register, so AllowAny
     permission_classes = (AllowAny,)
+    # Checked before the password is hashed
+    throttle_classes = (RegisterIPThrottle,)
 
     # Validates a new user's information, saves it, and returns that user information
     def post(self, request):
@@ -65,6 +93,108 @@ class RegisterUser(CreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# Creates many users at once, for onboarding whole tenants.
+# Only staff members may use it.
+class BulkRegisterUsers(APIView):
+    permission_classes = (permissions.IsAdminUser,)
+    parser_classes = (FastJSONParser, NDJSONParser,)
+
+    def post(self, request):
+        """
+        Takes a JSON list or an NDJSON stream of users (email, username,
+        password and optionally first_name / last_name) and creates them in
+        batches. Rows that fail are reported by row number and do not stop
+        the others.
+        """
+        records = request.data
+        # A JSON body must be a list, NDJSON bodies are parsed lazily
+        if not isinstance(records, (list, GeneratorType)):
+            return Response(
+                {"non_field_errors": ["Expected a list of users."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # Hash on the shared executor, starting a pool per request would
+        # fork a process per CPU inside the web worker every time
+        result = bulk_register(
+            records,
+            batch_size=accounts_settings.BULK_REGISTER_BATCH_SIZE,
+            workers=0,
+            executor=get_executor(),
+        )
+        return Response(result.as_dict(), status=status.HTTP_201_CREATED)
+
+
+# Keyset pagination in `User.Meta.ordering` order. Emails are unique,
+# so the cursor is the last email of the page and every page is one
+# index range scan, however deep the client pages.
+class UserCursorPagination(CursorPagination):
+    ordering = "email"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+# Lists users for staff members.
+class UserListView(ListAPIView):
+    permission_classes = (permissions.IsAdminUser,)
+    serializer_class = UserListSerializer
+    pagination_class = UserCursorPagination
+
+    def get_fields(self):
+        """
+        Returns the fields asked for with `?fields=id,email`, or None for all.
+        """
+        fields = self.request.query_params.get("fields")
+        if not fields:
+            return None
+        fields = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(fields) - set(UserListSerializer.get_plan().names)
+        if unknown:
+            raise ValidationError({"fields": [f"Unknown fields: {', '.join(sorted(unknown))}."]})
+        return fields
+
+    def get_columns(self, fields):
+        """
+        The columns the selected fields read. The cursor needs the email of every row.
+        """
+        columns = UserListSerializer.values_columns(fields)
+        return columns if "email" in columns else columns + ["email"]
+
+    def get_queryset(self):
+        """
+        Users starting with `?search=` (email, username or names), optionally
+        filtered with `?is_active=` / `?is_staff=`.
+        """
+        queryset = User.objects.all()
+
+        search = self.request.query_params.get("search")
+        if search:
+            queryset = prefix_search(queryset, search)
+        for flag in ("is_active", "is_staff"):
+            value = self.request.query_params.get(flag)
+            if value is not None:
+                queryset = queryset.filter(**{flag: value.lower() in ("1", "true", "yes")})
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """
+        Only the columns of the selected fields are loaded. With the fast
+        serializers on, the page is rendered straight from `values()` rows
+        without building any `User`.
+        """
+        fields = self.get_fields()
+        columns = self.get_columns(fields)
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if not accounts_settings.FAST_SERIALIZERS:
+            page = self.paginate_queryset(queryset.only(*columns))
+            return self.get_paginated_response(self.get_serializer(page, many=True, fields=fields).data)
+
+        page = self.paginate_queryset(queryset.values(*columns))
+        data = UserListSerializer.render_values(page, fields, self.get_serializer_context())
+        return self.get_paginated_response(data)
+
+
 # On logout, moves that used token to the `blacklist` to keep users
 # from accessing content without having to login again.
 class BlacklistTokenUpdateView(APIView):
@@ -74,12 +204,88 @@ class BlacklistTokenUpdateView(APIView):
     def post(self, request):
         """
         Upon logout, take the "request_token" from the request
-        and add it to the blacklist model.
+        and add it to the blacklist model. The blacklist cache is
+        updated as well, so the token is refused straight away, and
+        the user's cached access tokens are dropped.
         """
         try:
             refresh_token = request.data["refresh_token"]
             token = RefreshToken(refresh_token)
             token.blacklist()
+            get_verified_token_cache().evict_user(token.get(jwt_settings.USER_ID_CLAIM))
             return Response(status=status.HTTP_205_RESET_CONTENT)
         except Exception as e:
-            return Response(status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+
+
+def revoke_response(user_ids):
+    """
+    Revokes every token of `user_ids`. Reports the users updated and
+    the refresh tokens blacklisted.
+    """
+    result = revoke_user_tokens(user_ids)
+    return Response({"users": result.users, "revoked": result.revoked}, status=status.HTTP_200_OK)
+
+
+# Logs the current user out everywhere, by revoking every refresh
+# token they hold.
+class LogoutAllView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request):
+        return revoke_response([request.user.id])
+
+
+# Revokes every refresh token of a list of users, e.g. after an
+# account compromise. Only staff members may use it.
+class RevokeTokensView(APIView):
+    permission_classes = (permissions.IsAdminUser,)
+
+    def post(self, request):
+        """
+        Takes `{"users": [id, ...]}` and returns `{"revoked": count}`.
+        """
+        serializer = RevokeTokensSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return revoke_response(serializer.validated_data["users"])
+
+
+# Checks a batch of tokens for a gateway or another service, which
+# authenticates as a staff user. Answers follow RFC 7662: the claims
+# of each valid token with `"active": true`, or `"active": false`.
+class TokenIntrospectionView(APIView):
+    permission_classes = (permissions.IsAdminUser,)
+
+    def post(self, request):
+        """
+        Takes `{"tokens": [...]}` and returns `{"results": [...]}` in the
+        same order. Signatures and expiry are checked per token, then the
+        token versions and the blacklist are asked about every valid
+        token at once.
+        """
+        serializer = TokenIntrospectionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        payloads = []
+        for raw_token in serializer.validated_data["tokens"]:
+            try:
+                payloads.append(UntypedToken(raw_token).payload)
+            except TokenError:
+                payloads.append(None)
+
+        blacklisted = filter_blacklisted({
+            payload[jwt_settings.JTI_CLAIM]: payload.get("exp") for payload in payloads if payload is not None
+        })
+        current = current_payloads(payloads)
+
+        results = []
+        for index, payload in enumerate(payloads):
+            if payload is None:
+                results.append({"active": False, "error": "token_not_valid"})
+            elif index not in current:
+                results.append({"active": False, "error": "token_revoked"})
+            elif payload[jwt_settings.JTI_CLAIM] in blacklisted:
+                results.append({"active": False, "error": "token_blacklisted"})
+            else:
+                results.append({"active": True, **payload})
+        return Response({"results": results}, status=status.HTTP_200_OK)
@@ -0,0 +1,57 @@
+"""
+Performance benchmarks for the Server project.
+
+Run them from the `Server/` folder, for example:
+    python -m benchmarks.hashing
+
+Every benchmark runs against a throw-away test database, so the
+development database is never touched.
+"""
+# Import the core libraries and functions
+import atexit
+import os
+import tempfile
+import time
+
+
+def setup(settings_module="core.settings"):
+    """
+    Sets up Django and creates a fresh test database for a benchmark run.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    if connection.vendor == "sqlite":
+        # A file rather than SQLite's shared in-memory database, which
+        # fails with "table is locked" under concurrent writers
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3")
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    atexit.register(connection.creation.destroy_test_db, old_name, verbosity=0)
+
+
+def timed(func, *args, **kwargs):
+    """
+    Runs `func` once and returns `(result, seconds)`.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def print_table(title, rows, columns):
+    """
+    Prints a list of dictionaries as a plain text table.
+    """
+    print(f"\n{title}")
+    widths = [max(len(column), *(len(str(row[column])) for row in rows)) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(str(row[column]).ljust(width) for column, width in zip(columns, widths)))
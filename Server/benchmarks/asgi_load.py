@@ -0,0 +1,164 @@
+"""
+Load test of the `accounts` endpoints under uvicorn, comparing the DRF
+(sync) views with the async views from `accounts/async_views.py`.
+
+Each simulated client logs in, reads `/accounts/user/` a few times,
+refreshes its token and logs out. Needs uvicorn (`pip install uvicorn`).
+
+    python -m benchmarks.asgi_load --clients 32 --concurrency 16
+"""
+# Import the core libraries and functions
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import print_table
+
+
+ASYNC_VIEWS = "current_user,token_obtain_pair,token_refresh,register_user,blacklist"
+PASSWORD = "benchmark-password-123"
+
+
+def prepare_database(path, clients):
+    """
+    Migrates a fresh SQLite database and creates one user per client.
+    """
+    os.environ["BENCHMARK_DATABASE"] = path
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings"
+
+    import django
+    django.setup()
+
+    from django.contrib.auth.hashers import make_password
+    from django.core.management import call_command
+    from accounts.models import User
+
+    call_command("migrate", verbosity=0)
+    encoded = make_password(PASSWORD)
+    User.objects.bulk_create(
+        User(email=f"load{i}@example.com", username=f"load{i}", password=encoded) for i in range(clients)
+    )
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, database, async_views):
+    """
+    Starts uvicorn on `core.asgi` and waits until it accepts connections.
+    """
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE="benchmarks.settings",
+        BENCHMARK_DATABASE=database,
+        BENCHMARK_ASYNC_VIEWS=async_views,
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "core.asgi:application", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def client_session(port, number, reads):
+    """
+    Runs one client's login / read / refresh / logout sequence. Returns a
+    list of `(endpoint, status, seconds)` tuples.
+    """
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    results = []
+
+    def call(endpoint, method, path, body=None, token=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"JWT {token}"
+        start = time.perf_counter()
+        connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = connection.getresponse()
+        data = response.read()
+        results.append((endpoint, response.status, time.perf_counter() - start))
+        return json.loads(data) if data else None
+
+    tokens = call("login", "POST", "/accounts/token/", dict(email=f"load{number}@example.com", password=PASSWORD))
+    for _ in range(reads):
+        call("user", "GET", "/accounts/user/", token=tokens["access"])
+    tokens = call("refresh", "POST", "/accounts/token/refresh/", dict(refresh=tokens["refresh"]))
+    call("logout", "POST", "/accounts/logout/blacklist/", dict(refresh_token=tokens["refresh"]))
+
+    connection.close()
+    return results
+
+
+def run(port, clients, concurrency, reads):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        sessions = list(pool.map(lambda number: client_session(port, number, reads), range(clients)))
+        elapsed = time.perf_counter() - start
+    return [result for session in sessions for result in session], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32, help="Simulated clients (one user each).")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clients running at once.")
+    parser.add_argument("--reads", type=int, default=10, help="`/accounts/user/` reads per client.")
+    args = parser.parse_args()
+
+    try:
+        import uvicorn  # noqa: F401
+    except ImportError:
+        sys.exit("uvicorn is not installed: pip install uvicorn")
+
+    rows = []
+    for label, async_views in (("sync (DRF)", ""), ("async", ASYNC_VIEWS)):
+        # Every mode gets a fresh database, since logout blacklists tokens
+        path = os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3")
+        subprocess.run(
+            [sys.executable, "-c", f"from benchmarks.asgi_load import prepare_database; prepare_database({path!r}, {args.clients})"],
+            check=True,
+        )
+        port = free_port()
+        server = start_server(port, path, async_views)
+        try:
+            results, elapsed = run(port, args.clients, args.concurrency, args.reads)
+        finally:
+            server.terminate()
+            server.wait()
+
+        failures = sum(1 for endpoint, status, seconds in results if status >= 400)
+        per_endpoint = Counter()
+        for endpoint, status, seconds in results:
+            per_endpoint[endpoint] += seconds
+        row = {"views": label, "requests": len(results), "failed": failures, "req/sec": f"{len(results) / elapsed:.1f}"}
+        for endpoint in ("login", "user", "refresh", "logout"):
+            count = sum(1 for result in results if result[0] == endpoint)
+            row[f"{endpoint} ms"] = f"{per_endpoint[endpoint] / count * 1000:.1f}"
+        rows.append(row)
+
+    print_table(
+        f"uvicorn, {args.clients} clients, concurrency {args.concurrency}",
+        rows,
+        ["views", "requests", "failed", "req/sec", "login ms", "user ms", "refresh ms", "logout ms"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Compares login throughput with the development database settings and
+the persistent-connection profile from `core/database.py`. Logins run
+through Django's WSGI handler on a fixed pool of threads, the way a
+threaded WSGI server serves them, so connections are closed (or kept)
+between requests exactly as in production.
+
+    python -m benchmarks.database --logins 2000 --concurrency 8
+
+Add `--postgresql` to also run against a PostgreSQL server configured
+with the `DATABASE_*` variables (see `core/database.py`). A throw-away
+local server is enough, for example:
+
+    docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=bench postgres
+    DATABASE_USER=postgres DATABASE_PASSWORD=bench DATABASE_HOST=localhost \\
+        python -m benchmarks.database --postgresql
+
+The benchmark creates and drops its own `test_` database on that server.
+"""
+# Import the core libraries and functions
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import print_table, setup, timed
+
+
+PASSWORD = "benchmark-password-123"
+# Password hashing would hide the database costs, see `--hasher`
+FAST_HASHER = "django.contrib.auth.hashers.MD5PasswordHasher"
+
+
+def profiles(postgresql):
+    """
+    Returns `(label, environment)` pairs, one per configuration to compare.
+    """
+    yield "sqlite (core.settings)", {}
+    yield "sqlite tuned (production)", {"BENCHMARK_DB_PROFILE": "production"}
+    if postgresql:
+        production = {"BENCHMARK_DB_PROFILE": "production", "DATABASE_ENGINE": "postgresql"}
+        yield "postgresql, no persistence", dict(production, DATABASE_CONN_MAX_AGE="0")
+        yield "postgresql (production)", production
+
+
+def run_logins(logins, concurrency):
+    """
+    Runs in the child process: logs `logins` users in through the WSGI
+    handler and prints the results as JSON.
+    """
+    setup("benchmarks.settings")
+
+    from django.contrib.auth.hashers import make_password
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+    from django.test import RequestFactory
+    from accounts.models import User
+
+    encoded = make_password(PASSWORD)
+    emails = [f"bench{i}@example.com" for i in range(logins)]
+    User.objects.bulk_create(User(email=email, username=email, password=encoded) for email in emails)
+    # Start the timed run without a connection, like a fresh worker
+    connection.close()
+
+    opened = []
+    lock = threading.Lock()
+
+    def count_connection(sender, **kwargs):
+        with lock:
+            opened.append(sender)
+
+    connection_created.connect(count_connection)
+
+    handler = get_wsgi_application()
+    factory = RequestFactory()
+
+    def login(email):
+        body = json.dumps(dict(email=email, password=PASSWORD))
+        environ = factory.post("/accounts/token/", data=body, content_type="application/json").environ
+        statuses = []
+        response = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        # Sends `request_finished`, which closes or keeps the connection
+        response.close()
+        return statuses[0]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        codes, seconds = timed(lambda: list(pool.map(login, emails)))
+
+    failed = sum(1 for code in codes if not code.startswith("200"))
+    print(json.dumps({"logins/sec": logins / seconds, "connections": len(opened), "failed": failed}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=2000, help="Logins per configuration.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Server threads.")
+    parser.add_argument("--postgresql", action="store_true", help="Also run against PostgreSQL.")
+    parser.add_argument(
+        "--hasher",
+        default=FAST_HASHER,
+        help="Password hasher used for the run. Pass 'default' to keep the project's hashers.",
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_logins(args.logins, args.concurrency)
+        return
+
+    rows = []
+    for label, environment in profiles(args.postgresql):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="benchmarks.settings", **environment)
+        if args.hasher != "default":
+            env["BENCHMARK_PASSWORD_HASHER"] = args.hasher
+        # A fresh interpreter per configuration, since settings load once
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.database", "--child",
+             "--logins", str(args.logins), "--concurrency", str(args.concurrency)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        rows.append({
+            "database": label,
+            "logins/sec": f"{result['logins/sec']:.1f}",
+            "connections opened": result["connections"],
+            "failed": result["failed"],
+        })
+
+    print_table(
+        f"Login throughput ({args.logins} logins, {args.concurrency} threads)",
+        rows,
+        ["database", "logins/sec", "connections opened", "failed"],
+    )
+
+
+if __name__ == "__main__":
+    main()
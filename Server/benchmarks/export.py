@@ -0,0 +1,91 @@
+"""
+Measures `accounts.export` throughput (rows per second) and peak Python
+memory for each output format, against loading the whole table through
+the ORM and dumping it in one go. The xz compressor alone holds close to
+100 MiB of buffers at its default preset, whatever the table size.
+
+    python -m benchmarks.export --users 100000 --chunk-size 2000
+"""
+# Import the core libraries and functions
+import argparse
+import json
+import os
+import tempfile
+import tracemalloc
+
+from benchmarks import print_table, setup, timed
+
+
+def measure(func):
+    """
+    Runs `func` twice and returns `(seconds, peak MiB)`. Memory is traced
+    on the second run only, tracing slows everything down.
+    """
+    seconds = timed(func)[1]
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000, help="Users in the table.")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per round trip.")
+    args = parser.parse_args()
+
+    setup("benchmarks.settings")
+
+    from django.db import transaction
+    from accounts.export import EXPORT_FIELDS, export_users, open_output
+    from accounts.models import User
+
+    batch = 10_000
+    with transaction.atomic():
+        for offset in range(0, args.users, batch):
+            users = [
+                User(email=f"bench{n}@example.com", username=f"bench{n}", first_name="Bench", password="!")
+                for n in range(offset, min(offset + batch, args.users))
+            ]
+            for user in users:
+                user.refresh_display_name()
+            User.objects.bulk_create(users)
+
+    directory = tempfile.mkdtemp()
+
+    def orm_dump():
+        # What the command replaces: every object in memory, then one dump
+        users = list(User.objects.all())
+        rows = [{field: str(getattr(user, field)) for field in EXPORT_FIELDS} for user in users]
+        with open(os.path.join(directory, "orm.json"), "w") as stream:
+            json.dump(rows, stream)
+
+    def export(format, compression, suffix):
+        def run():
+            with open_output(os.path.join(directory, f"users.{suffix}"), compression) as stream:
+                export_users(stream, format, chunk_size=args.chunk_size)
+        return run
+
+    runs = [
+        ("ORM list + json.dump", orm_dump),
+        ("ndjson", export("ndjson", None, "ndjson")),
+        ("csv", export("csv", None, "csv")),
+        ("ndjson + gzip", export("ndjson", "gzip", "ndjson.gz")),
+        ("csv + xz", export("csv", "xz", "csv.xz")),
+    ]
+
+    rows = []
+    for name, func in runs:
+        seconds, peak = measure(func)
+        rows.append({
+            "export": name,
+            "rows/sec": f"{args.users / seconds:.0f}",
+            "peak MiB": f"{peak:.1f}",
+        })
+
+    print_table(f"User export ({args.users} users, chunk size {args.chunk_size})", rows, ["export", "rows/sec", "peak MiB"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compares the password hasher profiles in `ACCOUNTS['PASSWORD_HASHER_PROFILES']`:
+time per hash and logins per second through the DRF login view, to pick
+a cost the hardware can afford. Profiles whose library isn't installed
+are skipped.
+
+    python -m benchmarks.hasher_profiles --logins 64 --concurrency 8
+    python -m benchmarks.hasher_profiles --profiles default scrypt
+"""
+# Import the core libraries and functions
+import argparse
+import os
+
+from benchmarks import print_table, setup, timed
+from benchmarks.hashing import PASSWORD, sync_logins
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="*", help="Profiles to compare. Defaults to every configured profile.")
+    parser.add_argument("--logins", type=int, default=64, help="Logins per profile.")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count(), help="Requests in flight at once.")
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from django.test import override_settings
+    from accounts.conf import accounts_settings
+    from accounts.hashing import make_password
+    from accounts.management.commands.password_hashes import describe
+    from accounts.models import User
+
+    rows = []
+    for name in args.profiles or accounts_settings.PASSWORD_HASHER_PROFILES:
+        with override_settings(ACCOUNTS=dict(settings.ACCOUNTS, PASSWORD_HASHER_PROFILE=name)):
+            try:
+                encoded, seconds = timed(make_password, PASSWORD)
+            except ValueError as error:
+                print(f"Skipping {name}: {error}")
+                continue
+
+            emails = [f"{name}{i}@example.com" for i in range(args.logins)]
+            User.objects.bulk_create(User(email=email, username=email, password=encoded) for email in emails)
+            login_seconds = sync_logins(emails, args.concurrency)
+
+        rows.append({
+            "profile": name,
+            "hash": " ".join(describe(encoded)),
+            "ms/hash": f"{seconds * 1000:.1f}",
+            "logins/sec": f"{args.logins / login_seconds:.1f}",
+        })
+
+    print_table(
+        f"Login throughput per hasher profile ({args.logins} logins, concurrency {args.concurrency})",
+        rows,
+        ["profile", "hash", "ms/hash", "logins/sec"],
+    )
+
+
+if __name__ == "__main__":
+    main()
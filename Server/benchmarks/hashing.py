@@ -0,0 +1,130 @@
+"""
+Compares password hashing throughput with each `PASSWORD_HASHING_EXECUTOR`
+setting, first for raw password checks and then for the sync (DRF) and
+async login views under concurrent load.
+
+    python -m benchmarks.hashing --logins 64 --concurrency 8
+"""
+# Import the core libraries and functions
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import print_table, setup, timed
+
+
+EXECUTORS = (None, "thread", "process")
+PASSWORD = "benchmark-password-123"
+
+
+def raw_checks(encoded, count, kind, workers):
+    """
+    Checks `count` passwords at once on the given executor kind.
+    """
+    from django.contrib.auth import hashers
+    from accounts.hashing import build_executor
+
+    executor = build_executor(kind, workers)
+    if executor is None:
+        return timed(lambda: [hashers.check_password(PASSWORD, encoded) for _ in range(count)])[1]
+    try:
+        # Start the workers before timing
+        list(executor.map(hashers.check_password, [PASSWORD] * workers, [encoded] * workers))
+        return timed(lambda: list(executor.map(hashers.check_password, [PASSWORD] * count, [encoded] * count)))[1]
+    finally:
+        executor.shutdown()
+
+
+def sync_logins(emails, concurrency):
+    """
+    Logs every user in through the DRF view using `concurrency` threads.
+    """
+    from django.db import connections
+    from django.test import RequestFactory
+    from rest_framework_simplejwt.views import TokenObtainPairView
+
+    view = TokenObtainPairView.as_view()
+    factory = RequestFactory()
+
+    def login(email):
+        request = factory.post("/", data=json.dumps(dict(email=email, password=PASSWORD)), content_type="application/json")
+        status_code = view(request).status_code
+        connections.close_all()
+        return status_code
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        codes, seconds = timed(lambda: list(pool.map(login, emails)))
+    assert set(codes) == {200}, codes
+    return seconds
+
+
+def async_logins(emails, concurrency):
+    """
+    Logs every user in through the async view, `concurrency` at a time.
+    """
+    from django.test import AsyncRequestFactory
+    from accounts.async_views import AsyncTokenObtainPairView
+
+    view = AsyncTokenObtainPairView.as_view()
+    factory = AsyncRequestFactory()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login(email):
+        async with semaphore:
+            request = factory.post("/", data=json.dumps(dict(email=email, password=PASSWORD)), content_type="application/json")
+            return (await view(request)).status_code
+
+    async def run():
+        return await asyncio.gather(*(login(email) for email in emails))
+
+    codes, seconds = timed(asyncio.run, run())
+    assert set(codes) == {200}, codes
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64, help="Logins (and raw checks) per run.")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count(), help="Requests in flight at once.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Hashing pool size.")
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from django.test import override_settings
+    from accounts.models import User
+
+    encoded = make_password(PASSWORD)
+    emails = [f"bench{i}@example.com" for i in range(args.logins)]
+    User.objects.bulk_create(User(email=email, username=email, password=encoded) for email in emails)
+
+    rows = []
+    for kind in EXECUTORS:
+        seconds = raw_checks(encoded, args.logins, kind, args.workers)
+        rows.append({"executor": str(kind), "checks/sec": f"{args.logins / seconds:.1f}"})
+    print_table(f"Raw password checks ({args.workers} workers)", rows, ["executor", "checks/sec"])
+
+    rows = []
+    for kind in EXECUTORS:
+        accounts = dict(settings.ACCOUNTS, PASSWORD_HASHING_EXECUTOR=kind, PASSWORD_HASHING_WORKERS=args.workers)
+        with override_settings(ACCOUNTS=accounts):
+            sync_seconds = sync_logins(emails, args.concurrency)
+            async_seconds = async_logins(emails, args.concurrency)
+        rows.append({
+            "executor": str(kind),
+            "sync logins/sec": f"{args.logins / sync_seconds:.1f}",
+            "async logins/sec": f"{args.logins / async_seconds:.1f}",
+        })
+    print_table(
+        f"Login throughput ({args.logins} logins, concurrency {args.concurrency})",
+        rows,
+        ["executor", "sync logins/sec", "async logins/sec"],
+    )
+
+
+if __name__ == "__main__":
+    main()
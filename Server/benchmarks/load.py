@@ -0,0 +1,344 @@
+"""
+Load and latency benchmark of the `accounts` endpoints. Simulated
+clients replay a weighted mix of register / login / user / refresh /
+logout calls against the project's WSGI or ASGI application, served
+in-process, and the run reports p50/p95/p99 latency, throughput and
+database queries per request for each endpoint.
+
+    python -m benchmarks.load --server wsgi --clients 16 --operations 50
+    python -m benchmarks.load --server asgi --async-views --output load.json
+
+`--output` writes the results as JSON, to compare runs over time. Users
+are generated with `generic_functions.generic_test_helpers`.
+"""
+# Import the core libraries and functions
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import platform
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import print_table, setup, timed
+from generic_functions.generic_test_helpers import random_length_string
+
+
+ASYNC_VIEWS = "current_user,token_obtain_pair,token_refresh,register_user,blacklist"
+ENDPOINTS = ("register", "login", "user", "refresh", "logout")
+DEFAULT_MIX = "register=5,login=15,user=60,refresh=15,logout=5"
+# Password hashing would hide everything else, see `--hasher`
+FAST_HASHER = "django.contrib.auth.hashers.MD5PasswordHasher"
+
+# Endpoint of the request running in this thread or task, for the query counter
+current_endpoint = contextvars.ContextVar("current_endpoint", default=None)
+
+
+def parse_mix(text):
+    """
+    Turns "login=40,user=60" into `{"login": 40, "user": 60}`.
+    """
+    mix = {}
+    for part in text.split(","):
+        name, weight = part.split("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name!r}, expected one of {', '.join(ENDPOINTS)}.")
+        mix[name] = float(weight)
+    return mix
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile of a sorted list.
+    """
+    if not values:
+        return 0.0
+    rank = max(int(round(percent / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def new_credentials():
+    """
+    A random user, in the same style as `accounts.tests.test_models.CreateUser`.
+    """
+    username = random_length_string(low=8, high=16)
+    return {"username": username, "email": f"{username}@example.com", "password": random_length_string(low=8, high=16)}
+
+
+class Recorder:
+    """
+    Collects latency and query counts per endpoint.
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.queries = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def count_query(self, execute, sql, params, many, context):
+        endpoint = current_endpoint.get()
+        if endpoint is not None:
+            with self._lock:
+                self.queries[endpoint] += 1
+        return execute(sql, params, many, context)
+
+    def install(self):
+        """
+        Counts the queries of every database connection opened from now on.
+        """
+        from django.db.backends.signals import connection_created
+
+        def add_wrapper(sender, connection, **kwargs):
+            if self.count_query not in connection.execute_wrappers:
+                connection.execute_wrappers.append(self.count_query)
+
+        # Kept on the instance, since signals only hold weak references
+        self._add_wrapper = add_wrapper
+        connection_created.connect(add_wrapper)
+
+    def record(self, endpoint, status, seconds):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if status >= 400:
+                self.errors[endpoint] += 1
+
+    def summary(self, elapsed):
+        """
+        Returns the results as a dictionary, one entry per endpoint plus "all".
+        """
+        results = {}
+        everything = []
+        for endpoint in ENDPOINTS:
+            latencies = sorted(self.latencies[endpoint])
+            if not latencies:
+                continue
+            everything.extend(latencies)
+            results[endpoint] = self.describe(latencies, self.errors[endpoint], self.queries[endpoint], elapsed)
+        results["all"] = self.describe(
+            sorted(everything), sum(self.errors.values()), sum(self.queries.values()), elapsed,
+        )
+        return results
+
+    def describe(self, latencies, errors, queries, elapsed):
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "requests/sec": len(latencies) / elapsed,
+            "p50 ms": percentile(latencies, 50) * 1000,
+            "p95 ms": percentile(latencies, 95) * 1000,
+            "p99 ms": percentile(latencies, 99) * 1000,
+            "queries/request": queries / len(latencies),
+        }
+
+
+class Client:
+    """
+    One simulated client. Picks its next call from the mix, falling back
+    to a login whenever the call needs tokens it does not have.
+    """
+
+    def __init__(self, users, mix, rng):
+        self.users = users
+        self.mix = mix
+        self.rng = rng
+        self.tokens = None
+
+    def next_call(self):
+        """
+        Returns `(endpoint, method, path, body, access_token)`.
+        """
+        endpoint = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if endpoint in ("user", "refresh", "logout") and self.tokens is None:
+            endpoint = "login"
+
+        if endpoint == "register":
+            return endpoint, "POST", "/accounts/register/", new_credentials(), None
+        if endpoint == "login":
+            user = self.rng.choice(self.users)
+            return endpoint, "POST", "/accounts/token/", {"email": user["email"], "password": user["password"]}, None
+        if endpoint == "user":
+            return endpoint, "GET", "/accounts/user/", None, self.tokens["access"]
+        if endpoint == "refresh":
+            return endpoint, "POST", "/accounts/token/refresh/", {"refresh": self.tokens["refresh"]}, None
+        return endpoint, "POST", "/accounts/logout/blacklist/", {"refresh_token": self.tokens["refresh"]}, None
+
+    def handle(self, endpoint, status, body):
+        """
+        Keeps the tokens returned by a login or refresh.
+        """
+        if endpoint in ("login", "refresh"):
+            self.tokens = json.loads(body) if status == 200 else None
+        elif endpoint == "logout":
+            self.tokens = None
+
+
+def run_wsgi(clients, operations, recorder):
+    """
+    Serves the calls through Django's WSGI handler on one thread per client.
+    """
+    from django.core.wsgi import get_wsgi_application
+    from django.test import RequestFactory
+
+    handler = get_wsgi_application()
+    factory = RequestFactory()
+
+    def call(endpoint, method, path, body, token):
+        extra = {"HTTP_AUTHORIZATION": f"JWT {token}"} if token else {}
+        data = json.dumps(body) if body is not None else ""
+        environ = factory.generic(method, path, data, content_type="application/json", **extra).environ
+        statuses = []
+        start = time.perf_counter()
+        current_endpoint.set(endpoint)
+        response = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        content = b"".join(response)
+        response.close()
+        current_endpoint.set(None)
+        return int(statuses[0].split()[0]), content, time.perf_counter() - start
+
+    def session(client):
+        for _ in range(operations):
+            endpoint, method, path, body, token = client.next_call()
+            status, content, seconds = call(endpoint, method, path, body, token)
+            recorder.record(endpoint, status, seconds)
+            client.handle(endpoint, status, content)
+
+    with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        return timed(lambda: list(pool.map(session, clients)))[1]
+
+
+def run_asgi(clients, operations, recorder):
+    """
+    Serves the calls through Django's ASGI handler, one task per client.
+    """
+    from django.core.asgi import get_asgi_application
+    from django.test import AsyncRequestFactory
+
+    application = get_asgi_application()
+    factory = AsyncRequestFactory()
+
+    async def call(endpoint, method, path, body, token):
+        extra = {"AUTHORIZATION": f"JWT {token}"} if token else {}
+        data = json.dumps(body).encode() if body is not None else b""
+        scope = factory.generic(method, path, data, content_type="application/json", **extra).scope
+        messages = [{"type": "http.request", "body": data, "more_body": False}]
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # Wait until the response is sent, as a connected client would
+            await asyncio.Future()
+
+        async def send(message):
+            sent.append(message)
+
+        start = time.perf_counter()
+        current_endpoint.set(endpoint)
+        await application(scope, receive, send)
+        current_endpoint.set(None)
+        status = next(message["status"] for message in sent if message["type"] == "http.response.start")
+        content = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+        return status, content, time.perf_counter() - start
+
+    async def session(client):
+        for _ in range(operations):
+            endpoint, method, path, body, token = client.next_call()
+            status, content, seconds = await call(endpoint, method, path, body, token)
+            recorder.record(endpoint, status, seconds)
+            client.handle(endpoint, status, content)
+
+    async def run():
+        await asyncio.gather(*(session(client) for client in clients))
+
+    return timed(asyncio.run, run())[1]
+
+
+def create_users(count):
+    """
+    Creates `count` random users and returns their credentials.
+    """
+    from django.contrib.auth.hashers import make_password
+    from accounts.models import User
+
+    users = [new_credentials() for _ in range(count)]
+    # Random usernames can collide, keep the first of each
+    users = list({user["email"].lower(): user for user in users}.values())
+    User.objects.bulk_create(
+        User(username=user["username"], email=user["email"], password=make_password(user["password"]))
+        for user in users
+    )
+    return users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=("wsgi", "asgi"), default="wsgi", help="Interface to serve the calls through.")
+    parser.add_argument("--async-views", action="store_true", help="Serve every endpoint with the async views.")
+    parser.add_argument("--clients", type=int, default=16, help="Simulated clients running at once.")
+    parser.add_argument("--operations", type=int, default=50, help="Calls made by each client.")
+    parser.add_argument("--users", type=int, default=200, help="Existing users the clients log in as.")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"Endpoint weights (default {DEFAULT_MIX}).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed, so runs replay the same calls.")
+    parser.add_argument(
+        "--hasher",
+        default=FAST_HASHER,
+        help="Password hasher used for the run. Pass 'default' to keep the project's hashers.",
+    )
+    parser.add_argument("--output", help="Also write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    os.environ["BENCHMARK_ASYNC_VIEWS"] = ASYNC_VIEWS if args.async_views else ""
+    if args.hasher != "default":
+        os.environ["BENCHMARK_PASSWORD_HASHER"] = args.hasher
+    setup("benchmarks.settings")
+
+    random.seed(args.seed)
+    users = create_users(args.users)
+    clients = [Client(users, args.mix, random.Random(args.seed + number)) for number in range(args.clients)]
+
+    recorder = Recorder()
+    recorder.install()
+    runner = run_asgi if args.server == "asgi" else run_wsgi
+    elapsed = runner(clients, args.operations, recorder)
+    results = recorder.summary(elapsed)
+
+    label = f"{args.server}, {'async' if args.async_views else 'sync'} views"
+    columns = ["endpoint", "requests", "errors", "requests/sec", "p50 ms", "p95 ms", "p99 ms", "queries/request"]
+    rows = []
+    for endpoint, result in results.items():
+        row = {"endpoint": endpoint}
+        for column in columns[1:]:
+            value = result[column]
+            row[column] = value if isinstance(value, int) else f"{value:.2f}"
+        rows.append(row)
+    print_table(f"Load test ({label}, {args.clients} clients x {args.operations} calls)", rows, columns)
+
+    if args.output:
+        report = {
+            "benchmark": "load",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "options": {
+                "server": args.server,
+                "async_views": args.async_views,
+                "clients": args.clients,
+                "operations": args.operations,
+                "users": args.users,
+                "mix": args.mix,
+                "seed": args.seed,
+                "hasher": args.hasher,
+            },
+            "elapsed": elapsed,
+            "endpoints": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as stream:
+            json.dump(report, stream, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Measures the per-request cost of the middleware stack for the JWT API,
+with the full stack (session, CSRF, auth and message middleware on every
+path) and with the lean stack from `core.middleware.PathScopedMiddleware`.
+
+    python -m benchmarks.middleware --requests 5000
+"""
+# Import the core libraries and functions
+import argparse
+import statistics
+from datetime import timedelta
+
+from benchmarks import print_table, setup, timed
+
+
+FULL_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+def build_handler(middleware=None):
+    """
+    Returns a WSGI handler using `middleware`, or `MIDDLEWARE` when None.
+    """
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import override_settings
+
+    if middleware is None:
+        return WSGIHandler()
+    with override_settings(MIDDLEWARE=middleware):
+        return WSGIHandler()
+
+
+def measure(handlers, requests, rounds, environ_for):
+    """
+    Serves `requests` requests through each handler, alternating between
+    them for `rounds` rounds. Returns the median microseconds per request
+    of each handler.
+    """
+    def serve(handler):
+        for _ in range(requests):
+            response = handler(environ_for(), lambda status, headers, exc_info=None: None)
+            response.close()
+
+    samples = [[] for _ in handlers]
+    for handler in handlers:
+        serve(handler)  # Warm up
+    for _ in range(rounds):
+        for handler, times in zip(handlers, samples):
+            times.append(timed(serve, handler)[1])
+    return [statistics.median(times) / requests * 1_000_000 for times in samples]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per round.")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per stack, the median is reported.")
+    args = parser.parse_args()
+
+    setup("benchmarks.settings")
+
+    from django.test import RequestFactory
+    from accounts.models import User
+    from accounts.tokens import RefreshToken
+
+    user = User.objects.create_user(email="bench@example.com", username="bench", password="benchmark-password-123")
+    access = RefreshToken.for_user(user).access_token
+    # Outlive the run, the default lifetime is one minute
+    access.set_exp(lifetime=timedelta(hours=1))
+    access = str(access)
+    factory = RequestFactory()
+
+    endpoints = {
+        "GET /accounts/user/": lambda: factory.get("/accounts/user/", HTTP_AUTHORIZATION=f"JWT {access}").environ,
+        "GET /accounts/metrics/ (404)": lambda: factory.get("/accounts/metrics/").environ,
+    }
+
+    handlers = [build_handler(FULL_MIDDLEWARE), build_handler()]
+
+    rows = []
+    for name, environ_for in endpoints.items():
+        full, lean = measure(handlers, args.requests, args.rounds, environ_for)
+        rows.append({
+            "request": name,
+            "full stack us": f"{full:.1f}",
+            "lean stack us": f"{lean:.1f}",
+            "saved us": f"{full - lean:.1f}",
+            "saved": f"{(full - lean) / full:.0%}",
+        })
+
+    print_table(
+        f"Microseconds per request ({args.requests} requests, median of {args.rounds})",
+        rows,
+        ["request", "full stack us", "lean stack us", "saved us", "saved"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares tokens minted per second by simplejwt (PyJWT) and by the fast
+path in `accounts.minting`, for access and refresh tokens carrying the
+`USER_CLAIMS` of a few users.
+
+    python -m benchmarks.minting --tokens 20000 --users 10
+"""
+# Import the core libraries and functions
+import argparse
+
+from benchmarks import print_table, setup, timed
+
+
+def mint(token_class, claims, count):
+    """
+    Builds and signs `count` tokens, cycling through the users' claims.
+    """
+    def run():
+        for number in range(count):
+            token = token_class()
+            token.payload.update(claims[number % len(claims)])
+            str(token)
+
+    return timed(run)[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=20_000, help="Tokens minted per run.")
+    parser.add_argument("--users", type=int, default=10, help="Distinct users the tokens are minted for.")
+    args = parser.parse_args()
+
+    setup()
+
+    from rest_framework_simplejwt import tokens as stock
+    from rest_framework_simplejwt.settings import api_settings
+    from accounts import tokens
+    from accounts.models import User
+
+    claims = []
+    for number in range(args.users):
+        user = User(id=number + 1, username=f"bench{number}", email=f"bench{number}@example.com", is_active=True)
+        claims.append({api_settings.USER_ID_CLAIM: user.id, **tokens.user_claims(user)})
+
+    rows = []
+    for name, stock_class, fast_class in (
+        ("access", stock.AccessToken, tokens.AccessToken),
+        ("refresh", stock.RefreshToken, tokens.RefreshToken),
+    ):
+        stock_seconds = mint(stock_class, claims, args.tokens)
+        fast_seconds = mint(fast_class, claims, args.tokens)
+        rows.append({
+            "token": name,
+            "simplejwt tokens/sec": f"{args.tokens / stock_seconds:.0f}",
+            "accounts tokens/sec": f"{args.tokens / fast_seconds:.0f}",
+            "speed-up": f"{stock_seconds / fast_seconds:.2f}x",
+        })
+    print_table(
+        f"Token minting ({args.tokens} tokens, {args.users} users)",
+        rows,
+        ["token", "simplejwt tokens/sec", "accounts tokens/sec", "speed-up"],
+    )
+
+
+if __name__ == "__main__":
+    main()
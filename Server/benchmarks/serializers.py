@@ -0,0 +1,88 @@
+"""
+Compares objects rendered per second by DRF's `UserSerializer` and
+`GroupSerializer`, by their compiled plans from `accounts.compiled`, and
+by the `values()` path that renders rows without building model objects.
+Every run includes the query.
+
+    python -m benchmarks.serializers --objects 5000 --rounds 5
+"""
+# Import the core libraries and functions
+import argparse
+import statistics
+
+from django.urls import path
+
+from benchmarks import print_table, setup, timed
+
+
+# The project has no group routes, this one lets the group URLs resolve
+urlpatterns = [path("groups/<int:pk>/", lambda request, pk: None, name="group-detail")]
+
+
+def measure(render, rounds):
+    """
+    Returns the median seconds of `rounds` calls to `render`.
+    """
+    render()  # Warm up
+    return statistics.median(timed(render)[1] for _ in range(rounds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=5000, help="Users and groups rendered per round.")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per serializer, the median is reported.")
+    args = parser.parse_args()
+
+    setup("benchmarks.settings")
+
+    from django.conf import settings
+    from django.contrib.auth.models import Group
+    from django.test import RequestFactory, override_settings
+    from accounts.models import User
+    from accounts.serializers import GroupSerializer, UserSerializer
+
+    users = [
+        User(email=f"bench{n}@example.com", username=f"bench{n}", first_name="Bench" if n % 2 else "", password="!")
+        for n in range(args.objects)
+    ]
+    for user in users:
+        user.refresh_display_name()
+    User.objects.bulk_create(users)
+    Group.objects.bulk_create(Group(name=f"group{n}") for n in range(args.objects))
+    slow = override_settings(ACCOUNTS=dict(settings.ACCOUNTS, FAST_SERIALIZERS=False))
+    override_settings(ROOT_URLCONF=__name__).enable()
+    context = {"request": RequestFactory().get("/")}
+
+    rows = []
+    for name, serializer_class, queryset, kwargs in (
+        ("UserSerializer", UserSerializer, User.objects.all(), {}),
+        ("GroupSerializer", GroupSerializer, Group.objects.all(), {"context": context}),
+    ):
+        def render():
+            return serializer_class(list(queryset), many=True, **kwargs).data
+
+        def render_values():
+            return serializer_class.render_values(queryset.values(*serializer_class.values_columns()), **kwargs)
+
+        with slow:
+            drf = measure(render, args.rounds)
+        compiled = measure(render, args.rounds)
+        values = measure(render_values, args.rounds)
+
+        rows.append({
+            "serializer": name,
+            "DRF objects/sec": f"{args.objects / drf:.0f}",
+            "compiled objects/sec": f"{args.objects / compiled:.0f}",
+            "values() objects/sec": f"{args.objects / values:.0f}",
+            "speed-up": f"{drf / compiled:.1f}x / {drf / values:.1f}x",
+        })
+
+    print_table(
+        f"Objects rendered per second ({args.objects} objects, median of {args.rounds})",
+        rows,
+        ["serializer", "DRF objects/sec", "compiled objects/sec", "values() objects/sec", "speed-up"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Settings for the benchmarks that start a real server process. Same as
+`core.settings`, except for the database and the toggles below, which are
+read from environment variables so each server run can differ.
+"""
+# Import the core libraries and functions
+import os
+
+from core.database import database_from_environment
+from core.settings import *  # noqa: F401,F403
+
+
+DEBUG = False
+
+ALLOWED_HOSTS = ["*"]
+
+# The benchmark builds its own database, never the development one
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get("BENCHMARK_DATABASE", BASE_DIR / 'benchmark.sqlite3'),
+        'OPTIONS': {'timeout': 30},
+    }
+}
+
+# "production" swaps in the profile from `core/database.py`, configured by
+# the same `DATABASE_*` variables as `core.settings_production`
+if os.environ.get("BENCHMARK_DB_PROFILE") == "production":
+    DATABASES = {
+        'default': database_from_environment(os.environ, DATABASES['default']['NAME']),
+    }
+
+# A cheap hasher keeps password hashing from hiding the database costs
+if os.environ.get("BENCHMARK_PASSWORD_HASHER"):
+    PASSWORD_HASHERS = [os.environ["BENCHMARK_PASSWORD_HASHER"]]
+
+# Comma-separated URL names served by the async views
+ACCOUNTS = dict(
+    ACCOUNTS,
+    ASYNC_VIEWS=tuple(name for name in os.environ.get("BENCHMARK_ASYNC_VIEWS", "").split(",") if name),
+)
@@ -0,0 +1,75 @@
+"""
+Database profiles for `core/settings_production.py`, built from
+environment variables:
+
+    DATABASE_ENGINE     "postgresql" or "sqlite" (default "sqlite")
+    DATABASE_NAME       database name, or the SQLite file path
+    DATABASE_USER, DATABASE_PASSWORD, DATABASE_HOST, DATABASE_PORT
+    DATABASE_CONN_MAX_AGE   seconds a connection is kept open (default 600)
+    DATABASE_POOLER     "pgbouncer" when connecting through PgBouncer in
+                        transaction pooling mode
+"""
+# Import the core libraries and functions
+import os
+
+
+# Applied to every SQLite connection by `core.db.sqlite3`
+SQLITE_PRAGMAS = {
+    # Readers no longer block the writer, and the other way around
+    "journal_mode": "WAL",
+    # Safe with WAL, and skips an fsync on every commit
+    "synchronous": "NORMAL",
+    # Milliseconds a writer waits for the lock instead of failing
+    "busy_timeout": 5000,
+    # Read the database through a 256 MB memory map
+    "mmap_size": 268435456,
+    # 64 MB page cache per connection (negative numbers are KiB)
+    "cache_size": -65536,
+    "temp_store": "MEMORY",
+}
+
+
+def sqlite_database(name, conn_max_age=600):
+    """
+    Tuned SQLite for single-node deployments.
+    """
+    return {
+        'ENGINE': 'core.db.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': conn_max_age,
+        'OPTIONS': {'pragmas': SQLITE_PRAGMAS},
+    }
+
+
+def postgresql_database(environ, conn_max_age=600):
+    """
+    PostgreSQL (or a compatible server) with persistent connections.
+    Each server thread keeps its connection for `conn_max_age` seconds
+    and checks it is still alive before reusing it. For a shared pool
+    across processes, point it at PgBouncer and set `DATABASE_POOLER`.
+    """
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': environ.get("DATABASE_NAME", "server"),
+        'USER': environ.get("DATABASE_USER", ""),
+        'PASSWORD': environ.get("DATABASE_PASSWORD", ""),
+        'HOST': environ.get("DATABASE_HOST", ""),
+        'PORT': environ.get("DATABASE_PORT", ""),
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'connect_timeout': 5},
+    }
+    if environ.get("DATABASE_POOLER") == "pgbouncer":
+        # Server-side cursors do not survive transaction pooling
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return database
+
+
+def database_from_environment(environ=os.environ, default_name=None):
+    """
+    Returns the `default` database settings selected by `environ`.
+    """
+    conn_max_age = int(environ.get("DATABASE_CONN_MAX_AGE", 600))
+    if environ.get("DATABASE_ENGINE", "sqlite") == "postgresql":
+        return postgresql_database(environ, conn_max_age)
+    return sqlite_database(environ.get("DATABASE_NAME", default_name), conn_max_age)
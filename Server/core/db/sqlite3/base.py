@@ -0,0 +1,22 @@
+# Import the core libraries and functions
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Django's SQLite backend, plus the PRAGMAs listed under
+    `OPTIONS['pragmas']`, which are run on every new connection.
+    Used by the single-node profile in `core/database.py`.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Not an argument of `sqlite3.connect()`
+        self.pragmas = params.pop("pragmas", {})
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
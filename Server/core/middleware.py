@@ -0,0 +1,94 @@
+# Import the core libraries and functions
+import asyncio
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+
+
+class PathScopedMiddleware:
+    """
+    Runs the middleware listed in `PATH_SCOPED_MIDDLEWARE` for every
+    request, except those under a prefix in `LEAN_MIDDLEWARE_PATHS`.
+
+    The JWT API under `/accounts/` needs no sessions, CSRF cookies,
+    `request.user` or messages, while the admin needs them all, so the
+    API skips that part of the stack entirely. Takes the place of the
+    scoped middleware in `MIDDLEWARE`, and forwards their `process_view`,
+    `process_template_response` and `process_exception` hooks.
+
+    Works in both modes, like the middleware it wraps, so an ASGI server
+    never has to switch between sync and async at this layer.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.lean_paths = tuple(settings.LEAN_MIDDLEWARE_PATHS)
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+        # Build the scoped chain the same way Django's handler builds `MIDDLEWARE`
+        self.middleware = []
+        handler = get_response
+        for middleware_path in reversed(settings.PATH_SCOPED_MIDDLEWARE):
+            try:
+                instance = import_string(middleware_path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            self.middleware.insert(0, instance)
+            handler = convert_exception_to_response(instance)
+        self.scoped_response = handler
+
+        self.view_hooks = [m.process_view for m in self.middleware if hasattr(m, "process_view")]
+        self.template_hooks = [
+            m.process_template_response for m in reversed(self.middleware) if hasattr(m, "process_template_response")
+        ]
+        self.exception_hooks = [
+            m.process_exception for m in reversed(self.middleware) if hasattr(m, "process_exception")
+        ]
+
+    def is_lean(self, request):
+        return request.path_info.startswith(self.lean_paths)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if self.is_lean(request):
+            return self.get_response(request)
+        return self.scoped_response(request)
+
+    async def __acall__(self, request):
+        # The scoped chain was built on an async `get_response`, so it is async too
+        if self.is_lean(request):
+            return await self.get_response(request)
+        return await self.scoped_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_lean(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        if self.is_lean(request):
+            return response
+        for hook in self.template_hooks:
+            response = hook(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        if self.is_lean(request):
+            return None
+        for hook in self.exception_hooks:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
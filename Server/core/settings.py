@@ -50,20 +50,37 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Request timings, only active with `ACCOUNTS['INSTRUMENTATION']`.
+    # Keep it first, and `ViewTimingMiddleware` last.
+    'accounts.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
 
     # Place CORS high in the importance list, specifically above
     # the middleware functions
     'corsheaders.middleware.CorsMiddleware',
 
     'django.middleware.common.CommonMiddleware',
+    # Runs `PATH_SCOPED_MIDDLEWARE`, except for `LEAN_MIDDLEWARE_PATHS`
+    'core.middleware.PathScopedMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'accounts.instrumentation.ViewTimingMiddleware',
+]
+
+# Session, CSRF, user and message handling, only needed by the admin.
+# The JWT API under `LEAN_MIDDLEWARE_PATHS` skips them.
+PATH_SCOPED_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+LEAN_MIDDLEWARE_PATHS = ('/accounts/',)
+
+# The admin checks look for its middleware in `MIDDLEWARE` only, they
+# are in `PATH_SCOPED_MIDDLEWARE` instead
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -100,6 +117,10 @@ DATABASES = {
 AUTH_USER_MODEL = 'accounts.User'
 
 
+# Permission checks are served from the cache in `accounts/permissions.py`
+AUTHENTICATION_BACKENDS = ['accounts.permissions.CachedPermissionBackend']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -118,6 +139,18 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashers. The `accounts` hashers take their cost parameters from
+# `ACCOUNTS['PASSWORD_HASHER_PROFILE']`, the others only check older hashes.
+# https://docs.djangoproject.com/en/4.1/topics/auth/passwords/
+PASSWORD_HASHERS = [
+    'accounts.hashers.PBKDF2PasswordHasher',
+    'accounts.hashers.Argon2PasswordHasher',
+    'accounts.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+
 # Django Rest Framework permissions
 # https://www.django-rest-framework.org/
 REST_FRAMEWORK = {
@@ -128,8 +161,22 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        # Builds `request.user` from the token claims, no `User` query.
+        # Use `accounts.authentication.CachedUserJWTAuthentication` on views
+        # that need the full model, or `VerifiedTokenJWTAuthentication` to
+        # also skip verifying an access token the process has seen before.
+        'accounts.authentication.ClaimsJWTAuthentication',
+    ),
+    # JSON through orjson when it is installed, see `accounts/renderers.py`
+    'DEFAULT_RENDERER_CLASSES': (
+        'accounts.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'accounts.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 
@@ -184,6 +231,50 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     # The key-value name stored (encrypted) in the token
     'USER_ID_CLAIM': 'user_id',
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    # Verified with the keys from `ACCOUNTS['JWT_SIGNING_KEYS']` when set
+    'AUTH_TOKEN_CLASSES': ('accounts.tokens.AccessToken',),
+    # Stateless user built from the claims embedded in each token
+    'TOKEN_USER_CLASS': 'accounts.authentication.ClaimsUser',
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Login and refresh go through the `accounts` serializers so blacklist
+    # checks use the cache layer in `accounts/blacklist.py`
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.serializers.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshSerializer',
+}
+
+
+# Settings for the `accounts` app. See `accounts/conf.py` for every
+# available key and its default value.
+ACCOUNTS = {
+    # Where "is this refresh token blacklisted" answers are cached.
+    # Use `accounts.blacklist.DjangoBlacklistCache` to share the answers
+    # between server processes through the `CACHES` setting.
+    'BLACKLIST_CACHE_BACKEND': 'accounts.blacklist.LocMemBlacklistCache',
+    'BLACKLIST_CACHE_MAX_ENTRIES': 100_000,
+    # Blacklisted tokens are remembered for the refresh token lifetime
+    'BLACKLIST_CACHE_TIMEOUT': None,
+    'BLACKLIST_CACHE_NEGATIVE_TIMEOUT': 5,
+    # "compact" keeps only the jti and expiry of blacklisted tokens instead
+    # of simplejwt's tables, which also store every issued token
+    'BLACKLIST_STORAGE': 'simplejwt',
+    # Seconds between background prunes of expired token rows, or `None`
+    # to prune with `python manage.py prune_tokens` from cron
+    'TOKEN_PRUNE_INTERVAL': None,
+    'TOKEN_PRUNE_BATCH_SIZE': 1000,
+    # Login and registration limits, checked before any password hashing
+    'THROTTLE_RATES': {
+        'login_ip': '60/min',
+        'login_email': '10/min',
+        'register_ip': '20/min',
+    },
+    # Full `User` rows are cached this many seconds for the views that need them
+    'USER_CACHE_TIMEOUT': 30,
+    # Algorithm and cost of new password hashes, one of `PASSWORD_HASHER_PROFILES`
+    # in `accounts/conf.py`. Users are rehashed as they log in.
+    'PASSWORD_HASHER_PROFILE': 'default',
+    # Sign with asymmetric keys so other services can verify tokens from
+    # `/accounts/jwks/` (see `accounts/keys.py`). The first key signs.
+    # 'JWT_SIGNING_KEYS': (
+    #     {'kid': '2022-10', 'algorithm': 'EdDSA', 'private_key': Path('keys/2022-10.pem').read_text()},
+    # ),
 }
\ No newline at end of file
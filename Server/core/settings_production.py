@@ -0,0 +1,38 @@
+"""
+Production settings for Server project. Same as `core.settings`, with
+persistent database connections. Select it with:
+
+    DJANGO_SETTINGS_MODULE=core.settings_production
+
+`DJANGO_SECRET_KEY` must be set, it also signs the JWTs. The database
+is configured from environment variables, see `core/database.py`.
+Without `DATABASE_ENGINE=postgresql`, a tuned SQLite file is used,
+which suits a single-node deployment.
+"""
+# Import the core libraries and functions
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from core.database import database_from_environment
+from core.settings import *  # noqa: F401,F403
+
+
+# Never fall back to the development key checked into `core/settings.py`,
+# anyone could forge tokens signed with it
+if os.environ.get("DJANGO_SECRET_KEY") in (None, "", SECRET_KEY):
+    raise ImproperlyConfigured("Set DJANGO_SECRET_KEY to a secret key for production.")
+SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",") if host]
+
+DATABASES = {
+    'default': database_from_environment(os.environ, BASE_DIR / 'db.sqlite3'),
+}
+
+SIMPLE_JWT = dict(SIMPLE_JWT, SIGNING_KEY=SECRET_KEY)
+
+# JSON only, the browsable API and its templates are for development
+REST_FRAMEWORK = dict(REST_FRAMEWORK, DEFAULT_RENDERER_CLASSES=('accounts.renderers.FastJSONRenderer',))